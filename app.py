@@ -2,13 +2,21 @@ import streamlit as st
 from config.settings import configure_page
 from components.styles import apply_custom_styles
 from components.sidebar import create_sidebar
-from tabs.pipe_system import render_pipe_system_tab
-from tabs.simulations import render_simulations_tab
-from tabs.about import render_about_tab
+from components.debug_panel import begin_profiling, render_debug_panel
+from components.navigation import render_views
+from utils.pipe_segment import new_pipe
+from utils.profiling import stage
+from utils.shared_cache import bind_session
 
 # Configuração da página
 configure_page()
 
+# Instrumentação de tempo (apenas com o painel de desempenho ativado)
+profiler = begin_profiling()
+
+# Sessão registrada nas estatísticas das tabelas compartilhadas do processo
+bind_session(st.session_state)
+
 # Aplicar estilos personalizados
 apply_custom_styles()
 
@@ -18,41 +26,14 @@ st.markdown('<div class="sub-header">Análise completa de sistemas com múltiplo
 
 # Inicializar session state para tubos
 if 'pipes' not in st.session_state:
-    st.session_state.pipes = [{
-        'id': 1,
-        'material': 'Aço comercial',
-        'diameter': 0.1,
-        'length': 100.0,
-        'elevation_change': 0.0,
-        'has_contraction': False,
-        'has_expansion': False,
-        'has_curves': False,
-        'n_curves': 0,
-        'has_valve_gate': False,
-        'has_valve_globe': False,
-        'has_valve_ball': False,
-        'has_valve_check': False,
-        'has_tee_through': False,
-        'has_tee_branch': False,
-        'n_tee_through': 0,
-        'n_tee_branch': 0
-    }]
+    st.session_state.pipes = [new_pipe(1)]
 
 # Criar sidebar e obter configurações
-sidebar_data = create_sidebar()
-
-# Layout principal com abas
-tab1, tab2, tab3 = st.tabs(["📊 Sistema de Tubos",  "📈 Simulações", "ℹ️ Sobre"])
-
-with tab1:
-    render_pipe_system_tab(sidebar_data)
-
-with tab2:
-    render_simulations_tab(sidebar_data)
-
-with tab3:
-    render_about_tab()
+with stage('sidebar'):
+    sidebar_data = create_sidebar()
 
+# Visões do app (módulos das abas importados só quando exibidos)
+render_views(sidebar_data)
 
 # Rodapé
 st.markdown("---")
@@ -62,3 +43,6 @@ st.markdown(
     "</div>",
     unsafe_allow_html=True
 )
+
+# Painel de desempenho (tempos deste rerun)
+render_debug_panel(profiler)
@@ -0,0 +1 @@
+# Arquivo vazio para tornar benchmarks um pacote Python
@@ -0,0 +1,423 @@
+"""
+Casos do conjunto de benchmarks
+
+Os dados de entrada são gerados com semente fixa, de modo que cada caso
+mede sempre o mesmo trabalho entre execuções e entre máquinas.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+from config.settings import COMMERCIAL_DIAMETERS, TUBE_MATERIALS
+from utils.benchmark import BenchmarkCase
+from utils.calculations import calculate_pipe_losses, critical_depth, moody_grid, normal_depth
+from utils.compressible import solve_compressible_system
+from utils.diameter_optimization import optimize_diameters
+from utils.downsampling import lttb_indices, minmax_indices
+from utils.engine import IncrementalSeriesSolver, solve_series_system
+from utils.fluid_properties import get_fluid_properties, property_table
+from utils.loss_coefficients import K_table
+from utils.network import grid_network, solve_network
+from utils.open_channel import SECTION_SHAPES, ChannelSections, water_surface_profiles
+from utils.pipe_segment import PIPE_FIELDS, PipeColumns, PipeSegment, as_segments
+from utils.pipe_table import pipes_to_frame, read_pipe_file, validate_pipe_frame, write_pipe_file
+from utils.result_cache import ResultCache, config_hash
+from utils.shared_cache import SharedCache
+from utils.sweeps import flow_rate_sweep, grid_sweep, inlet_pressure_sweep, material_what_if
+from utils.system_model import SystemModel, get_system_model
+from utils.uncertainty import run_monte_carlo
+from utils.water_hammer import segment_wave_speeds, simulate_water_hammer, valve_closure_schedule
+
+# Água a 20 °C
+RHO = 998.2
+MU = 1.002e-3
+
+FLUIDS = ["Água", "Ar", "Óleo", "Gás ideal", "Personalizado"]
+SYSTEM_SIZES = [1, 10, 100, 1000, 10000]
+SWEEP_SIZES = [50, 500, 5000]
+
+ROOT = Path(__file__).resolve().parent.parent
+# Módulos importados por app.py antes de qualquer visão
+APP_MODULES = ['streamlit', 'config.settings', 'components.styles', 'components.sidebar',
+               'components.debug_panel', 'components.navigation', 'utils.pipe_segment',
+               'utils.profiling', 'utils.shared_cache']
+
+def make_pipes(n_segments, seed=0):
+    """Trechos sintéticos no formato de st.session_state.pipes"""
+    rng = np.random.default_rng(seed)
+    materials = [name for name in TUBE_MATERIALS if TUBE_MATERIALS[name] is not None]
+    pipes = []
+    for i in range(n_segments):
+        material = materials[i % len(materials)]
+        pipes.append({
+            'id': i + 1,
+            'material': material,
+            'roughness': TUBE_MATERIALS[material],
+            'diameter': float(rng.choice([0.05, 0.075, 0.1, 0.15, 0.2])),
+            'length': float(rng.uniform(10, 500)),
+            'elevation_change': float(rng.uniform(-5, 5)),
+            'has_contraction': False,
+            'has_expansion': False,
+            'has_curves': i % 3 == 0,
+            'n_curves': 2,
+            'has_valve_gate': i % 7 == 0,
+            'has_valve_globe': False,
+            'has_valve_ball': False,
+            'has_valve_check': False,
+            'has_tee_through': i % 5 == 0,
+            'has_tee_branch': False,
+            'n_tee_through': 1,
+            'n_tee_branch': 0
+        })
+    return pipes
+
+def edit_session(n_segments):
+    """
+    Estado de uma sessão já resolvida (trechos, modelo e solver
+    incremental), para medir a edição de um único trecho
+    """
+    session = {'pipes': make_pipes(n_segments), 'store': {}, 'solver': IncrementalSeriesSolver()}
+    edit_and_solve(session)
+    return session
+
+def edit_and_solve(session):
+    """Altera o diâmetro do trecho central, recompila o modelo e resolve"""
+    pipes = session['pipes']
+    pipe = pipes[len(pipes) // 2]
+    pipe['diameter'] = 0.15 if pipe['diameter'] != 0.15 else 0.2
+    model = get_system_model(pipes, session['store'])
+    return session['solver'].solve(model, 0.01, RHO, MU, 300000.0)
+
+def channel_batch(n_channels, seed=4):
+    """Seções sortidas, vazões e profundidades de controle (1,5·y_c)"""
+    rng = np.random.default_rng(seed)
+    sections = ChannelSections.from_shapes(
+        rng.choice(SECTION_SHAPES, n_channels), rng.uniform(1, 5, n_channels),
+        rng.uniform(0, 2, n_channels), rng.uniform(1, 3, n_channels)
+    )
+    flow_rate = rng.uniform(0.5, 5, n_channels)
+    return sections, flow_rate, 1.5 * sections.critical_depth(flow_rate)
+
+def transient_setup(n_segments, n_reaches, n_steps):
+    """Argumentos de simulate_water_hammer para n_steps passos de tempo"""
+    pipes = make_pipes(n_segments, seed=1)
+    model = SystemModel.from_pipes(pipes)
+    speeds = segment_wave_speeds(pipes, 2.19e9, RHO, 0.05)
+    duration = n_steps * np.sum(model.length / speeds) / n_reaches
+    return model, 0.01, RHO, MU, 800000.0, speeds, duration
+
+def shared_result(compute):
+    """
+    Cache compartilhado com o resultado de compute já guardado por uma
+    primeira sessão; retorna (cache, chave, compute)
+    """
+    shared = SharedCache('benchmark')
+    key = config_hash('benchmark')
+    ResultCache(shared=shared, session='primeira').get_or_compute(key, compute)
+    return shared, key, compute
+
+def cold_import(modules):
+    """
+    Importa os módulos em um interpretador novo (partida a frio: nenhum
+    módulo já carregado neste processo) e retorna o tempo medido lá dentro (s)
+    """
+    code = ("import importlib, time\n"
+            "start = time.perf_counter()\n"
+            f"for name in {list(modules)!r}: importlib.import_module(name)\n"
+            "print(time.perf_counter() - start)")
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(output.stdout)
+
+def app_session(view_mode, run=True):
+    """Sessão nova do app (AppTest) no modo de exibição dado, opcionalmente já renderizada"""
+    from streamlit.testing.v1 import AppTest
+    app = AppTest.from_file(str(ROOT / 'app.py'), default_timeout=120)
+    app.session_state['view_mode'] = view_mode
+    if run:
+        app.run()
+    return app
+
+def build_cases(quick=False):
+    """
+    Lista de BenchmarkCase
+    quick: Omite os tamanhos maiores (para verificação rápida local)
+    """
+    system_sizes = SYSTEM_SIZES[:3] if quick else SYSTEM_SIZES
+    sweep_sizes = SWEEP_SIZES[:2] if quick else SWEEP_SIZES
+    cases = []
+
+    # Chamadas isoladas
+    pipe = make_pipes(1)[0]
+    cases.append(BenchmarkCase(
+        'trecho/calculate_pipe_losses',
+        lambda _: calculate_pipe_losses(pipe, 0.01, RHO, MU),
+        group='trecho'
+    ))
+
+    for fluid in FLUIDS:
+        cases.append(BenchmarkCase(
+            f'propriedades/{fluid}',
+            lambda _, fluid=fluid: get_fluid_properties(fluid, 25.0, 101325.0),
+            group='propriedades'
+        ))
+    n_states = 100000 if quick else 1000000
+    for fluid in ("Água", "Ar"):
+        cases.append(BenchmarkCase(
+            f'propriedades/vetor/{fluid}/{n_states}',
+            lambda temps, fluid=fluid: get_fluid_properties(fluid, temps, 101325.0),
+            setup=lambda: np.linspace(0.0, 100.0, n_states),
+            group='propriedades'
+        ))
+
+    # Tabelas compartilhadas entre as sessões: montagem (sem o cache) e
+    # consulta ao cache do processo
+    shared_tables = {
+        'moody': (moody_grid.__wrapped__, moody_grid),
+        'propriedades': (lambda: get_fluid_properties("Água", np.linspace(0.0, 100.0, 501), 101325.0),
+                         lambda: property_table("Água")),
+        'propriedades/sidebar': (lambda: get_fluid_properties("Água", 25.0, 101325.0),
+                                 lambda: get_fluid_properties("Água", 25.0, 101325.0, shared=True)),
+        'coeficientes_K': (lambda: K_table.__wrapped__(2.0, 2.0), lambda: K_table(2.0, 2.0))
+    }
+    for name, (build, cached) in shared_tables.items():
+        cases.append(BenchmarkCase(
+            f'compartilhado/{name}/montar',
+            lambda _, build=build: build(),
+            group='compartilhado'
+        ))
+        cases.append(BenchmarkCase(
+            f'compartilhado/{name}/cache',
+            lambda _, cached=cached: cached(),
+            group='compartilhado'
+        ))
+
+    cases.append(BenchmarkCase(
+        'canal/normal_depth',
+        lambda _: normal_depth(2.0, 3.0, 0.001, 0.015),
+        group='canal'
+    ))
+    cases.append(BenchmarkCase(
+        'canal/critical_depth',
+        lambda _: critical_depth(2.0, 3.0),
+        group='canal'
+    ))
+    # Lote de canais das três formas: profundidades e curvas de remanso (100 passos)
+    n_channels = 1000 if quick else 5000
+    cases.append(BenchmarkCase(
+        f'canal/profundidades/{n_channels}',
+        lambda batch: (batch[0].normal_depth(batch[1], 0.001, 0.014), batch[0].critical_depth(batch[1])),
+        setup=lambda: channel_batch(n_channels),
+        group='canal'
+    ))
+    cases.append(BenchmarkCase(
+        f'canal/remanso/{n_channels}',
+        lambda batch: water_surface_profiles(batch[0], batch[1], 0.001, 0.014, 1000.0, batch[2], n_steps=100),
+        setup=lambda: channel_batch(n_channels),
+        group='canal'
+    ))
+
+    # Sistemas em série com N trechos: montagem do modelo e solução
+    for n in system_sizes:
+        cases.append(BenchmarkCase(
+            f'sistema/modelo/{n}',
+            lambda pipes: SystemModel.from_pipes(pipes),
+            setup=lambda n=n: make_pipes(n),
+            group='sistema'
+        ))
+        cases.append(BenchmarkCase(
+            f'sistema/modelo_segmentos/{n}',
+            lambda pipes: SystemModel.from_pipes(pipes),
+            setup=lambda n=n: as_segments(make_pipes(n)),
+            group='sistema'
+        ))
+        cases.append(BenchmarkCase(
+            f'sistema/solucao/{n}',
+            lambda model: solve_series_system(model, 0.01, RHO, MU, 300000.0),
+            setup=lambda n=n: SystemModel.from_pipes(make_pipes(n)),
+            group='sistema'
+        ))
+        cases.append(BenchmarkCase(
+            f'sistema/escalar/{n}',
+            lambda pipes: [calculate_pipe_losses(p, 0.01, RHO, MU) for p in pipes],
+            setup=lambda n=n: make_pipes(n),
+            group='sistema'
+        ))
+        cases.append(BenchmarkCase(
+            f'sistema/modelo_segmentos/{n}',
+            lambda pipes: SystemModel.from_pipes(pipes),
+            setup=lambda n=n: as_segments(make_pipes(n)),
+            group='sistema'
+        ))
+
+    # Edição de um trecho em um sistema longo (modelo e solução incrementais)
+    n_edit = system_sizes[-1]
+    cases.append(BenchmarkCase(
+        f'sistema/edicao/{n_edit}',
+        edit_and_solve,
+        setup=lambda: edit_session(n_edit),
+        group='sistema'
+    ))
+
+    # Varreduras da aba de Simulações (sistema de 10 trechos)
+    model_10 = lambda: SystemModel.from_pipes(make_pipes(10))
+    for n_points in sweep_sizes:
+        cases.append(BenchmarkCase(
+            f'varredura/vazao/{n_points}',
+            lambda model, n_points=n_points: flow_rate_sweep(model, RHO, MU, 0.001, 0.05, n_points),
+            setup=model_10,
+            group='varredura'
+        ))
+        cases.append(BenchmarkCase(
+            f'varredura/pressao/{n_points}',
+            lambda model, n_points=n_points: inlet_pressure_sweep(model, RHO, MU, 0.01, 1e5, 1e6, n_points),
+            setup=model_10,
+            group='varredura'
+        ))
+    materials = {name: value for name, value in TUBE_MATERIALS.items() if value is not None}
+    cases.append(BenchmarkCase(
+        'varredura/materiais',
+        lambda model: material_what_if(model, RHO, MU, 0.01, 300000.0, materials),
+        setup=model_10,
+        group='varredura'
+    ))
+    cases.append(BenchmarkCase(
+        'varredura/materiais_trechos/10000',
+        lambda model: material_what_if(model, RHO, MU, 0.01, 300000.0, materials),
+        setup=lambda: SystemModel.from_pipes(make_pipes(10000)),
+        group='varredura'
+    ))
+    # A mesma comparação pedida por uma sessão nova, com o resultado já
+    # calculado por outra sessão no cache compartilhado do processo
+    cases.append(BenchmarkCase(
+        'varredura/materiais_trechos/10000/sessao_nova',
+        lambda setup: ResultCache(shared=setup[0]).get_or_compute(setup[1], setup[2]),
+        setup=lambda: shared_result(
+            lambda: material_what_if(SystemModel.from_pipes(make_pipes(10000)), RHO, MU, 0.01, 300000.0, materials)
+        ),
+        group='varredura'
+    ))
+
+    # Varredura 2D vazão x diâmetro (diâmetro aplicado a todos os trechos)
+    n_grid = 200 if quick else 1000
+    water_state = {'fluid_type': "Água", 'temp': 20.0, 'pressure_inlet': 300000.0, 'rho': RHO, 'mu': MU}
+    cases.append(BenchmarkCase(
+        f'varredura/grade/{n_grid}x{n_grid}',
+        lambda model: grid_sweep(model, water_state, 0.01, 'flow_rate', np.linspace(0.001, 0.05, n_grid),
+                                 'diameter', np.linspace(0.05, 0.3, n_grid)),
+        setup=model_10,
+        group='varredura'
+    ))
+
+    # Gás compressível: 100 trechos com queda de pressão de ~50%
+    cases.append(BenchmarkCase(
+        'compressivel/ar/100',
+        lambda model: solve_compressible_system(model, 0.01, "Ar", 20.0, 500000.0),
+        setup=lambda: SystemModel.from_pipes(make_pipes(100, seed=2)),
+        group='compressivel'
+    ))
+
+    # Golpe de aríete: 100 trechos discretizados em ~10^5 nós, 200 passos de tempo
+    n_reaches = 10000 if quick else 100000
+    cases.append(BenchmarkCase(
+        f'transiente/moc/{n_reaches}',
+        lambda setup: simulate_water_hammer(*setup, n_reaches=n_reaches, valve_schedule=valve_closure_schedule(0.0)),
+        setup=lambda: transient_setup(100, n_reaches, 200),
+        group='transiente'
+    ))
+
+    # Redução de séries para gráficos (perfil com 10^6 pontos -> 2000)
+    n_plot = 100000 if quick else 1000000
+    series = lambda: np.cumsum(np.random.default_rng(3).standard_normal(n_plot))
+    cases.append(BenchmarkCase(
+        f'grafico/minmax/{n_plot}',
+        lambda y: minmax_indices(y, 2000),
+        setup=series,
+        group='grafico'
+    ))
+    cases.append(BenchmarkCase(
+        f'grafico/lttb/{n_plot}',
+        lambda y: lttb_indices(np.arange(y.size, dtype=float), y, 2000),
+        setup=series,
+        group='grafico'
+    ))
+
+    # Importação de tabela de trechos (leitura do CSV e validação)
+    n_table = 1000 if quick else 10000
+    cases.append(BenchmarkCase(
+        f'tabela/importar_csv/{n_table}',
+        lambda data: validate_pipe_frame(read_pipe_file(data, 'trechos.csv')),
+        setup=lambda: write_pipe_file(pipes_to_frame(make_pipes(n_table)), 'csv'),
+        group='tabela'
+    ))
+    cases.append(BenchmarkCase(
+        f'tabela/importar_npz/{n_table}',
+        lambda data: validate_pipe_frame(read_pipe_file(data, 'trechos.npz')),
+        setup=lambda: write_pipe_file(pipes_to_frame(make_pipes(n_table)), 'npz'),
+        group='tabela'
+    ))
+
+    # Memória dos trechos (memory_peak): dicionários, PipeSegment e colunas,
+    # todos montados a partir das mesmas colunas da tabela
+    columns = lambda: {name: values.tolist() for name, values in pipes_to_frame(make_pipes(n_table)).items()}
+    containers = {
+        'dicionarios': lambda values: [dict(zip(PIPE_FIELDS, row)) for row in zip(*values.values())],
+        'segmentos': lambda values: [PipeSegment.from_values(row) for row in zip(*values.values())],
+        'colunas': PipeColumns.from_lists
+    }
+    for name, build in containers.items():
+        cases.append(BenchmarkCase(
+            f'trechos/memoria/{name}/{n_table}', build, setup=columns, group='trechos'
+        ))
+
+    # Rede malhada e otimização de diâmetros
+    grid = 30 if quick else 71
+    cases.append(BenchmarkCase(
+        f'rede/malha/{grid}x{grid}',
+        lambda network: solve_network(network, RHO, MU),
+        setup=lambda: grid_network(grid, grid),
+        group='rede'
+    ))
+    cases.append(BenchmarkCase(
+        'otimizacao/diametros/30x15',
+        lambda pipes: optimize_diameters(pipes, 0.03, RHO, MU, 400000.0, 250000.0,
+                                         COMMERCIAL_DIAMETERS, (0.1, 5.0), energy_cost=100.0),
+        setup=lambda: make_pipes(30, seed=1),
+        group='otimizacao'
+    ))
+
+    # Monte Carlo de incertezas (sistema de 10 trechos)
+    n_samples = 20000 if quick else 100000
+    water = {'fluid_type': "Água", 'temp': 20.0, 'pressure_inlet': 300000.0}
+    cases.append(BenchmarkCase(
+        f'incerteza/monte_carlo/{n_samples}',
+        lambda model: run_monte_carlo(model, 0.01, 300000.0, water, n_samples=n_samples, seed=0),
+        setup=model_10,
+        group='incerteza'
+    ))
+
+    # Partida do app: importação a frio dos módulos carregados na abertura,
+    # primeira renderização de uma sessão nova e rerun (interação sem
+    # alterações), no modo de navegação e com todas as abas (st.tabs)
+    from components.navigation import VIEW_MODES, VIEWS
+    view_modules = [module for module, _, _, _ in VIEWS.values()]
+    startup = {'navegacao': view_modules[:1], 'abas': view_modules}
+    for (name, modules), view_mode in zip(startup.items(), VIEW_MODES):
+        cases.append(BenchmarkCase(
+            f'inicio/importacao/{name}',
+            lambda _, modules=APP_MODULES + modules: cold_import(modules),
+            group='inicio'
+        ))
+        cases.append(BenchmarkCase(
+            f'inicio/primeira_renderizacao/{name}',
+            lambda _, view_mode=view_mode: app_session(view_mode),
+            group='inicio'
+        ))
+        cases.append(BenchmarkCase(
+            f'inicio/rerun/{name}',
+            lambda app: app.run(),
+            setup=lambda view_mode=view_mode: app_session(view_mode),
+            group='inicio'
+        ))
+
+    return cases
@@ -0,0 +1,18 @@
+import streamlit as st
+
+def render_cache_status(hit, evaluated=None, total=None):
+    """
+    Indica se o resultado exibido veio do cache ou foi recalculado
+    
+    Parâmetros:
+    - hit: True se o resultado foi reaproveitado do cache
+    - evaluated, total: Trechos reavaliados e total de trechos, quando o
+      cálculo reaproveita os trechos não alterados
+    """
+    if hit:
+        st.caption("⚡ Resultado reaproveitado do cache (configuração inalterada)")
+    elif evaluated is not None and evaluated < total:
+        st.caption(f"🧮 Resultado recalculado: {evaluated:,} de {total:,} trechos reavaliados, "
+                   "demais reaproveitados")
+    else:
+        st.caption("🧮 Resultado recalculado para a configuração atual")
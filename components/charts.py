@@ -0,0 +1,48 @@
+import numpy as np
+import plotly.graph_objects as go
+from config.settings import PLOT_MAX_POINTS, PLOT_WEBGL_THRESHOLD, PLOT_MAX_GRID
+from utils.downsampling import decimate_indices, downsample_indices
+
+def line_trace(x, y, customdata=None, max_points=PLOT_MAX_POINTS, method='minmax', **kwargs):
+    """
+    Série de linha com tamanho limitado para o navegador
+
+    Parâmetros:
+    - x, y: Dados da série
+    - customdata: Dados extras por ponto (p.ex. id do trecho), reduzidos junto
+    - max_points: Número máximo de pontos enviados ao gráfico
+    - method: Redução usada acima de max_points ('minmax' ou 'lttb')
+    - kwargs: Demais argumentos de go.Scatter
+
+    Séries com mais de PLOT_WEBGL_THRESHOLD pontos usam go.Scattergl.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if y.size > max_points:
+        idx = downsample_indices(x, y, max_points, method)
+        x, y = x[idx], y[idx]
+        if customdata is not None:
+            customdata = np.asarray(customdata)[idx]
+    if customdata is not None:
+        kwargs['customdata'] = customdata
+
+    trace_class = go.Scattergl if y.size > PLOT_WEBGL_THRESHOLD else go.Scatter
+    return trace_class(x=x, y=y, **kwargs)
+
+def grid_trace(x, y, z, kind='heatmap', max_cells=PLOT_MAX_GRID, **kwargs):
+    """
+    Mapa de calor ou curvas de nível com tamanho limitado para o navegador
+
+    Parâmetros:
+    - x, y: Valores dos eixos
+    - z: Grade (len(y), len(x))
+    - kind: 'heatmap' ou 'contour'
+    - max_cells: Número máximo de linhas e de colunas enviadas ao gráfico;
+      grades maiores são amostradas em índices igualmente espaçados
+    - kwargs: Demais argumentos de go.Heatmap / go.Contour
+    """
+    rows = decimate_indices(len(y), max_cells)
+    columns = decimate_indices(len(x), max_cells)
+    z = np.asarray(z)[np.ix_(rows, columns)]
+    trace_class = go.Contour if kind == 'contour' else go.Heatmap
+    return trace_class(x=np.asarray(x)[columns], y=np.asarray(y)[rows], z=z, **kwargs)
@@ -0,0 +1,99 @@
+import streamlit as st
+from utils.profiling import Profiler, activate, deactivate
+from utils.shared_cache import shared_cache_stats
+
+def begin_profiling():
+    """
+    Liga a instrumentação para este rerun se o painel de desempenho estiver
+    ativado (chamar no início do script)
+
+    Retorna: o Profiler da sessão ou None
+    """
+    if not st.session_state.get('debug_panel', False):
+        deactivate()
+        return None
+
+    if 'profiler' not in st.session_state:
+        st.session_state.profiler = Profiler()
+    profiler = st.session_state.profiler
+    profiler.start_run()
+    activate(profiler)
+    return profiler
+
+def render_debug_panel(profiler):
+    """
+    Renderiza a opção do painel na sidebar e, com ele ativado, os tempos do
+    rerun atual (chamar no fim do script)
+
+    Parâmetros:
+    - profiler: Retorno de begin_profiling
+    """
+    st.sidebar.checkbox("🐞 Painel de desempenho", key='debug_panel',
+                        help="Mede o tempo de cada estágio de cálculo e exibição a cada rerun")
+
+    if profiler is None:
+        return
+
+    # Importado aqui: o pandas só é necessário com o painel ativado
+    import pandas as pd
+
+    deactivate()
+    report = profiler.end_run()
+
+    with st.expander(f"🐞 Desempenho do rerun {report['run']}", expanded=True):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Tempo do rerun", f"{report['total']*1000:.1f} ms")
+        col2.metric("Estágios", len(report['stages']))
+        col3.metric("Reruns registrados", len(profiler.history))
+
+        if report['stages']:
+            stages = pd.DataFrame(report['stages'])
+            st.dataframe(pd.DataFrame({
+                'Estágio': stages['name'],
+                'Chamadas': stages['calls'],
+                'Tempo próprio (ms)': stages['self'] * 1000,
+                'Tempo total (ms)': stages['total'] * 1000,
+                'Médio (ms)': stages['mean'] * 1000,
+                'Máximo (ms)': stages['max'] * 1000,
+                '% do rerun': stages['self'] / report['total'] * 100 if report['total'] > 0 else 0.0
+            }).round(3), use_container_width=True, hide_index=True)
+            st.caption("Tempo próprio desconta os estágios instrumentados chamados dentro de cada estágio; "
+                       "resultados reaproveitados do cache não aparecem como chamadas.")
+
+        st.download_button(
+            "📥 Exportar perfis (JSON)",
+            data=profiler.to_json(),
+            file_name="perfil_desempenho.json",
+            mime="application/json"
+        )
+
+        _render_shared_cache_stats()
+
+def _render_shared_cache_stats():
+    """Ocupação e economia de memória dos caches compartilhados entre as sessões"""
+    import pandas as pd
+
+    stats = pd.DataFrame(shared_cache_stats())
+    if stats.empty:
+        return
+
+    st.markdown("**Caches compartilhados do processo**")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Memória compartilhada", f"{stats['nbytes'].sum() / 1024:,.1f} KiB")
+    col2.metric("Sessões atendidas", int(stats['sessions'].max()))
+    col3.metric("Economia por sessão", f"{stats['bytes_saved_per_session'].sum() / 1024:,.1f} KiB")
+    st.dataframe(pd.DataFrame({
+        'Cache': stats['name'],
+        'Entradas': stats['size'].astype(str) + " / " + stats['maxsize'].astype(str),
+        'Memória (KiB)': stats['nbytes'] / 1024,
+        'Limite (MiB)': stats['max_bytes'] / 2**20,
+        'Acertos': stats['hits'],
+        'Falhas': stats['misses'],
+        'Descartes': stats['evictions'],
+        'Taxa de acerto (%)': stats['hit_rate'] * 100,
+        'Sessões': stats['sessions'],
+        'Economia total (KiB)': stats['bytes_saved'] / 1024
+    }).round(2), use_container_width=True, hide_index=True)
+    st.caption("Tabelas de propriedades, coeficientes K e diagrama de Moody e resultados endereçados "
+               "pelo hash da configuração, calculados uma vez por processo e servidos a todas as sessões; "
+               "a economia conta as cópias que cada sessão calcularia e guardaria sem o compartilhamento.")
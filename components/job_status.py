@@ -0,0 +1,123 @@
+import streamlit as st
+from config.settings import JOB_BACKGROUND_ELEMENTS, JOB_POLL_INTERVAL
+from components.cache_status import render_cache_status
+from utils.jobs import CANCELLED, FAILED, JobLimitReached
+
+def submit_job(jobs, key, func, cache, description):
+    """
+    Inicia a tarefa com JobManager.submit; se a sessão já está no limite de
+    tarefas ativas, avisa na interface e retorna None
+    """
+    try:
+        return jobs.submit(key, func, cache, description=description)
+    except JobLimitReached as error:
+        st.warning(f"⏳ {error}.")
+        return None
+
+def render_job_progress(job, render_partial=None, label="Calculando"):
+    """
+    Acompanha uma tarefa em segundo plano sem bloquear a interface
+
+    Parâmetros:
+    - job: Job de utils.jobs
+    - render_partial: Função que desenha job.partial (resultado parcial)
+    - label: Texto da barra de progresso
+
+    O trecho é um fragmento reexecutado a cada JOB_POLL_INTERVAL segundos;
+    quando a tarefa termina, o app inteiro é reexecutado para exibir o
+    resultado final (lido do cache).
+    """
+    @st.fragment(run_every=JOB_POLL_INTERVAL)
+    def poll():
+        if job.done:
+            st.rerun()
+        st.progress(job.progress, text=f"{label}: {job.progress:.0%} • {job.elapsed:.1f} s")
+        if st.button("✖ Cancelar", key=f"job_cancel_{job.key}"):
+            job.cancel()
+            st.rerun()
+        partial = job.partial
+        if render_partial is not None and partial is not None:
+            render_partial(partial)
+
+    poll()
+
+def render_job_outcome(job):
+    """Mensagem de tarefas canceladas ou com erro (nada nas demais)"""
+    if job is None:
+        return
+    if job.status == CANCELLED:
+        st.warning(f"Cálculo cancelado após {job.elapsed:.1f} s.")
+    elif job.status == FAILED:
+        st.error(f"O cálculo falhou: {job.error}")
+
+def compute_or_submit(cache, jobs, key, compute, elements, description):
+    """
+    Resultado de compute guardado no cache, calculado na hora ou em segundo plano
+
+    Parâmetros:
+    - cache: ResultCache da sessão
+    - jobs: JobManager da sessão
+    - key: Chave do resultado no cache (e da tarefa)
+    - compute: Função compute(progress=None); progress(concluídos, total)
+      é chamada após cada bloco
+    - elements: Número de avaliações do cálculo (pontos x trechos)
+    - description: Nome da tarefa exibido no progresso
+
+    Cálculos com até JOB_BACKGROUND_ELEMENTS avaliações rodam no próprio
+    rerun; os maiores são iniciados automaticamente em segundo plano e o
+    progresso é exibido até o resultado chegar ao cache. Tarefas canceladas
+    ou com erro só são reiniciadas pelo botão.
+
+    Retorna: (resultado, chave da tarefa em andamento); o resultado é None
+    enquanto não houver resultado no cache
+    """
+    if elements <= JOB_BACKGROUND_ELEMENTS:
+        result, hit = cache.get_or_compute(key, compute)
+        render_cache_status(hit)
+        return result, None
+
+    result = cache.get(key)
+    if result is not None:
+        render_cache_status(True)
+        return result, None
+
+    job = jobs.get(key)
+    if job is not None and job.status in (CANCELLED, FAILED):
+        render_job_outcome(job)
+        if not st.button("↻ Calcular novamente", key=f"job_retry_{key}"):
+            return None, None
+    if job is None or job.done:
+        run = lambda job: compute(lambda done, total: job.report(done / total))
+        job = submit_job(jobs, key, run, cache, description)
+        if job is None:
+            return None, None
+    render_job_progress(job, label=description)
+    return None, key
+
+def render_background_jobs(manager, keys=()):
+    """
+    Lista as tarefas em execução que não pertencem à configuração atual
+    (p.ex. após alterar um parâmetro), com opção de cancelá-las
+
+    Parâmetros:
+    - manager: JobManager da sessão
+    - keys: Chaves das tarefas já exibidas junto aos seus gráficos
+    """
+    others = [job for job in manager.active() if job.key not in keys]
+    if not others:
+        return
+
+    @st.fragment(run_every=JOB_POLL_INTERVAL)
+    def poll():
+        running = [job for job in others if not job.done]
+        if not running:
+            st.caption("✅ Cálculos em segundo plano concluídos; os resultados ficam no cache.")
+            return
+        with st.expander(f"⏳ {len(running)} cálculo(s) em segundo plano", expanded=False):
+            for job in running:
+                col1, col2 = st.columns([4, 1])
+                col1.progress(job.progress, text=f"{job.description}: {job.progress:.0%}")
+                if col2.button("✖", key=f"job_cancel_{job.key}", help="Cancelar"):
+                    job.cancel()
+
+    poll()
@@ -0,0 +1,58 @@
+import importlib
+
+import streamlit as st
+from utils.profiling import stage
+
+# Modos de exibição: só a visão selecionada é executada a cada rerun, ou
+# todas as visões em abas (st.tabs executa o conteúdo de todas as abas)
+VIEW_MODES = ["Navegação (só a visão ativa)", "Todas as abas"]
+
+# Visões do app: rótulo -> (módulo, função de renderização, estágio do
+# perfil de desempenho, recebe os dados da sidebar)
+VIEWS = {
+    "📊 Sistema de Tubos": ('tabs.pipe_system', 'render_pipe_system_tab', 'aba/sistema', True),
+    "📈 Simulações": ('tabs.simulations', 'render_simulations_tab', 'aba/simulacoes', True),
+    "🕸️ Redes Malhadas": ('tabs.network', 'render_network_tab', 'aba/redes', True),
+    "🌊 Transientes": ('tabs.transients', 'render_transients_tab', 'aba/transientes', True),
+    "🏞️ Canais Abertos": ('tabs.open_channel', 'render_open_channel_tab', 'aba/canais', False),
+    "ℹ️ Sobre": ('tabs.about', 'render_about_tab', 'aba/sobre', False)
+}
+
+def render_view(label, sidebar_data):
+    """
+    Renderiza uma visão, importando o seu módulo na primeira vez que ela é
+    exibida no processo (a importação fica fora do estágio do perfil)
+    """
+    module, function, name, uses_sidebar = VIEWS[label]
+    render = getattr(importlib.import_module(module), function)
+    with stage(name):
+        if uses_sidebar:
+            render(sidebar_data)
+        else:
+            render()
+
+def render_views(sidebar_data):
+    """
+    Renderiza as visões no modo escolhido na sidebar
+
+    No modo de navegação só a visão selecionada é importada e executada:
+    as demais não custam nada no rerun (nem a importação dos seus módulos,
+    p.ex. o SciPy da aba de redes). Os widgets das visões não exibidas
+    voltam ao valor padrão ao retornar a elas; os trechos e os resultados
+    em cache são mantidos.
+    """
+    mode = st.sidebar.radio(
+        "🧭 Modo de exibição", VIEW_MODES, key='view_mode',
+        help="Navegação executa apenas a visão aberta a cada interação; "
+             "todas as abas recalculam todas as visões a cada interação"
+    )
+
+    if mode == VIEW_MODES[0]:
+        label = st.radio("Visão", list(VIEWS), key='active_view', horizontal=True,
+                         label_visibility='collapsed')
+        render_view(label, sidebar_data)
+        return
+
+    for tab, label in zip(st.tabs(list(VIEWS)), VIEWS):
+        with tab:
+            render_view(label, sidebar_data)
@@ -1,6 +1,22 @@
 import streamlit as st
 from config.settings import TUBE_MATERIALS
 
+# Prefixos das chaves dos campos de cada trecho (chave = prefixo + id)
+PIPE_WIDGET_PREFIXES = (
+    'mat_', 'rough_', 'diam_', 'len_', 'elev_', 'contr_', 'contr_r_', 'exp_', 'exp_r_',
+    'curv_', 'n_curv_', 'vg_', 'vgl_', 'vb_', 'vc_', 'tt_', 'n_tt_', 'tb_', 'n_tb_'
+)
+
+def clear_pipe_widgets(pipe_ids):
+    """
+    Descarta o estado dos campos dos trechos indicados, para que o formulário
+    seja recriado com os valores atuais dos dicionários (após edição pela
+    tabela ou importação)
+    """
+    for pipe_id in pipe_ids:
+        for prefix in PIPE_WIDGET_PREFIXES:
+            st.session_state.pop(f"{prefix}{pipe_id}", None)
+
 def render_pipe_configuration(pipe, idx):
     """
     Renderiza a configuração de um trecho de tubulação
@@ -24,7 +40,7 @@ def render_pipe_configuration(pipe, idx):
             if pipe['material'] == "Personalizado":
                 pipe['roughness'] = st.number_input(
                     f"Rugosidade (m)", 
-                    value=0.000045, 
+                    value=pipe.get('roughness') or 0.000045, 
                     min_value=0.0, 
                     max_value=0.01, 
                     step=0.000001, 
@@ -69,31 +85,31 @@ def render_pipe_configuration(pipe, idx):
             
             with col2a:
                 st.write("**Geometria:**")
-                pipe['has_contraction'] = st.checkbox("Contração", key=f"contr_{pipe['id']}")
+                pipe['has_contraction'] = st.checkbox("Contração", value=pipe.get('has_contraction', False), key=f"contr_{pipe['id']}")
                 if pipe['has_contraction']:
                     pipe['contraction_ratio'] = st.number_input(
                         "Razão D₁/D₂", 
-                        value=2.0, 
+                        value=pipe.get('contraction_ratio', 2.0), 
                         min_value=1.01, 
                         max_value=10.0,
                         key=f"contr_r_{pipe['id']}"
                     )
                 
-                pipe['has_expansion'] = st.checkbox("Expansão", key=f"exp_{pipe['id']}")
+                pipe['has_expansion'] = st.checkbox("Expansão", value=pipe.get('has_expansion', False), key=f"exp_{pipe['id']}")
                 if pipe['has_expansion']:
                     pipe['expansion_ratio'] = st.number_input(
                         "Razão D₂/D₁", 
-                        value=2.0, 
+                        value=pipe.get('expansion_ratio', 2.0), 
                         min_value=1.01, 
                         max_value=10.0,
                         key=f"exp_r_{pipe['id']}"
                     )
                 
-                pipe['has_curves'] = st.checkbox("Curvas 90°", key=f"curv_{pipe['id']}")
+                pipe['has_curves'] = st.checkbox("Curvas 90°", value=pipe.get('has_curves', False), key=f"curv_{pipe['id']}")
                 if pipe['has_curves']:
                     pipe['n_curves'] = st.number_input(
                         "Número", 
-                        value=1, 
+                        value=max(1, pipe.get('n_curves', 1)), 
                         min_value=1, 
                         max_value=20,
                         key=f"n_curv_{pipe['id']}"
@@ -101,27 +117,27 @@ def render_pipe_configuration(pipe, idx):
             
             with col2b:
                 st.write("**Válvulas:**")
-                pipe['has_valve_gate'] = st.checkbox("Gaveta", key=f"vg_{pipe['id']}")
-                pipe['has_valve_globe'] = st.checkbox("Globo", key=f"vgl_{pipe['id']}")
-                pipe['has_valve_ball'] = st.checkbox("Esfera", key=f"vb_{pipe['id']}")
-                pipe['has_valve_check'] = st.checkbox("Retenção", key=f"vc_{pipe['id']}")
+                pipe['has_valve_gate'] = st.checkbox("Gaveta", value=pipe.get('has_valve_gate', False), key=f"vg_{pipe['id']}")
+                pipe['has_valve_globe'] = st.checkbox("Globo", value=pipe.get('has_valve_globe', False), key=f"vgl_{pipe['id']}")
+                pipe['has_valve_ball'] = st.checkbox("Esfera", value=pipe.get('has_valve_ball', False), key=f"vb_{pipe['id']}")
+                pipe['has_valve_check'] = st.checkbox("Retenção", value=pipe.get('has_valve_check', False), key=f"vc_{pipe['id']}")
                 
                 st.write("**Tês:**")
-                pipe['has_tee_through'] = st.checkbox("Passagem direta", key=f"tt_{pipe['id']}")
+                pipe['has_tee_through'] = st.checkbox("Passagem direta", value=pipe.get('has_tee_through', False), key=f"tt_{pipe['id']}")
                 if pipe['has_tee_through']:
                     pipe['n_tee_through'] = st.number_input(
                         "Qtd", 
-                        value=1, 
+                        value=max(1, pipe.get('n_tee_through', 1)), 
                         min_value=1, 
                         max_value=10,
                         key=f"n_tt_{pipe['id']}"
                     )
                 
-                pipe['has_tee_branch'] = st.checkbox("Lateral", key=f"tb_{pipe['id']}")
+                pipe['has_tee_branch'] = st.checkbox("Lateral", value=pipe.get('has_tee_branch', False), key=f"tb_{pipe['id']}")
                 if pipe['has_tee_branch']:
                     pipe['n_tee_branch'] = st.number_input(
                         "Qtd", 
-                        value=1, 
+                        value=max(1, pipe.get('n_tee_branch', 1)), 
                         min_value=1, 
                         max_value=10,
                         key=f"n_tb_{pipe['id']}"
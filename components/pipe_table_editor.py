@@ -0,0 +1,209 @@
+import importlib.util
+
+import streamlit as st
+import pandas as pd
+from config.settings import TUBE_MATERIALS, PIPE_TABLE_THRESHOLD, PIPE_TABLE_PAGE_SIZES
+from components.pipe_config import clear_pipe_widgets
+from utils.pipe_segment import new_pipe
+from utils.pipe_table import (
+    PIPE_DEFAULTS, NUMERIC_LIMITS, frame_to_pipes, pipes_to_frame, read_pipe_file,
+    validate_pipe_frame, write_pipe_file
+)
+from utils.profiling import timed
+
+EDIT_MODES = ["Formulário por trecho", "Tabela"]
+
+# Rótulos das colunas no editor
+_COLUMN_LABELS = {
+    'id': "Trecho",
+    'material': "Material",
+    'roughness': "Rugosidade (m)",
+    'diameter': "Diâmetro (m)",
+    'length': "Comprimento (m)",
+    'elevation_change': "Desnível (m)",
+    'has_contraction': "Contração",
+    'contraction_ratio': "Razão D₁/D₂",
+    'has_expansion': "Expansão",
+    'expansion_ratio': "Razão D₂/D₁",
+    'has_curves': "Curvas 90°",
+    'n_curves': "Nº curvas",
+    'has_valve_gate': "Gaveta",
+    'has_valve_globe': "Globo",
+    'has_valve_ball': "Esfera",
+    'has_valve_check': "Retenção",
+    'has_tee_through': "Tê direto",
+    'n_tee_through': "Nº tês diretos",
+    'has_tee_branch': "Tê lateral",
+    'n_tee_branch': "Nº tês laterais"
+}
+
+def render_edit_mode_selector():
+    """
+    Renderiza a escolha entre o formulário por trecho e a tabela
+
+    Retorna: True no modo tabela
+    """
+    if 'pipe_edit_mode' not in st.session_state:
+        large = len(st.session_state.pipes) > PIPE_TABLE_THRESHOLD
+        st.session_state.pipe_edit_mode = EDIT_MODES[1] if large else EDIT_MODES[0]
+    mode = st.radio(
+        "Edição dos trechos", EDIT_MODES, horizontal=True, key='pipe_edit_mode',
+        help="A tabela edita uma página de trechos por vez e é indicada para sistemas longos"
+    )
+    return mode == EDIT_MODES[1]
+
+def _replace_pipes(frame):
+    """Substitui os trechos da sessão pelos da tabela importada"""
+    clear_pipe_widgets([pipe['id'] for pipe in st.session_state.pipes])
+    st.session_state.pipes = frame_to_pipes(frame)
+    st.session_state.pipe_table_version = st.session_state.get('pipe_table_version', 0) + 1
+    st.session_state.pipe_page = 1
+
+@timed('trechos/importacao')
+def render_pipe_import_export():
+    """Renderiza a importação e a exportação da lista de trechos em CSV/Parquet"""
+    pipes = st.session_state.pipes
+    parquet_available = importlib.util.find_spec('pyarrow') is not None
+
+    with st.expander("📂 Importar / exportar trechos (CSV ou Parquet)", expanded=False):
+        st.caption(
+            "Uma linha por trecho, com as colunas: " + ", ".join(PIPE_DEFAULTS) + ". "
+            "Colunas ausentes recebem o valor padrão; CSV com separador ';' usa vírgula decimal."
+        )
+
+        col1, col2, col3 = st.columns(3)
+        # Os arquivos são gerados só no clique (data como função)
+        col1.download_button(
+            "📥 Exportar CSV",
+            data=lambda: write_pipe_file(pipes_to_frame(pipes), 'csv'),
+            file_name="trechos.csv", mime="text/csv", use_container_width=True
+        )
+        col2.download_button(
+            "📥 Exportar Parquet",
+            data=lambda: write_pipe_file(pipes_to_frame(pipes), 'parquet'),
+            file_name="trechos.parquet", mime="application/octet-stream",
+            disabled=not parquet_available, use_container_width=True,
+            help=None if parquet_available else "Requer o pacote pyarrow"
+        )
+        col3.download_button(
+            "📥 Exportar compacto",
+            data=lambda: write_pipe_file(pipes_to_frame(pipes), 'npz'),
+            file_name="trechos.npz", mime="application/octet-stream", use_container_width=True,
+            help="Colunas NumPy comprimidas (.npz): o formato mais rápido para sistemas grandes"
+        )
+
+        version = st.session_state.get('pipe_table_version', 0)
+        uploaded = st.file_uploader(
+            "Importar trechos", type=['csv', 'parquet', 'npz'], key=f"pipe_upload_{version}"
+        )
+        if uploaded is None:
+            return
+
+        try:
+            raw = read_pipe_file(uploaded.getvalue(), uploaded.name)
+        except ImportError as error:
+            st.error(str(error))
+            return
+        except (ValueError, UnicodeDecodeError, pd.errors.ParserError) as error:
+            st.error(f"Não foi possível ler o arquivo: {error}")
+            return
+
+        frame, errors = validate_pipe_frame(raw)
+        if len(errors):
+            st.error(f"{len(errors):,} problema(s) em {errors['linha'].nunique():,} linha(s); "
+                     "corrija o arquivo e importe novamente.")
+            st.dataframe(errors.rename(columns=str.capitalize).head(1000),
+                         use_container_width=True, hide_index=True)
+            if len(errors) > 1000:
+                st.caption("Mostrando os 1.000 primeiros problemas.")
+            return
+
+        st.success(f"{len(frame):,} trechos válidos em {uploaded.name}.")
+        st.button("✅ Substituir trechos", on_click=_replace_pipes, args=(frame,), type="primary")
+
+def _add_pipes():
+    """Acrescenta trechos com os valores padrão ao fim da lista"""
+    pipes = st.session_state.pipes
+    count = int(st.session_state.pipe_bulk_count)
+    next_id = max((pipe['id'] for pipe in pipes), default=0) + 1
+    pipes.extend(new_pipe(pipe_id) for pipe_id in range(next_id, next_id + count))
+
+def _remove_pipes():
+    """Remove os últimos trechos (ao menos um trecho é mantido)"""
+    pipes = st.session_state.pipes
+    count = min(int(st.session_state.pipe_bulk_count), len(pipes) - 1)
+    if count > 0:
+        clear_pipe_widgets([pipe['id'] for pipe in pipes[-count:]])
+        del pipes[-count:]
+
+def _column_config():
+    """Configuração das colunas do editor (tipos e faixas)"""
+    config = {
+        'id': st.column_config.NumberColumn(_COLUMN_LABELS['id'], disabled=True),
+        'material': st.column_config.SelectboxColumn(
+            _COLUMN_LABELS['material'], options=list(TUBE_MATERIALS), required=True
+        )
+    }
+    for name, (low, high) in NUMERIC_LIMITS.items():
+        integer = name.startswith('n_')
+        config[name] = st.column_config.NumberColumn(
+            _COLUMN_LABELS[name], min_value=low, max_value=high,
+            step=1 if integer else None, format="%d" if integer else None
+        )
+    config['roughness'] = st.column_config.NumberColumn(
+        _COLUMN_LABELS['roughness'], min_value=0.0, max_value=0.01, format="%.7f",
+        help="Usada apenas com o material Personalizado; nos demais vem da tabela de materiais"
+    )
+    for name in PIPE_DEFAULTS:
+        if name.startswith('has_'):
+            config[name] = st.column_config.CheckboxColumn(_COLUMN_LABELS[name])
+    return config
+
+@timed('trechos/tabela')
+def render_pipe_table_editor():
+    """
+    Renderiza o editor em tabela dos trechos, paginado
+
+    Só a página visível é convertida em tabela e enviada ao navegador. As
+    edições da página são validadas em conjunto e, se válidas, copiadas
+    para st.session_state.pipes.
+    """
+    pipes = st.session_state.pipes
+
+    col1, col2, col3 = st.columns([1, 1, 2])
+    page_size = col1.selectbox("Trechos por página", PIPE_TABLE_PAGE_SIZES, key='pipe_page_size')
+    n_pages = max(1, -(-len(pipes) // page_size))
+    if st.session_state.get('pipe_page', 1) > n_pages:
+        st.session_state.pipe_page = n_pages
+    page = col2.number_input("Página", min_value=1, max_value=n_pages, step=1, key='pipe_page')
+    start = (page - 1) * page_size
+    end = min(start + page_size, len(pipes))
+    col3.caption(f"Trechos {start + 1:,} a {end:,} de {len(pipes):,} (página {page} de {n_pages})")
+
+    version = st.session_state.get('pipe_table_version', 0)
+    key = f"pipe_table_{version}_{page_size}_{page}"
+    frame = pipes_to_frame(pipes[start:end])
+    edited = st.data_editor(
+        frame, column_config=_column_config(), num_rows="fixed", hide_index=True,
+        use_container_width=True, key=key
+    )
+
+    changed_rows = sorted(st.session_state.get(key, {}).get('edited_rows', {}))
+    if changed_rows:
+        validated, errors = validate_pipe_frame(edited)
+        if len(errors):
+            errors = errors.assign(linha=errors['linha'] + start)
+            st.error(f"{len(errors)} problema(s) na página; as edições não foram aplicadas.")
+            st.dataframe(errors.rename(columns=str.capitalize), use_container_width=True, hide_index=True)
+        else:
+            records = frame_to_pipes(validated.iloc[changed_rows])
+            for row, record in zip(changed_rows, records):
+                pipes[start + row].update(record)
+            clear_pipe_widgets([record['id'] for record in records])
+
+    col_n, col_add, col_remove = st.columns([1, 1, 1])
+    col_n.number_input("Quantidade de trechos", min_value=1, max_value=10000, value=1,
+                       step=1, key='pipe_bulk_count')
+    col_add.button("➕ Adicionar trechos", on_click=_add_pipes, use_container_width=True)
+    col_remove.button("➖ Remover últimos", on_click=_remove_pipes,
+                      disabled=len(pipes) <= 1, use_container_width=True)
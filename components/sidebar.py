@@ -37,23 +37,30 @@ def create_sidebar():
             with col2:
                 custom_mu = st.number_input("Viscosidade (Pa.s)", value=0.001, min_value=1e-6, max_value=1.0, step=0.0001, format="%.6f")
         
+        # Lidas da tabela de propriedades compartilhada entre as sessões
         rho, mu, nu = get_fluid_properties(
             fluid_type, temp, pressure_inlet, 
-            gas_molar_mass, custom_rho, custom_mu
+            gas_molar_mass, custom_rho, custom_mu, shared=True
         )
         
         st.info(f"**Propriedades do Fluido:**\n- Densidade: {rho:.2f} kg/m³\n- Viscosidade: {mu:.6f} Pa.s\n- Viscosidade cinemática: {nu:.8f} m²/s")
         
         # Vazão ou Velocidade
         st.subheader("Condições de Escoamento")
-        input_type = st.radio("Entrada por:", ["Vazão (Q)", "Velocidade (V)"])
+        input_type = st.radio("Entrada por:", ["Vazão (Q)", "Velocidade (V)", "Pressão de saída (P)"])
+        pressure_outlet = None
         
         if input_type == "Vazão (Q)":
             flow_rate = st.number_input("Vazão (m³/s)", value=0.01571, min_value=0.0001, max_value=10.0, step=0.001, format="%.5f")
             velocity = None
-        else:
+        elif input_type == "Velocidade (V)":
             velocity = st.number_input("Velocidade (m/s)", value=2.0, min_value=0.01, max_value=50.0, step=0.1)
             flow_rate = None
+        else:
+            pressure_outlet = st.number_input("Pressão de saída (Pa)", value=250000.0, min_value=0.0, max_value=1e7, step=1000.0,
+                                              help="A vazão é calculada para produzir esta pressão no fim do sistema")
+            flow_rate = None
+            velocity = None
         
         return {
             'fluid_type': fluid_type,
@@ -65,5 +72,6 @@ def create_sidebar():
             'nu': nu,
             'input_type': input_type,
             'flow_rate': flow_rate,
-            'velocity': velocity
+            'velocity': velocity,
+            'pressure_outlet': pressure_outlet
         }
\ No newline at end of file
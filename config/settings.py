@@ -1,7 +1,10 @@
-import streamlit as st
+import os
 
 def configure_page():
     """Configura as propriedades da página Streamlit"""
+    # Importado aqui para que os módulos de cálculo possam ser usados sem o Streamlit
+    import streamlit as st
+    
     st.set_page_config(
         page_title="Simulação de Escoamento",
         page_icon="🌊",
@@ -13,6 +16,9 @@ def configure_page():
 GRAVITY = 9.81  # m/s²
 GAS_CONSTANT = 8.314  # J/(mol·K)
 AIR_GAS_CONSTANT = 287.05  # J/(kg·K)
+GAS_HEAT_CAPACITY_RATIO = 1.4  # cp/cv do ar (gases diatômicos)
+ATMOSPHERIC_PRESSURE = 101325.0  # Pa
+WATER_VAPOR_PRESSURE = 2339.0  # Pa, água a 20 °C
 
 # Materiais de tubulação e suas rugosidades
 TUBE_MATERIALS = {
@@ -25,9 +31,87 @@ TUBE_MATERIALS = {
     "Personalizado": None
 }
 
+# Módulo de elasticidade da parede (Pa), usado na celeridade do golpe de aríete
+PIPE_ELASTIC_MODULUS = {
+    "PVC": 3.0e9,
+    "Cobre": 1.17e11,
+    "Aço comercial": 2.07e11,
+    "Aço galvanizado": 2.07e11,
+    "Concreto": 2.5e10,
+    "Ferro fundido": 1.0e11,
+    "Personalizado": None
+}
+
+# Módulo de compressibilidade volumétrica dos líquidos (Pa)
+FLUID_BULK_MODULUS = {
+    "Água": 2.19e9,
+    "Óleo": 1.5e9
+}
+
 # Velocidades recomendadas para água (m/s)
 WATER_VELOCITY_MIN = 0.5
 WATER_VELOCITY_MAX = 3.0
 
 # Velocidade máxima recomendada para ar (m/s)
 AIR_VELOCITY_MAX = 15.0
+
+# Diâmetros internos comerciais usados na otimização (m)
+COMMERCIAL_DIAMETERS = [
+    0.025, 0.032, 0.040, 0.050, 0.065, 0.075, 0.100, 0.125,
+    0.150, 0.200, 0.250, 0.300, 0.350, 0.400, 0.500
+]
+
+# Custo de tubulação instalada: a·D^b (R$/m, D em m)
+PIPE_COST_COEFFICIENT = 1500.0
+PIPE_COST_EXPONENT = 1.5
+
+# Custo de bombeamento ao longo da vida útil
+ENERGY_PRICE = 0.80  # R$/kWh
+PUMP_EFFICIENCY = 0.70
+OPERATING_HOURS_PER_YEAR = 6000.0
+DESIGN_LIFE_YEARS = 20
+
+# Limites dos gráficos (tamanho do conteúdo enviado ao navegador)
+PLOT_MAX_POINTS = 2000  # pontos por série, após a redução
+PLOT_WEBGL_THRESHOLD = 1000  # séries maiores usam WebGL (Scattergl)
+PLOT_MAX_LABELS = 30  # rótulos de trechos por gráfico
+PLOT_MAX_BARS = 200  # barras por série; acima disso, trechos vizinhos são agrupados
+PLOT_MAX_GRID = 200  # linhas/colunas de mapas de calor e curvas de nível
+
+# Varreduras 2D: grades até este número de avaliações (pontos x trechos)
+# são calculadas automaticamente; acima disso, só ao clicar no botão
+GRID_SWEEP_AUTO_ELEMENTS = 2_000_000
+
+# Varredura de vazão, comparação de materiais e ponto de operação: acima
+# deste número de avaliações (pontos x trechos) o cálculo roda em segundo
+# plano, com progresso e cancelamento, em vez de bloquear o rerun
+JOB_BACKGROUND_ELEMENTS = 2_000_000
+
+# Edição dos trechos em tabela
+PIPE_TABLE_THRESHOLD = 20  # acima disso a edição começa no modo tabela
+PIPE_TABLE_PAGE_SIZES = (100, 250, 500, 1000)  # trechos por página do editor
+
+# Número máximo de resultados de simulação guardados por sessão
+RESULT_CACHE_MAXSIZE = 64
+
+# Cálculos em segundo plano: threads do pool compartilhado pelo processo
+# (uma por núcleo, no mínimo 2), tarefas simultâneas de uma mesma sessão
+# (as demais sessões continuam com threads livres), intervalo (s) de
+# atualização do progresso e tarefas terminadas mantidas
+JOB_MAX_WORKERS = max(2, os.cpu_count() or 1)
+JOB_MAX_ACTIVE_PER_SESSION = 2
+JOB_POLL_INTERVAL = 0.5
+JOB_HISTORY = 16
+
+# Cache de resultados compartilhado por todas as sessões do processo
+# (consultado antes de calcular): entradas e memória máximas
+SHARED_CACHE_MAXSIZE = 256
+SHARED_CACHE_MAX_BYTES = 256 * 2**20
+
+# Tabelas compartilhadas por todas as sessões (propriedades dos fluidos,
+# coeficientes K e diagrama de Moody): entradas e memória máximas de cada
+# tabela. A de coeficientes K tem uma entrada pequena por combinação de
+# razões de contração e expansão dos trechos.
+SHARED_TABLE_MAXSIZE = 256
+SHARED_TABLE_MAX_BYTES = 64 * 2**20
+SHARED_K_TABLE_MAXSIZE = 4096
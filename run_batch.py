@@ -0,0 +1,39 @@
+"""
+Execução em lote (sem interface) de casos de projeto
+
+Uso:
+    python run_batch.py casos.json [outros.yaml ...] -o resultados.jsonl -j 8
+
+Cada arquivo pode conter um caso, uma lista de casos ou um objeto
+{"defaults": {...}, "cases": [...]}. Os trechos de cada caso seguem o mesmo
+formato de st.session_state.pipes.
+"""
+import argparse
+import sys
+import time
+
+from utils.engine import load_cases, run_batch
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulação de escoamento em lote")
+    parser.add_argument('inputs', nargs='+', help="Arquivos de casos (.json, .jsonl, .yaml)")
+    parser.add_argument('-o', '--output', default='resultados.jsonl', help="Arquivo JSON Lines de saída")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Número de processos (padrão: CPUs)")
+    parser.add_argument('--chunksize', type=int, default=None, help="Casos por tarefa enviada a cada processo")
+    args = parser.parse_args(argv)
+
+    cases = []
+    for path in args.inputs:
+        cases.extend(load_cases(path))
+
+    start = time.perf_counter()
+    n_done, n_errors = run_batch(cases, args.output, args.workers, args.chunksize)
+    elapsed = time.perf_counter() - start
+
+    print(f"{n_done} casos em {elapsed:.2f} s ({n_done/max(elapsed, 1e-9):.1f} casos/s), "
+          f"{n_errors} com erro -> {args.output}")
+
+    return 1 if n_errors else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Benchmarks de desempenho (sem navegador; os casos inicio/ executam o app com o AppTest)
+
+Uso:
+    python run_benchmarks.py                       # compara com a linha de base
+    python run_benchmarks.py --update --rounds 3   # grava/atualiza a linha de base
+    python run_benchmarks.py --filter sistema --threshold 0.5
+
+Sai com código 1 se algum caso ficar mais lento (ou usar mais memória)
+que a linha de base além do limite configurado. Tempos dependem da máquina:
+a linha de base deve ser gravada no mesmo ambiente em que será comparada.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.cases import build_cases
+from utils.benchmark import best_of, compare_to_baseline, load_baseline, run_suite, save_baseline
+
+DEFAULT_BASELINE = Path(__file__).parent / 'benchmarks' / 'baseline.json'
+
+def _format_time(seconds):
+    if seconds < 1e-3:
+        return f"{seconds*1e6:9.1f} µs"
+    if seconds < 1:
+        return f"{seconds*1e3:9.2f} ms"
+    return f"{seconds:9.3f} s "
+
+def _format_ratio(ratio):
+    return f"{ratio:6.2f}x" if ratio is not None else "     - "
+
+def _save_results(path, results):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de desempenho do simulador")
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help="Arquivo JSON da linha de base")
+    parser.add_argument('--update', action='store_true', help="Grava os resultados como nova linha de base")
+    parser.add_argument('--threshold', type=float, default=None,
+                        help="Aumento de tempo tolerado (0.25 = 25%%; padrão: o da linha de base)")
+    parser.add_argument('--memory-threshold', type=float, default=None,
+                        help="Aumento de pico de memória tolerado (padrão: o da linha de base)")
+    parser.add_argument('--filter', default=None, help="Executa apenas casos cujo nome contém este texto")
+    parser.add_argument('--quick', action='store_true', help="Omite os tamanhos maiores")
+    parser.add_argument('--repeat', type=int, default=5, help="Repetições por caso")
+    parser.add_argument('--rounds', type=int, default=1,
+                        help="Execuções completas do conjunto; vale o melhor resultado de cada caso")
+    parser.add_argument('--min-time', type=float, default=0.05, help="Duração mínima de cada repetição (s)")
+    parser.add_argument('-o', '--output', default=None, help="Grava os resultados desta execução em JSON")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+    reference = baseline['results'] if baseline is not None else {}
+
+    def progress(case, result):
+        previous = reference.get(case.name)
+        ratio = result['time_min'] / previous['time_min'] if previous else None
+        print(f"{case.name:36s} {_format_time(result['time_min'])} "
+              f"{result['memory_peak']/1024:10.1f} KiB  {_format_ratio(ratio)}", flush=True)
+
+    print(f"{'caso':36s} {'tempo':>12s} {'pico mem.':>14s}  {'vs base':>7s}")
+    results = best_of(*[
+        run_suite(build_cases(args.quick), args.repeat, args.min_time, args.filter, progress)
+        for _ in range(args.rounds)
+    ])
+
+    if args.output:
+        _save_results(args.output, results)
+
+    if args.update:
+        if baseline is not None:
+            # Casos não executados agora (filtro, --quick) são preservados
+            results = {**baseline['results'], **results}
+        # Limites informados na linha de comando substituem os gravados
+        stored = baseline or {}
+        time_threshold = args.threshold if args.threshold is not None else stored.get('time_threshold', 0.25)
+        memory_threshold = (args.memory_threshold if args.memory_threshold is not None
+                            else stored.get('memory_threshold', 0.25))
+        save_baseline(args.baseline, results, time_threshold, memory_threshold)
+        print(f"\nLinha de base gravada em {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"\nSem linha de base em {args.baseline}; use --update para gravá-la.")
+        return 0
+
+    comparison = compare_to_baseline(results, baseline, args.threshold, args.memory_threshold)
+    regressions = [item for item in comparison if item['status'] == 'regressão']
+
+    # Casos acima do limite são medidos de novo antes de contar como
+    # regressão, para descartar picos de carga da máquina
+    if regressions:
+        suspects = {item['name'] for item in regressions}
+        print(f"\nConfirmando {len(suspects)} caso(s) acima do limite...")
+        cases = [case for case in build_cases(args.quick) if case.name in suspects]
+        results = best_of(results, run_suite(cases, args.repeat, args.min_time, progress=progress))
+        comparison = compare_to_baseline(results, baseline, args.threshold, args.memory_threshold)
+        regressions = [item for item in comparison if item['status'] == 'regressão']
+
+    improvements = [item for item in comparison if item['status'] == 'melhoria']
+
+    print(f"\n{len(comparison)} casos: {len(regressions)} regressões, {len(improvements)} melhorias")
+    for item in regressions:
+        reasons = []
+        if item['slower']:
+            reasons.append(f"tempo {item['time_ratio']:.2f}x")
+        if item['bigger']:
+            reasons.append(f"memória {item['memory_ratio']:.2f}x")
+        print(f"  REGRESSÃO {item['name']}: {', '.join(reasons)}")
+
+    if args.output:
+        _save_results(args.output, results)
+
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
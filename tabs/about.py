@@ -14,11 +14,12 @@ def render_about_tab():
     - Seleção de fluidos pré-configurados: Água, Ar, Óleo leve, Gás ideal ou Personalizado
     - Ajuste de temperatura de operação (-50°C a 500°C)
     - Configuração de pressão inicial do sistema
-    - Entrada por vazão ou velocidade
+    - Entrada por vazão, velocidade ou pressão de saída (cálculo inverso da vazão)
     - Cálculo automático de propriedades termofísicas
     
     #### Sistema de Tubulações em Série
     - **Múltiplos trechos**: Adicione quantos trechos precisar
+    - **Tabela de trechos**: Edição em tabela paginada e importação/exportação em CSV, Parquet ou .npz compacto, com validação de todas as linhas
     - **Materiais variados**: PVC, Cobre, Aço comercial, Aço galvanizado, Concreto, Ferro fundido
     - **Variação de diâmetro** entre trechos
     - **Desnível**: Configure elevações positivas ou negativas
@@ -29,16 +30,33 @@ def render_about_tab():
       - Tês (passagem direta e lateral)
     - **Perfil de pressão**: Visualize a pressão ao longo de todo o sistema
     - **Alertas de velocidade**: Verificação automática de faixas recomendadas
+    - **Gases compressíveis**: Densidade recalculada na pressão local (escoamento isotérmico com passo adaptativo), número de Mach e detecção de estrangulamento
+    - **Otimização de diâmetros**: Escolha dos diâmetros comerciais de menor custo (tubulação + bombeamento) respeitando velocidades e pressão mínima na saída
+    
+    #### Redes Malhadas
+    - Nós com demanda, reservatórios de carga fixa e trechos formando malhas
+    - Solução pelo método do gradiente global (Todini-Pilati) com matrizes esparsas
+    - Relatório de iterações e resíduos de energia e continuidade
+    
+    #### Transientes Hidráulicos
+    - Golpe de aríete pelo método das características, com celeridade a partir do material e do fluido
+    - Fechamento de válvula com lei τ = (1 - t/T)^Em ou desligamento de bomba com retenção
+    - Envoltória de pressões máximas e mínimas em até ~10^5 nós e alerta de cavitação
     
     #### Análise de Canais Abertos
-    - Cálculo de profundidade normal e crítica
-    - Número de Froude e classificação de regime
-    - Geometria hidráulica completa
+    - Profundidades normal e crítica em seções retangulares, trapezoidais e circulares (Newton vetorizado)
+    - Número de Froude e classificação de regime e da curva de remanso (M1, M2, S1, ...)
+    - Curvas de remanso por Runge-Kutta de 4ª ordem e lotes com milhares de canais
     
     #### Simulações Avançadas
     - Variação de vazão: Análise de perda de carga e velocidade
     - Variação de pressão de entrada
-    - Comparação entre materiais
+    - Varredura 2D de dois parâmetros (vazão, temperatura, pressão, diâmetro, rugosidade, comprimento) com mapas de calor e curvas de nível
+    - Comparação entre materiais: troca de todo o sistema e matriz trecho x material ordenada pelo ganho
+    - Análise de incertezas por Monte Carlo (percentis P5/P50/P95 da perda de carga e da pressão de saída)
+    - Varreduras 2D grandes e Monte Carlo em segundo plano, com resultado parcial e cancelamento
+    - Varredura de vazão, comparação de materiais e ponto de operação de sistemas grandes também em segundo plano
+    - Diagrama de Moody com os trechos do sistema, curvas de propriedades e coeficientes K (tabelas compartilhadas entre sessões)
     - Gráficos interativos e exportáveis
     
     ### 📊 Métodos de Cálculo
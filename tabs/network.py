@@ -0,0 +1,140 @@
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+from config.settings import GRAVITY, TUBE_MATERIALS, RESULT_CACHE_MAXSIZE
+from components.cache_status import render_cache_status
+from utils.network import PipeNetwork, solve_network
+from utils.result_cache import config_hash, fluid_key, get_result_cache
+
+def render_network_tab(sidebar_data):
+    """Renderiza a aba de Redes Malhadas"""
+    st.header("Redes de Tubulações Malhadas")
+
+    st.markdown("""
+    Rede com nós (junções com demanda e reservatórios de carga fixa) e trechos ligando pares de nós.
+    As vazões e cargas são obtidas pelo **método do gradiente global** (Todini-Pilati), com a mesma
+    perda de carga (Darcy-Weisbach + acessórios) do sistema em série. A vazão de um trecho é positiva
+    no sentido "De" → "Para".
+    """)
+
+    rho = sidebar_data['rho']
+    mu = sidebar_data['mu']
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.write("**Nós:**")
+        nodes_table = st.data_editor(
+            pd.DataFrame({
+                'Nó': ['R1', 'A', 'B', 'C', 'D'],
+                'Cota (m)': [50.0, 20.0, 22.0, 18.0, 15.0],
+                'Demanda (L/s)': [0.0, 10.0, 15.0, 10.0, 20.0],
+                'Carga fixa (m)': [60.0, None, None, None, None]
+            }),
+            num_rows="dynamic",
+            key="network_nodes_table"
+        ).dropna(subset=['Nó'])
+        st.caption("Preencha 'Carga fixa' apenas nos reservatórios.")
+
+    with col2:
+        st.write("**Trechos:**")
+        materials = [name for name in TUBE_MATERIALS if TUBE_MATERIALS[name] is not None]
+        links_table = st.data_editor(
+            pd.DataFrame({
+                'Trecho': ['1', '2', '3', '4', '5', '6'],
+                'De': ['R1', 'A', 'A', 'B', 'C', 'B'],
+                'Para': ['A', 'B', 'C', 'D', 'D', 'C'],
+                'Diâmetro (m)': [0.25, 0.15, 0.15, 0.1, 0.15, 0.1],
+                'Comprimento (m)': [800.0, 400.0, 500.0, 400.0, 300.0, 350.0],
+                'Material': ['Ferro fundido', 'PVC', 'PVC', 'PVC', 'PVC', 'PVC'],
+                'K acessórios': [0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+            }),
+            num_rows="dynamic",
+            key="network_links_table",
+            column_config={
+                'Material': st.column_config.SelectboxColumn('Material', options=materials, required=True)
+            }
+        ).dropna(subset=['Trecho', 'De', 'Para'])
+
+    nodes = [
+        {
+            'name': str(row['Nó']),
+            'elevation': float(row['Cota (m)']) if pd.notna(row['Cota (m)']) else 0.0,
+            'demand': float(row['Demanda (L/s)']) / 1000 if pd.notna(row['Demanda (L/s)']) else 0.0,
+            'head': float(row['Carga fixa (m)']) if pd.notna(row['Carga fixa (m)']) else None
+        }
+        for _, row in nodes_table.iterrows()
+    ]
+    links = [
+        {
+            'name': str(row['Trecho']),
+            'start': str(row['De']),
+            'end': str(row['Para']),
+            'diameter': float(row['Diâmetro (m)']),
+            'length': float(row['Comprimento (m)']),
+            'material': row['Material'],
+            'K_total': float(row['K acessórios']) if pd.notna(row['K acessórios']) else 0.0
+        }
+        for _, row in links_table.iterrows()
+    ]
+
+    try:
+        network = PipeNetwork.from_records(nodes, links)
+    except (ValueError, KeyError, TypeError) as e:
+        st.error(f"Rede inválida: {e}")
+        return
+
+    cache = get_result_cache(st.session_state, RESULT_CACHE_MAXSIZE)
+    solution, hit = cache.get_or_compute(
+        config_hash(fluid_key(sidebar_data), 'network', nodes, links),
+        lambda: solve_network(network, rho, mu, g=GRAVITY)
+    )
+    render_cache_status(hit)
+
+    col_a, col_b, col_c = st.columns(3)
+    col_a.metric("Iterações", solution['iterations'])
+    col_b.metric("Resíduo de energia", f"{solution['energy_residual']:.2e} m")
+    col_c.metric("Resíduo de continuidade", f"{solution['continuity_residual']*1000:.2e} L/s")
+
+    if not solution['converged']:
+        st.warning("O método não convergiu no número máximo de iterações; os resultados são aproximados.")
+
+    st.subheader("Resultados nos Nós")
+    st.dataframe(pd.DataFrame({
+        'Nó': network.node_names,
+        'Carga (m)': solution['head'],
+        'Pressão (kPa)': solution['pressure'] / 1000,
+        'Tipo': ['Reservatório' if fixed else 'Junção' for fixed in network.is_fixed]
+    }), use_container_width=True)
+
+    st.subheader("Resultados nos Trechos")
+    st.dataframe(pd.DataFrame({
+        'Trecho': network.link_names,
+        'Vazão (L/s)': solution['flow_rate'] * 1000,
+        'Velocidade (m/s)': solution['velocity'],
+        'Re': solution['reynolds'],
+        'f': solution['friction_factor'],
+        'Perda (m)': solution['head_loss']
+    }), use_container_width=True)
+
+    history = pd.DataFrame(solution['residuals'])
+    fig_res = go.Figure()
+    fig_res.add_trace(go.Scatter(
+        x=history['iteration'], y=history['energy'], mode='lines+markers',
+        name='Energia (m)', line=dict(color='#00d4ff', width=3)
+    ))
+    fig_res.add_trace(go.Scatter(
+        x=history['iteration'], y=history['relative_change'], mode='lines+markers',
+        name='Σ|ΔQ|/Σ|Q|', line=dict(color='#ff6b6b', width=3)
+    ))
+    fig_res.update_layout(
+        title="Convergência do Método do Gradiente Global",
+        xaxis_title="Iteração",
+        yaxis_title="Resíduo",
+        yaxis_type="log",
+        paper_bgcolor='#1f3044',
+        plot_bgcolor='#2d4059',
+        font=dict(color='#e0fbfc'),
+        legend=dict(bgcolor='#2d4059', bordercolor='#3d5a73', borderwidth=1)
+    )
+    st.plotly_chart(fig_res, use_container_width=True)
@@ -0,0 +1,198 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from components.charts import line_trace
+from utils.open_channel import SECTION_SHAPES, ChannelSections, water_surface_profiles
+from utils.profiling import timed
+
+# Colunas do lote de canais
+BATCH_COLUMNS = ['Canal', 'Forma', 'Largura b (m)', 'Talude z (H:V)', 'Diâmetro D (m)', 'Manning n',
+                 'Declividade S₀', 'Vazão (m³/s)', 'Comprimento (m)', 'Prof. controle (m)']
+
+def render_open_channel_tab():
+    """Renderiza a aba de Canais Abertos"""
+    st.header("Canais Abertos")
+
+    st.markdown("""
+    Profundidades normal (Manning) e crítica para seções retangulares, trapezoidais e circulares, e curvas
+    de remanso (escoamento gradualmente variado) integradas por Runge-Kutta de 4ª ordem a partir de uma
+    profundidade de controle: a jusante quando o escoamento é subcrítico e a montante quando é supercrítico.
+    """)
+
+    _render_single_channel()
+    st.markdown("---")
+    _render_channel_batch()
+
+def _section_inputs():
+    """Entradas da seção transversal; retorna (forma, b, z, D)"""
+    shape = st.selectbox("Forma da seção", SECTION_SHAPES, key='channel_shape')
+    width, side_slope, diameter = 0.0, 0.0, 0.0
+    if shape == "Circular":
+        diameter = st.number_input("Diâmetro D (m)", value=1.5, min_value=0.05, max_value=20.0,
+                                   step=0.1, key='channel_diameter')
+    else:
+        width = st.number_input("Largura de fundo b (m)", value=3.0, min_value=0.0, max_value=200.0,
+                                step=0.5, key='channel_width')
+        if shape == "Trapezoidal":
+            side_slope = st.number_input("Talude z (H:V)", value=1.5, min_value=0.0, max_value=10.0,
+                                         step=0.25, key='channel_side_slope')
+    return shape, width, side_slope, diameter
+
+def _render_single_channel():
+    """Renderiza o cálculo de um canal com sua curva de remanso"""
+    st.subheader("Canal")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        shape, width, side_slope, diameter = _section_inputs()
+    with col2:
+        flow_rate = st.number_input("Vazão (m³/s)", value=2.0, min_value=0.001, max_value=10000.0,
+                                    step=0.5, key='channel_flow_rate')
+        manning = st.number_input("Coeficiente de Manning n", value=0.015, min_value=0.008, max_value=0.2,
+                                  step=0.001, format="%.3f", key='channel_manning')
+        slope = st.number_input("Declividade do fundo S₀ (m/m)", value=0.001, min_value=-0.1, max_value=0.5,
+                                step=0.0005, format="%.5f", key='channel_slope')
+    with col3:
+        length = st.number_input("Comprimento do canal (m)", value=1000.0, min_value=1.0, max_value=1e6,
+                                 step=100.0, key='channel_length')
+        control_depth = st.number_input("Profundidade de controle (m)", value=1.2, min_value=0.001,
+                                        max_value=100.0, step=0.1, key='channel_control_depth',
+                                        help="Acima da crítica é imposta a jusante; abaixo, a montante")
+
+    sections = ChannelSections.from_shapes(shape, width, side_slope, diameter)
+    profiles = water_surface_profiles(sections, flow_rate, slope, manning, length, control_depth, n_steps=400)
+    normal = profiles['normal_depth'][0]
+    critical = profiles['critical_depth'][0]
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Profundidade normal", f"{normal:.4f} m" if np.isfinite(normal) else "—")
+    col2.metric("Profundidade crítica", f"{critical:.4f} m")
+    if np.isfinite(normal):
+        froude = sections.hydraulics(normal, flow_rate)['froude'][0]
+        col3.metric("Froude (regime uniforme)", f"{froude:.3f}")
+    else:
+        col3.metric("Froude (regime uniforme)", "—")
+    col4.metric("Curva de remanso", profiles['profile'][0])
+
+    if slope <= 0:
+        st.info("Sem declividade positiva não há regime uniforme (curvas H ou A).")
+    elif not np.isfinite(normal):
+        st.warning("A vazão excede a capacidade da seção circular em regime uniforme.")
+    if shape == "Circular" and control_depth >= diameter:
+        st.warning("A profundidade de controle não pode atingir o diâmetro da seção circular.")
+    elif profiles['reached_critical'][0]:
+        side = "montante" if profiles['subcritical'][0] else "jusante"
+        st.warning(f"O perfil atinge a profundidade crítica antes da extremidade de {side} "
+                   "(ressalto hidráulico ou controle insuficiente); o trecho restante não é calculado.")
+
+    _plot_profile(profiles, slope, length, normal, critical)
+
+@timed('figura/remanso')
+def _plot_profile(profiles, slope, length, normal, critical):
+    """Gráfico do fundo, da linha d'água e das profundidades de referência"""
+    x = profiles['station'] * length
+    bed = slope * (length - x)
+    fig = go.Figure()
+    fig.add_trace(line_trace(x, bed, mode='lines', name='Fundo', line=dict(color='#8d6e63', width=2)))
+    fig.add_trace(line_trace(x, bed + profiles['depth'][0], mode='lines', name="Linha d'água",
+                             line=dict(color='#00d4ff', width=3)))
+    if np.isfinite(normal):
+        fig.add_trace(line_trace(x, bed + normal, mode='lines', name='Profundidade normal',
+                                 line=dict(color='#4ecdc4', width=1, dash='dash')))
+    fig.add_trace(line_trace(x, bed + critical, mode='lines', name='Profundidade crítica',
+                             line=dict(color='#ff6b6b', width=1, dash='dot')))
+    fig.update_layout(
+        title=f"Curva de Remanso ({profiles['profile'][0]})",
+        xaxis_title="Distância a partir de montante (m)",
+        yaxis_title="Cota (m, referência no fundo de jusante)",
+        paper_bgcolor='#1f3044',
+        plot_bgcolor='#1f3044',
+        font=dict(color='#ffffff'),
+        height=450
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+def _default_batch():
+    """Lote inicial de exemplo"""
+    return pd.DataFrame({
+        'Canal': ['C1', 'C2', 'C3'],
+        'Forma': ['Retangular', 'Trapezoidal', 'Circular'],
+        'Largura b (m)': [3.0, 2.0, 0.0],
+        'Talude z (H:V)': [0.0, 1.5, 0.0],
+        'Diâmetro D (m)': [0.0, 0.0, 1.5],
+        'Manning n': [0.015, 0.025, 0.013],
+        'Declividade S₀': [0.001, 0.0005, 0.002],
+        'Vazão (m³/s)': [2.0, 5.0, 1.0],
+        'Comprimento (m)': [1000.0, 2000.0, 500.0],
+        'Prof. controle (m)': [1.5, 2.0, None]
+    })
+
+@timed('canal/lote')
+def _solve_batch(table):
+    """Profundidades e curvas de remanso de todos os canais do lote"""
+    sections = ChannelSections.from_shapes(
+        table['Forma'].to_numpy(), table['Largura b (m)'].to_numpy(float),
+        table['Talude z (H:V)'].to_numpy(float), table['Diâmetro D (m)'].to_numpy(float)
+    )
+    flow_rate = table['Vazão (m³/s)'].to_numpy(float)
+    control = table['Prof. controle (m)'].to_numpy(float)
+    profiles = water_surface_profiles(
+        sections, flow_rate, table['Declividade S₀'].to_numpy(float), table['Manning n'].to_numpy(float),
+        table['Comprimento (m)'].to_numpy(float), control, n_steps=100
+    )
+    normal = profiles['normal_depth']
+    froude = sections.hydraulics(np.where(np.isfinite(normal), normal, 1.0), flow_rate)['froude']
+    has_control = np.isfinite(control)
+    return pd.DataFrame({
+        'Canal': table['Canal'].to_numpy(),
+        'Prof. normal (m)': normal,
+        'Prof. crítica (m)': profiles['critical_depth'],
+        'Froude normal': np.where(np.isfinite(normal), froude, np.nan),
+        'Regime uniforme': np.where(np.isnan(normal), "—",
+                                    np.where(normal > profiles['critical_depth'], "Subcrítico", "Supercrítico")),
+        'Curva': np.where(has_control, profiles['profile'], "—"),
+        'Prof. na outra extremidade (m)': np.where(has_control, profiles['end_depth'], np.nan),
+        'Atinge a crítica': has_control & profiles['reached_critical']
+    })
+
+def _render_channel_batch():
+    """Renderiza o lote de canais (uma linha por canal)"""
+    st.subheader("Lote de Canais")
+    st.caption(
+        "Uma linha por canal; as linhas podem ser coladas de uma planilha ou importadas em CSV com as colunas: "
+        + ", ".join(BATCH_COLUMNS) + ". Sem profundidade de controle, só as profundidades são calculadas."
+    )
+
+    uploaded = st.file_uploader("Importar lote (CSV)", type=['csv'], key='channel_batch_upload')
+    data = _default_batch()
+    if uploaded is not None:
+        try:
+            data = pd.read_csv(uploaded, sep=None, engine='python').reindex(columns=BATCH_COLUMNS)
+        except (ValueError, UnicodeDecodeError, pd.errors.ParserError) as error:
+            st.error(f"Não foi possível ler o arquivo: {error}")
+
+    table = st.data_editor(
+        data,
+        num_rows="dynamic",
+        key=f"channel_batch_table_{uploaded.file_id if uploaded is not None else 0}",
+        use_container_width=True,
+        column_config={
+            'Forma': st.column_config.SelectboxColumn('Forma', options=list(SECTION_SHAPES), required=True)
+        }
+    ).dropna(subset=['Forma', 'Manning n', 'Declividade S₀', 'Vazão (m³/s)', 'Comprimento (m)'])
+    table = table.fillna({'Canal': '', 'Largura b (m)': 0.0, 'Talude z (H:V)': 0.0, 'Diâmetro D (m)': 0.0})
+
+    if table.empty:
+        st.info("Preencha ao menos um canal.")
+        return
+
+    results = _solve_batch(table)
+    st.dataframe(results.head(1000).round(4), use_container_width=True, hide_index=True)
+    if len(results) > 1000:
+        st.caption(f"Mostrando 1.000 de {len(results):,} canais; exporte o CSV para ver todos.".replace(',', '.'))
+    st.download_button(
+        "📥 Exportar resultados (CSV)",
+        data=lambda: results.to_csv(index=False).encode('utf-8'),
+        file_name="canais.csv", mime="text/csv"
+    )
@@ -1,10 +1,26 @@
 import streamlit as st
 import pandas as pd
-import math
+import numpy as np
 import plotly.graph_objects as go
-from config.settings import GRAVITY, WATER_VELOCITY_MIN, WATER_VELOCITY_MAX, AIR_VELOCITY_MAX
+from config.settings import (
+    GRAVITY, WATER_VELOCITY_MIN, WATER_VELOCITY_MAX, AIR_VELOCITY_MAX, RESULT_CACHE_MAXSIZE,
+    COMMERCIAL_DIAMETERS, ENERGY_PRICE, PUMP_EFFICIENCY, OPERATING_HOURS_PER_YEAR, DESIGN_LIFE_YEARS,
+    PLOT_MAX_LABELS, PLOT_MAX_BARS
+)
+from components.cache_status import render_cache_status
+from components.charts import line_trace
 from components.pipe_config import render_pipe_configuration
-from utils.calculations import calculate_pipe_losses
+from components.pipe_table_editor import (
+    render_edit_mode_selector, render_pipe_import_export, render_pipe_table_editor
+)
+from utils.compressible import GAS_FLUIDS, choked_flow_rate, solve_compressible_system
+from utils.diameter_optimization import energy_cost_per_head, optimize_diameters, velocity_limits
+from utils.downsampling import aggregate_groups, decimate_indices
+from utils.engine import get_incremental_solver, resolve_flow_rate, segment_rows
+from utils.pipe_segment import new_pipe
+from utils.profiling import timed
+from utils.result_cache import config_hash, fluid_key, get_result_cache
+from utils.system_model import get_system_model
 import streamlit as st
 from pathlib import Path
 
@@ -217,43 +233,12 @@ def render_pipe_system_tab(sidebar_data):
     
     st.markdown("---")
     
-    # Botões para adicionar/remover tubos
-    col_btn1, col_btn2 = st.columns([1, 1])
-    with col_btn1:
-        if st.button("➕ Adicionar Trecho", use_container_width=True):
-            new_id = max([p['id'] for p in st.session_state.pipes]) + 1
-            st.session_state.pipes.append({
-                'id': new_id,
-                'material': 'Aço comercial',
-                'diameter': 0.1,
-                'length': 100.0,
-                'elevation_change': 0.0,
-                'has_contraction': False,
-                'has_expansion': False,
-                'has_curves': False,
-                'n_curves': 0,
-                'has_valve_gate': False,
-                'has_valve_globe': False,
-                'has_valve_ball': False,
-                'has_valve_check': False,
-                'has_tee_through': False,
-                'has_tee_branch': False,
-                'n_tee_through': 0,
-                'n_tee_branch': 0
-            })
-            st.rerun()
-    
-    with col_btn2:
-        if len(st.session_state.pipes) > 1:
-            if st.button("➖ Remover Último", use_container_width=True):
-                st.session_state.pipes.pop()
-                st.rerun()
-    
-    st.markdown("---")
-    
-    # Configuração de cada trecho
-    for idx, pipe in enumerate(st.session_state.pipes):
-        render_pipe_configuration(pipe, idx)
+    # Importação/exportação e modo de edição dos trechos
+    render_pipe_import_export()
+    if render_edit_mode_selector():
+        render_pipe_table_editor()
+    else:
+        _render_pipe_forms()
 
     st.markdown("---")
     st.markdown('<div class="section-title">📊 Resultados do Sistema</div>', unsafe_allow_html=True)
@@ -262,53 +247,26 @@ def render_pipe_system_tab(sidebar_data):
     rho = sidebar_data['rho']
     mu = sidebar_data['mu']
     pressure_inlet = sidebar_data['pressure_inlet']
-    input_type = sidebar_data['input_type']
-    flow_rate = sidebar_data['flow_rate']
-    velocity = sidebar_data['velocity']
     fluid_type = sidebar_data['fluid_type']
     
-    # Cálculos do sistema
-    current_pressure = pressure_inlet
-    total_head_loss_system = 0
-    total_length_system = 0
-    pipe_results = []
-    
-    # Calcular velocidade se entrada for por vazão
-    if input_type == "Vazão (Q)":
-        first_pipe = st.session_state.pipes[0]
-        A_first = math.pi * (first_pipe['diameter']/2)**2
-        velocity = flow_rate / A_first
-    else:
-        first_pipe = st.session_state.pipes[0]
-        A_first = math.pi * (first_pipe['diameter']/2)**2
-        flow_rate = velocity * A_first
-    
-    # Processar cada trecho
-    for pipe in st.session_state.pipes:
-        result = calculate_pipe_losses(pipe, flow_rate, rho, mu, GRAVITY)
-        
-        # Pressão de saída do trecho
-        pressure_loss = result['h_total'] * rho * GRAVITY
-        pressure_out = current_pressure - pressure_loss
-        
-        pipe_results.append({
-            'id': pipe['id'],
-            'V': result['V'],
-            'Re': result['Re'],
-            'regime': result['regime'],
-            'f': result['f'],
-            'h_distributed': result['h_distributed'],
-            'h_local': result['h_local'],
-            'h_elevation': result['h_elevation'],
-            'h_total': result['h_total'],
-            'P_in': current_pressure,
-            'P_out': pressure_out,
-            'K_total': result['K_total']
-        })
-        
-        total_head_loss_system += result['h_total']
-        total_length_system += pipe['length']
-        current_pressure = pressure_out
+    # Modelo compilado do sistema (reconstruído apenas quando os trechos mudam)
+    model = get_system_model(st.session_state.pipes, st.session_state)
+    
+    # Vazão a partir da velocidade ou, no modo inverso, das pressões
+    flow_rate, inverse = resolve_flow_rate(model, sidebar_data, st.session_state)
+    if inverse is not None:
+        _display_inverse_status(inverse)
+    
+    # Processar todos os trechos de uma vez (reaproveitando o resultado se nada mudou)
+    cache = get_result_cache(st.session_state, RESULT_CACHE_MAXSIZE)
+    (solution, pipe_results), hit = cache.get_or_compute(
+        config_hash(model.key, fluid_key(sidebar_data), 'series_system', flow_rate),
+        lambda: _solve_system(model, flow_rate, rho, mu, pressure_inlet, get_incremental_solver(st.session_state))
+    )
+    render_cache_status(hit, solution['evaluated'], len(model))
+    
+    total_head_loss_system = solution['total_head_loss']
+    total_length_system = solution['total_length']
     
     # Exibir resultados do sistema
     _display_system_results(flow_rate, total_head_loss_system, total_length_system, 
@@ -323,6 +281,56 @@ def render_pipe_system_tab(sidebar_data):
     # Gráficos
     _display_pressure_profile(pipe_results, st.session_state.pipes)
     _display_losses_by_section(pipe_results)
+    
+    # Gases: densidade recalculada na pressão local ao longo da linha
+    if fluid_type in GAS_FLUIDS:
+        _render_compressible_flow(model, flow_rate, sidebar_data, pipe_results, cache)
+    
+    # Escolha automática dos diâmetros comerciais
+    _render_diameter_optimization(model, flow_rate, sidebar_data, cache)
+
+
+def _render_pipe_forms():
+    """Botões de adicionar/remover e formulário de cada trecho"""
+    # Botões para adicionar/remover tubos
+    col_btn1, col_btn2 = st.columns([1, 1])
+    with col_btn1:
+        if st.button("➕ Adicionar Trecho", use_container_width=True):
+            new_id = max([p['id'] for p in st.session_state.pipes]) + 1
+            st.session_state.pipes.append(new_pipe(new_id))
+            st.rerun()
+    
+    with col_btn2:
+        if len(st.session_state.pipes) > 1:
+            if st.button("➖ Remover Último", use_container_width=True):
+                st.session_state.pipes.pop()
+                st.rerun()
+    
+    st.markdown("---")
+    
+    # Configuração de cada trecho
+    for idx, pipe in enumerate(st.session_state.pipes):
+        render_pipe_configuration(pipe, idx)
+
+
+def _solve_system(model, flow_rate, rho, mu, pressure_inlet, solver):
+    """
+    Resolve o sistema e monta as linhas por trecho usadas na exibição
+    solver: IncrementalSeriesSolver da sessão (só os trechos alterados
+            desde a última solução são reavaliados)
+    """
+    solution = solver.solve(model, flow_rate, rho, mu, pressure_inlet, GRAVITY)
+    return solution, segment_rows(model, solution)
+
+
+def _display_inverse_status(inverse):
+    """Informa o resultado do cálculo da vazão a partir das pressões"""
+    if inverse['status'] == 'sem vazão':
+        st.warning("A diferença de pressão não vence o desnível do sistema: não há escoamento no sentido considerado.")
+    elif not inverse['converged']:
+        st.warning("O cálculo da vazão a partir das pressões não convergiu; o resultado é aproximado.")
+    else:
+        st.caption(f"🎯 Vazão calculada a partir das pressões de entrada e saída ({inverse['iterations']} iterações)")
 
 
 def _display_system_results(flow_rate, total_head_loss, total_length, pressure_in, pressure_out):
@@ -394,6 +402,7 @@ def _display_velocity_warnings(pipe_results, fluid_type):
         st.success("✅ Todas as velocidades estão dentro das faixas recomendadas!")
 
 
+@timed('tabela/detalhamento')
 def _display_detailed_table(pipe_results):
     """Exibe tabela detalhada com resultados por trecho - TRANSPOSTA"""
     st.markdown("### 📋 Detalhamento por Trecho")
@@ -423,41 +432,38 @@ def _display_detailed_table(pipe_results):
     st.dataframe(df_results, use_container_width=True)
 
 
+@timed('figura/perfil_pressao')
 def _display_pressure_profile(pipe_results, pipes):
     """Exibe gráfico de perfil de pressão ao longo do sistema"""
     st.markdown("### 📉 Perfil de Pressão ao Longo do Sistema")
     
-    positions = [0]
-    pressures = [pipe_results[0]['P_in']/1000]  # kPa
-    
-    cumulative_length = 0
-    for i, (pipe, result) in enumerate(zip(pipes, pipe_results)):
-        cumulative_length += pipe['length']
-        positions.append(cumulative_length)
-        pressures.append(result['P_out']/1000)
+    # Posições acumuladas e pressões nas extremidades dos trechos
+    positions = np.concatenate(([0.0], np.cumsum([pipe['length'] for pipe in pipes])))
+    pressures = np.array([pipe_results[0]['P_in']] + [r['P_out'] for r in pipe_results]) / 1000  # kPa
+    segment_ids = np.array([pipe['id'] for pipe in pipes])
     
+    # Sistemas longos: linha reduzida (extremos preservados) e sem marcadores
+    detailed = len(pipes) <= PLOT_MAX_LABELS
     fig_pressure = go.Figure()
-    fig_pressure.add_trace(go.Scatter(
-        x=positions, 
-        y=pressures,
-        mode='lines+markers',
+    fig_pressure.add_trace(line_trace(
+        positions,
+        pressures,
+        customdata=np.concatenate((segment_ids[:1], segment_ids)),
+        mode='lines+markers' if detailed else 'lines',
         name='Pressão',
         line=dict(color='#00d4ff', width=3),
-        marker=dict(size=8)
+        marker=dict(size=8),
+        hovertemplate="Trecho %{customdata}: %{y:.1f} kPa<extra></extra>"
     ))
     
-    # Adicionar marcadores de trechos
-    for i, pipe in enumerate(pipes):
-        if i == 0:
-            x_start = 0
-        else:
-            x_start = sum([p['length'] for p in pipes[:i]])
-        x_end = x_start + pipe['length']
-        
+    # Rótulos dos trechos, no máximo PLOT_MAX_LABELS igualmente espaçados
+    label_y = pressures.max() * 1.05
+    midpoints = (positions[:-1] + positions[1:]) / 2
+    for i in decimate_indices(len(pipes), PLOT_MAX_LABELS):
         fig_pressure.add_annotation(
-            x=(x_start + x_end)/2,
-            y=max(pressures) * 1.05,
-            text=f"Trecho {pipe['id']}",
+            x=midpoints[i],
+            y=label_y,
+            text=f"Trecho {segment_ids[i]}",
             showarrow=False,
             font=dict(color='#a8dadc', size=10)
         )
@@ -472,6 +478,9 @@ def _display_pressure_profile(pipe_results, pipes):
     )
     
     st.plotly_chart(fig_pressure, use_container_width=True)
+    if not detailed:
+        st.caption(f"{len(pipes):,} trechos: rótulos de {PLOT_MAX_LABELS} trechos igualmente espaçados; "
+                   "passe o mouse sobre a linha para identificar os demais.")
 
     # Explicação do gráfico
     with st.expander("ℹ️ Como interpretar este gráfico", expanded=False):
@@ -500,16 +509,23 @@ def _display_pressure_profile(pipe_results, pipes):
         """)
 
 
+@timed('figura/perdas_trecho')
 def _display_losses_by_section(pipe_results):
     """Exibe gráfico de perdas por trecho"""
     st.markdown("### 📊 Perdas por Trecho")
     
     fig_losses = go.Figure()
     
-    trechos = [f"Trecho {r['id']}" for r in pipe_results]
-    h_dist = [r['h_distributed'] for r in pipe_results]
-    h_loc = [r['h_local'] for r in pipe_results]
-    h_elev = [r['h_elevation'] for r in pipe_results]
+    losses = np.array([[r['h_distributed'], r['h_local'], r['h_elevation']] for r in pipe_results])
+    ids = [r['id'] for r in pipe_results]
+    
+    # Muitos trechos: barras somam grupos de trechos consecutivos
+    starts, ends, grouped = aggregate_groups(losses, PLOT_MAX_BARS)
+    trechos = [
+        f"Trecho {ids[a]}" if a == b else f"Trechos {ids[a]}–{ids[b]}"
+        for a, b in zip(starts, ends)
+    ]
+    h_dist, h_loc, h_elev = grouped.T
     
     fig_losses.add_trace(go.Bar(name='Distribuída', x=trechos, y=h_dist, marker_color='#00d4ff'))
     fig_losses.add_trace(go.Bar(name='Localizada', x=trechos, y=h_loc, marker_color='#4ecdc4'))
@@ -526,6 +542,9 @@ def _display_losses_by_section(pipe_results):
     )
     
     st.plotly_chart(fig_losses, use_container_width=True)
+    if len(starts) < len(pipe_results):
+        st.caption(f"{len(pipe_results):,} trechos agrupados em {len(starts)} barras; cada barra soma as "
+                   "perdas dos trechos consecutivos indicados.")
 
     # Explicação do gráfico
     with st.expander("ℹ️ Como interpretar este gráfico", expanded=False):
@@ -562,3 +581,185 @@ def _display_losses_by_section(pipe_results):
         *A perda total em cada trecho é a soma das três componentes (altura das barras empilhadas).*
         """)
 
+
+@timed('secao/compressivel')
+def _render_compressible_flow(model, flow_rate, sidebar_data, pipe_results, cache):
+    """Renderiza o escoamento compressível, com densidade variável ao longo da linha"""
+    # Importado aqui: só os fluidos gasosos usam o gráfico com dois eixos
+    from plotly.subplots import make_subplots
+
+    st.markdown("### 💨 Escoamento Compressível")
+    
+    if not st.checkbox("Recalcular a densidade na pressão local (gás ideal isotérmico)",
+                       value=True, key="compressible_mode"):
+        st.caption("Os resultados acima usam a densidade constante, calculada na pressão de entrada.")
+        return
+    
+    fluid_type = sidebar_data['fluid_type']
+    temp = sidebar_data['temp']
+    pressure_inlet = sidebar_data['pressure_inlet']
+    gas_molar_mass = sidebar_data['gas_molar_mass']
+    
+    result, hit = cache.get_or_compute(
+        config_hash(model.key, fluid_key(sidebar_data), 'compressible', flow_rate),
+        lambda: solve_compressible_system(
+            model, flow_rate, fluid_type, temp, pressure_inlet, gas_molar_mass, g=GRAVITY
+        )
+    )
+    render_cache_status(hit)
+    
+    if sidebar_data['input_type'] == "Pressão de saída (P)":
+        st.caption("A vazão usada aqui é a do cálculo inverso com densidade constante.")
+    
+    if result['choked']:
+        max_flow_rate, _ = cache.get_or_compute(
+            config_hash(model.key, fluid_key(sidebar_data), 'choked_flow_rate'),
+            lambda: choked_flow_rate(model, fluid_type, temp, pressure_inlet, gas_molar_mass,
+                                     flow_rate_max=flow_rate, g=GRAVITY)
+        )
+        st.error(
+            f"⛔ Escoamento estrangulado no trecho {result['choke_segment']}, a "
+            f"{result['choke_position']:.1f} m da entrada (Mach {result['mach_limit']:.3f}). "
+            f"Vazão máxima nas condições de entrada: {max_flow_rate:.5f} m³/s "
+            f"({max_flow_rate*3600:.1f} m³/h)."
+        )
+    elif not result['converged']:
+        st.warning("A integração atingiu o limite de passos; o resultado é aproximado.")
+    
+    pressure_incompressible = pipe_results[-1]['P_out']
+    col1, col2, col3, col4 = st.columns(4)
+    if result['choked']:
+        col1.metric("Pressão final", "estrangulado")
+    else:
+        col1.metric(
+            "Pressão final", f"{result['pressure_outlet']/1000:.1f} kPa",
+            delta=f"{(result['pressure_outlet'] - pressure_incompressible)/1000:+.1f} kPa vs. ρ constante",
+            delta_color="off"
+        )
+    col2.metric("Mach máximo", f"{result['max_mach']:.3f}")
+    col3.metric("Vazão mássica", f"{result['mass_flow']:.4f} kg/s")
+    col4.metric("Avaliações de ρ", f"{result['property_evaluations']:,}")
+    
+    segments = result['segments']
+    st.dataframe(pd.DataFrame({
+        'Trecho': model.ids,
+        'P entrada (kPa)': segments['P_in'] / 1000,
+        'P saída (kPa)': segments['P_out'] / 1000,
+        'ρ entrada (kg/m³)': segments['rho_in'],
+        'ρ saída (kg/m³)': segments['rho_out'],
+        'V saída (m/s)': segments['V_out'],
+        'Mach saída': segments['mach_out'],
+        'Passos': segments['steps']
+    }).round(3), use_container_width=True)
+    
+    profile = result['profile']
+    positions = np.concatenate(([0.0], np.cumsum(model.length)))
+    pressures = np.concatenate(([pipe_results[0]['P_in']], [r['P_out'] for r in pipe_results]))
+    
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(line_trace(
+        profile['x'], profile['P'] / 1000, mode='lines', name='Pressão (compressível)',
+        line=dict(color='#00d4ff', width=3)
+    ), secondary_y=False)
+    fig.add_trace(line_trace(
+        positions, pressures / 1000, mode='lines' if len(model) > PLOT_MAX_LABELS else 'lines+markers',
+        name='Pressão (ρ constante)', line=dict(color='#a8dadc', width=2, dash='dash')
+    ), secondary_y=False)
+    fig.add_trace(line_trace(
+        profile['x'], profile['mach'], mode='lines', name='Mach',
+        line=dict(color='#ff6b6b', width=2)
+    ), secondary_y=True)
+    fig.update_layout(
+        xaxis_title="Posição ao longo do sistema (m)",
+        paper_bgcolor='#1f3044',
+        plot_bgcolor='#2d4059',
+        font=dict(color='#e0fbfc'),
+        hovermode='x unified'
+    )
+    fig.update_yaxes(title_text="Pressão (kPa)", secondary_y=False)
+    fig.update_yaxes(title_text="Mach", secondary_y=True)
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.caption(
+        f"Passos de integração: {result['steps']} aceitos, {result['rejected_steps']} rejeitados. "
+        f"Perdas localizadas distribuídas ao longo de cada trecho; estrangulamento isotérmico em "
+        f"Mach 1/√γ = {result['mach_limit']:.3f}."
+    )
+
+
+@timed('secao/otimizacao')
+def _render_diameter_optimization(model, flow_rate, sidebar_data, cache):
+    """Renderiza a otimização dos diâmetros comerciais dos trechos"""
+    st.markdown("### 🎯 Otimização de Diâmetros")
+    
+    rho = sidebar_data['rho']
+    pressure_inlet = sidebar_data['pressure_inlet']
+    V_min, V_max = velocity_limits(sidebar_data['fluid_type'])
+    
+    with st.expander("⚙️ Parâmetros da otimização", expanded=False):
+        col1, col2 = st.columns(2)
+        with col1:
+            min_outlet_kPa = st.number_input(
+                "Pressão mínima na saída (kPa)", value=100.0, min_value=-100.0, max_value=100000.0, step=10.0
+            )
+            energy_price = st.number_input("Tarifa de energia (R$/kWh)", value=ENERGY_PRICE, min_value=0.0, step=0.05)
+        with col2:
+            hours_per_year = st.number_input(
+                "Horas de operação por ano", value=OPERATING_HOURS_PER_YEAR, min_value=0.0, max_value=8760.0, step=100.0
+            )
+            years = st.number_input("Vida útil (anos)", value=DESIGN_LIFE_YEARS, min_value=1, max_value=100)
+        st.caption(
+            f"Diâmetros candidatos (mm): {', '.join(f'{d*1000:.0f}' for d in COMMERCIAL_DIAMETERS)} • "
+            f"Velocidade admissível: {V_min:.1f} a {V_max:.1f} m/s • Eficiência da bomba: {PUMP_EFFICIENCY:.0%}"
+        )
+    
+    pipes = st.session_state.pipes
+    energy_cost = energy_cost_per_head(
+        flow_rate, rho, GRAVITY, energy_price, PUMP_EFFICIENCY, hours_per_year, years
+    )
+    result, hit = cache.get_or_compute(
+        config_hash(model.key, fluid_key(sidebar_data), 'diameter_optimization', flow_rate,
+                    min_outlet_kPa, energy_cost),
+        lambda: optimize_diameters(
+            pipes, flow_rate, rho, sidebar_data['mu'], pressure_inlet, min_outlet_kPa * 1000,
+            COMMERCIAL_DIAMETERS, (V_min, V_max), energy_cost=energy_cost, g=GRAVITY
+        )
+    )
+    render_cache_status(hit)
+    
+    if result['status'] == 'velocidade':
+        trechos = ', '.join(str(pipe_id) for pipe_id in result['infeasible_segments'])
+        st.warning(f"Nenhum diâmetro comercial mantém a velocidade na faixa recomendada no(s) trecho(s) {trechos}.")
+        return
+    if result['status'] == 'pressão':
+        st.warning("Nenhuma combinação de diâmetros comerciais atinge a pressão mínima na saída.")
+        return
+    
+    col_a, col_b, col_c = st.columns(3)
+    col_a.metric("Custo da tubulação", f"R$ {result['pipe_cost'].sum():,.0f}")
+    col_b.metric("Custo de bombeamento", f"R$ {result['energy_cost'].sum():,.0f}")
+    col_c.metric("Pressão na saída", f"{result['pressure_outlet']/1000:.1f} kPa")
+    
+    st.dataframe(pd.DataFrame({
+        'Trecho': [pipe['id'] for pipe in pipes],
+        'Diâmetro atual (mm)': [pipe['diameter'] * 1000 for pipe in pipes],
+        'Diâmetro ótimo (mm)': result['diameters'] * 1000,
+        'Velocidade (m/s)': result['velocity'],
+        'h total (m)': result['head_loss'],
+        'Custo tubulação (R$)': result['pipe_cost'],
+        'Custo energia (R$)': result['energy_cost']
+    }).round(2), use_container_width=True)
+    st.caption(f"Rótulos avaliados pela programação dinâmica: {result['labels']:,}")
+    
+    st.button(
+        "✅ Aplicar diâmetros ótimos", on_click=_apply_diameters,
+        args=(pipes, result['diameters'].tolist())
+    )
+
+
+def _apply_diameters(pipes, diameters):
+    """Copia os diâmetros escolhidos para os trechos"""
+    for pipe, diameter in zip(pipes, diameters):
+        pipe['diameter'] = diameter
+        # Descarta o estado do campo para que ele seja recriado com o novo valor
+        st.session_state.pop(f"diam_{pipe['id']}", None)
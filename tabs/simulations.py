@@ -1,10 +1,46 @@
 import streamlit as st
 import numpy as np
-import math
+import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from fluids import friction_factor, Reynolds
-from config.settings import GRAVITY, TUBE_MATERIALS
+from config.settings import (
+    GRAVITY, TUBE_MATERIALS, RESULT_CACHE_MAXSIZE, GRID_SWEEP_AUTO_ELEMENTS, JOB_MAX_WORKERS, JOB_HISTORY,
+    JOB_MAX_ACTIVE_PER_SESSION, PLOT_MAX_POINTS
+)
+from components.cache_status import render_cache_status
+from components.charts import grid_trace, line_trace
+from components.job_status import (
+    compute_or_submit, render_background_jobs, render_job_outcome, render_job_progress, submit_job
+)
+from utils.calculations import moody_grid
+from utils.downsampling import decimate_indices
+from utils.fluid_properties import FLUID_MODELS, property_table
+from utils.jobs import get_job_manager
+from utils.loss_coefficients import K_TABLE_LABELS, K_contraction_round, K_expansion_round, K_table
+from utils.result_cache import config_hash, fluid_key, get_result_cache
+from utils.engine import resolve_flow_rate
+from utils.pump import PumpCurve, operating_point, system_head_curve
+from utils.sweeps import SEGMENT_PARAMETERS, flow_rate_sweep, grid_sweep, inlet_pressure_sweep, material_what_if
+from utils.uncertainty import DEFAULT_UNCERTAINTY, run_monte_carlo
+from utils.system_model import get_system_model
+from utils.profiling import timed
+
+# Entradas da varredura 2D: rótulo, fator (unidade da interface -> SI),
+# valor mínimo e formato
+GRID_INPUTS = {
+    'flow_rate': ("Vazão (m³/h)", 1 / 3600, 0.0, "%.3f"),
+    'temperature': ("Temperatura (°C)", 1.0, -50.0, "%.1f"),
+    'pressure_inlet': ("Pressão de entrada (kPa)", 1000.0, 1.0, "%.1f"),
+    'diameter': ("Diâmetro (mm)", 1e-3, 1.0, "%.1f"),
+    'roughness': ("Rugosidade (mm)", 1e-3, 0.0, "%.4f"),
+    'length': ("Comprimento (m)", 1.0, 0.1, "%.1f")
+}
+# Grandezas da varredura 2D: rótulo e fator (SI -> unidade exibida)
+GRID_OUTPUTS = {
+    'head_loss': ("Perda de carga total (m)", 1.0),
+    'pressure_outlet': ("Pressão de saída (kPa)", 1000.0),
+    'velocity_max': ("Velocidade máxima (m/s)", 1.0)
+}
 
 def render_simulations_tab(sidebar_data):
     """Renderiza a aba de Simulações"""
@@ -14,27 +50,46 @@ def render_simulations_tab(sidebar_data):
     rho = sidebar_data['rho']
     mu = sidebar_data['mu']
     pressure_inlet = sidebar_data['pressure_inlet']
-    input_type = sidebar_data['input_type']
-    flow_rate = sidebar_data['flow_rate']
-    velocity = sidebar_data['velocity']
     
-    # Calcular flow_rate se necessário
-    if input_type == "Velocidade (V)":
-        first_pipe = st.session_state.pipes[0]
-        A_first = math.pi * (first_pipe['diameter']/2)**2
-        flow_rate = velocity * A_first
+    # Modelo compilado compartilhado com a aba de sistema
+    model = get_system_model(st.session_state.pipes, st.session_state)
+    
+    # Calcular flow_rate se necessário (velocidade ou modo inverso)
+    flow_rate, _ = resolve_flow_rate(model, sidebar_data, st.session_state)
+    
+    # Resultados reaproveitados entre reruns, endereçados pelo hash da configuração
+    cache = get_result_cache(st.session_state, RESULT_CACHE_MAXSIZE)
+    base_key = config_hash(model.key, fluid_key(sidebar_data))
+    jobs = get_job_manager(st.session_state, JOB_MAX_WORKERS, JOB_HISTORY, JOB_MAX_ACTIVE_PER_SESSION)
     
     # Simulação de variação de vazão
-    _render_flow_rate_simulation(rho, mu)
+    flow_rate_job = _render_flow_rate_simulation(model, rho, mu, cache, jobs, base_key)
     
     # Simulação de variação de pressão
-    _render_pressure_simulation(rho, mu, flow_rate)
+    _render_pressure_simulation(model, rho, mu, flow_rate, cache, base_key)
+    
+    # Varredura 2D (mapas de calor)
+    grid_job = _render_grid_sweep(model, sidebar_data, flow_rate, cache, jobs, base_key)
     
     # Comparação de materiais
-    _render_material_comparison(rho, mu, flow_rate)
+    material_job = _render_material_comparison(model, rho, mu, flow_rate, pressure_inlet, cache, jobs, base_key)
+    
+    # Ponto de operação com bomba
+    pump_job = _render_pump_operating_point(model, rho, mu, cache, jobs, base_key)
+    
+    # Incertezas (Monte Carlo)
+    monte_carlo_job = _render_uncertainty_analysis(model, sidebar_data, flow_rate, cache, jobs, base_key)
+    
+    # Diagrama de Moody, curvas de propriedades e coeficientes K (tabelas
+    # compartilhadas entre as sessões)
+    _render_reference_charts(model, sidebar_data, flow_rate, cache, base_key)
+    
+    # Cálculos ainda em andamento de configurações anteriores
+    render_background_jobs(jobs, keys=(flow_rate_job, grid_job, material_job, pump_job, monte_carlo_job))
 
 
-def _render_flow_rate_simulation(rho, mu):
+@timed('figura/varredura_vazao')
+def _render_flow_rate_simulation(model, rho, mu, cache, jobs, base_key):
     """Renderiza simulação de variação de vazão"""
     st.subheader("Variação de Vazão no Sistema")
     
@@ -43,47 +98,34 @@ def _render_flow_rate_simulation(rho, mu):
     with col1:
         Q_min = st.number_input("Vazão mínima (m³/s)", value=0.001, step=0.001, format="%.4f")
         Q_max = st.number_input("Vazão máxima (m³/s)", value=0.05, step=0.005, format="%.4f")
-        n_points = st.slider("Número de pontos", 10, 100, 50)
-    
-    flow_rates_sim = np.linspace(Q_min, Q_max, n_points)
-    head_losses_sim = []
-    pressure_drops_sim = []
-    velocities_sim = []
-    
-    for Q_sim in flow_rates_sim:
-        total_h = 0
-        first_pipe = st.session_state.pipes[0]
-        A = math.pi * (first_pipe['diameter']/2)**2
-        V_sim = Q_sim / A
-        velocities_sim.append(V_sim)
-        
-        for pipe in st.session_state.pipes:
-            A = math.pi * (pipe['diameter']/2)**2
-            V = Q_sim / A
-            
-            Re_sim = Reynolds(V=V, D=pipe['diameter'], rho=rho, mu=mu)
-            try:
-                f_sim = friction_factor(Re=Re_sim, eD=pipe['roughness']/pipe['diameter'])
-            except:
-                f_sim = 0.02
-            
-            h_dist = f_sim * (pipe['length'] / pipe['diameter']) * (V**2 / (2 * GRAVITY))
-            total_h += h_dist + pipe.get('elevation_change', 0)
-        
-        head_losses_sim.append(total_h)
-        pressure_drops_sim.append(total_h * rho * GRAVITY / 1000)
+        n_points = st.slider("Número de pontos", 10, 5000, 50,
+                             help="Varreduras densas são reduzidas para o gráfico preservando os extremos")
+    
+    # Varreduras densas em sistemas grandes rodam em segundo plano
+    sweep, job_key = compute_or_submit(
+        cache, jobs, config_hash(base_key, 'flow_rate_sweep', Q_min, Q_max, n_points),
+        lambda progress=None: flow_rate_sweep(model, rho, mu, Q_min, Q_max, n_points, GRAVITY,
+                                              progress=progress),
+        n_points * len(model), "Varredura de vazão"
+    )
+    if sweep is None:
+        return job_key
+    
+    flow_rates_sim = sweep['flow_rates']
+    head_losses_sim = sweep['head_losses']
+    velocities_sim = sweep['velocities']
     
     fig_sim1 = make_subplots(specs=[[{"secondary_y": True}]])
     
     fig_sim1.add_trace(
-        go.Scatter(x=flow_rates_sim*3600, y=head_losses_sim, name="Perda de Carga (m)", 
-                  line=dict(color='#00d4ff', width=3)),
+        line_trace(flow_rates_sim*3600, head_losses_sim, name="Perda de Carga (m)", 
+                   line=dict(color='#00d4ff', width=3)),
         secondary_y=False,
     )
     
     fig_sim1.add_trace(
-        go.Scatter(x=flow_rates_sim*3600, y=velocities_sim, name="Velocidade (m/s)", 
-                  line=dict(color='#ff6b6b', width=3)),
+        line_trace(flow_rates_sim*3600, velocities_sim, name="Velocidade (m/s)", 
+                   line=dict(color='#ff6b6b', width=3)),
         secondary_y=True,
     )
     
@@ -99,9 +141,11 @@ def _render_flow_rate_simulation(rho, mu):
     )
     
     st.plotly_chart(fig_sim1, use_container_width=True)
+    return None
 
 
-def _render_pressure_simulation(rho, mu, flow_rate):
+@timed('figura/varredura_pressao')
+def _render_pressure_simulation(model, rho, mu, flow_rate, cache, base_key):
     """Renderiza simulação de variação de pressão de entrada"""
     st.subheader("Variação de Pressão de Entrada")
     
@@ -112,34 +156,20 @@ def _render_pressure_simulation(rho, mu, flow_rate):
         P_max = st.number_input("Pressão máxima (kPa)", value=500.0, step=10.0)
     
     n_points = 50
-    pressures_inlet_sim = np.linspace(P_min*1000, P_max*1000, n_points)
-    pressures_outlet_sim = []
-    
-    for P_in in pressures_inlet_sim:
-        P_current = P_in
-        for pipe in st.session_state.pipes:
-            A = math.pi * (pipe['diameter']/2)**2
-            V = flow_rate / A
-            
-            Re_sim = Reynolds(V=V, D=pipe['diameter'], rho=rho, mu=mu)
-            try:
-                f_sim = friction_factor(Re=Re_sim, eD=pipe['roughness']/pipe['diameter'])
-            except:
-                f_sim = 0.02
-            
-            h_dist = f_sim * (pipe['length'] / pipe['diameter']) * (V**2 / (2 * GRAVITY))
-            h_total = h_dist + pipe.get('elevation_change', 0)
-            
-            P_loss = h_total * rho * GRAVITY
-            P_current -= P_loss
-        
-        pressures_outlet_sim.append(P_current/1000)
+    sweep, hit = cache.get_or_compute(
+        config_hash(base_key, 'inlet_pressure_sweep', flow_rate, P_min, P_max, n_points),
+        lambda: inlet_pressure_sweep(model, rho, mu, flow_rate, P_min*1000, P_max*1000, n_points, GRAVITY)
+    )
+    render_cache_status(hit)
+    
+    pressures_inlet_sim = sweep['pressures_inlet']
+    pressures_outlet_sim = sweep['pressures_outlet'] / 1000
     
     fig_sim2 = go.Figure()
     
-    fig_sim2.add_trace(go.Scatter(
-        x=pressures_inlet_sim/1000, 
-        y=pressures_outlet_sim,
+    fig_sim2.add_trace(line_trace(
+        pressures_inlet_sim/1000, 
+        pressures_outlet_sim,
         mode='lines',
         name='Pressão de Saída',
         line=dict(color='#4ecdc4', width=3)
@@ -157,41 +187,178 @@ def _render_pressure_simulation(rho, mu, flow_rate):
     st.plotly_chart(fig_sim2, use_container_width=True)
 
 
-def _render_material_comparison(rho, mu, flow_rate):
-    """Renderiza comparação entre materiais"""
-    st.subheader("Comparação de Materiais (Primeiro Trecho)")
+def _grid_default_range(name, model, flow_rate, sidebar_data):
+    """Faixa inicial (unidades da interface) de um eixo da varredura 2D"""
+    if name == 'flow_rate':
+        Q = flow_rate * 3600 if flow_rate > 0 else 36.0
+        return 0.25 * Q, 2.0 * Q
+    if name == 'temperature':
+        return 5.0, 80.0
+    if name == 'pressure_inlet':
+        P = sidebar_data['pressure_inlet'] / 1000
+        return max(0.5 * P, 1.0), 2.0 * P
+    if name == 'diameter':
+        return max(0.5 * model.diameter.min() * 1000, 1.0), 2.0 * model.diameter.max() * 1000
+    if name == 'roughness':
+        return 0.001, 1.0
+    return max(0.5 * model.length.min(), 0.1), 2.0 * model.length.max()
+
+
+def _grid_axis_inputs(axis, name, model, flow_rate, sidebar_data):
+    """Campos de faixa e número de pontos de um eixo; retorna (mínimo, máximo, pontos)"""
+    label, _, min_value, number_format = GRID_INPUTS[name]
+    low, high = _grid_default_range(name, model, flow_rate, sidebar_data)
+    v_min = st.number_input(f"{label} - mínimo", value=float(low), min_value=min_value,
+                            format=number_format, key=f"grid_{axis}_min_{name}")
+    v_max = st.number_input(f"{label} - máximo", value=float(high), min_value=min_value,
+                            format=number_format, key=f"grid_{axis}_max_{name}")
+    n = st.slider(f"Pontos no eixo {axis}", 10, 1000, 50, key=f"grid_{axis}_n")
+    return v_min, v_max, n
+
+
+@timed('figura/varredura_2d')
+def _render_grid_sweep(model, sidebar_data, flow_rate, cache, jobs, base_key):
+    """Renderiza a varredura de dois parâmetros (mapa de calor / curvas de nível)"""
+    st.subheader("Varredura 2D (Mapa de Calor)")
     
-    materials_comp = {
-        "PVC": 0.0000015,
-        "Cobre": 0.0000015,
-        "Aço comercial": 0.000045,
-        "Aço galvanizado": 0.00015,
-        "Concreto": 0.0003,
-        "Ferro fundido": 0.00026
-    }
+    names = list(GRID_INPUTS)
+    col1, col2 = st.columns(2)
+    with col1:
+        x_name = st.selectbox("Parâmetro do eixo x", names, index=0,
+                              format_func=lambda name: GRID_INPUTS[name][0], key='grid_x')
+        x_min, x_max, n_x = _grid_axis_inputs('x', x_name, model, flow_rate, sidebar_data)
+    with col2:
+        y_options = [name for name in names if name != x_name]
+        y_name = st.selectbox("Parâmetro do eixo y", y_options,
+                              index=y_options.index('diameter') if 'diameter' in y_options else 0,
+                              format_func=lambda name: GRID_INPUTS[name][0], key='grid_y')
+        y_min, y_max, n_y = _grid_axis_inputs('y', y_name, model, flow_rate, sidebar_data)
     
-    material_head_loss = []
-    material_names = list(materials_comp.keys())
+    segments = None
+    n_affected = len(model)
+    if x_name in SEGMENT_PARAMETERS or y_name in SEGMENT_PARAMETERS:
+        col_a, col_b = st.columns(2)
+        target = col_a.radio("Parâmetros de trecho aplicados a", ["Todos os trechos", "Um trecho"],
+                             horizontal=True, key='grid_target')
+        if target == "Um trecho":
+            ids = model.ids
+            segment_id = col_b.number_input("Trecho", min_value=int(ids.min()), max_value=int(ids.max()),
+                                            value=int(ids[0]), step=1, key='grid_segment')
+            segments = np.flatnonzero(ids == segment_id).tolist()
+            if not segments:
+                st.warning(f"Não há trecho com número {segment_id}.")
+                return
+            n_affected = len(segments)
     
-    first_pipe = st.session_state.pipes[0]
-    A = math.pi * (first_pipe['diameter']/2)**2
-    V = flow_rate / A
+    col_c, col_d = st.columns(2)
+    output = col_c.selectbox("Grandeza", list(GRID_OUTPUTS), format_func=lambda name: GRID_OUTPUTS[name][0],
+                             key='grid_output')
+    kind = col_d.radio("Gráfico", ["Mapa de calor", "Curvas de nível"], horizontal=True, key='grid_kind')
     
-    for material, rough in materials_comp.items():
-        Re_temp = Reynolds(V=V, D=first_pipe['diameter'], rho=rho, mu=mu)
-        try:
-            f_temp = friction_factor(Re=Re_temp, eD=rough/first_pipe['diameter'])
-        except:
-            f_temp = 0.02
-        
-        hl_temp = f_temp * (first_pipe['length'] / first_pipe['diameter']) * (V**2 / (2 * GRAVITY))
-        material_head_loss.append(hl_temp)
+    if x_min >= x_max or y_min >= y_max:
+        st.warning("Em cada eixo, o valor máximo deve ser maior que o mínimo.")
+        return
     
+    x_scale, y_scale = GRID_INPUTS[x_name][1], GRID_INPUTS[y_name][1]
+    x_values = np.linspace(x_min, x_max, n_x)
+    y_values = np.linspace(y_min, y_max, n_y)
+    
+    def compute(progress=None, partial=None):
+        return grid_sweep(model, sidebar_data, flow_rate, x_name, x_values * x_scale,
+                          y_name, y_values * y_scale, segments, g=GRAVITY, progress=progress,
+                          partial=partial)
+    
+    key = config_hash(base_key, 'grid_sweep', flow_rate, x_name, x_min, x_max, n_x,
+                      y_name, y_min, y_max, n_y, segments)
+    show = lambda result: _render_grid_result(result, x_values, y_values, x_name, y_name, output, kind)
+    elements = n_x * n_y * n_affected
+    if elements <= GRID_SWEEP_AUTO_ELEMENTS:
+        result, hit = cache.get_or_compute(key, compute)
+        render_cache_status(hit)
+        show(result)
+        return None
+    
+    # Grades grandes: cálculo em segundo plano, com a grade parcial exibida a cada bloco
+    result = cache.get(key)
+    job = jobs.get(key)
+    if result is None and st.button("▦ Calcular varredura 2D"):
+        def run(job):
+            return compute(lambda done, total: job.report(done / total),
+                           lambda partial: job.report(job.progress, partial))
+        job = submit_job(jobs, key, run, cache, "Varredura 2D") or job
+    if result is None and job is not None and not job.done:
+        render_job_progress(job, show, label="Varredura 2D")
+        return key
+    
+    if result is None:
+        render_job_outcome(job)
+        st.info(f"Grade com {elements:,} avaliações (pontos × trechos): clique em "
+                "**Calcular varredura 2D**. O cálculo roda em segundo plano e pode ser cancelado.")
+        return None
+    render_cache_status(True)
+    show(result)
+    return None
+
+
+def _render_grid_result(result, x_values, y_values, x_name, y_name, output, kind):
+    """Mapa de calor ou curvas de nível de uma grade (completa ou parcial)"""
+    label, scale = GRID_OUTPUTS[output]
+    z = result[output] / scale
+    trace = grid_trace(
+        x_values, y_values, z, kind='contour' if kind == "Curvas de nível" else 'heatmap',
+        colorscale='Viridis', colorbar=dict(title=label),
+        hovertemplate=(f"{GRID_INPUTS[x_name][0]}: %{{x:.4g}}<br>{GRID_INPUTS[y_name][0]}: %{{y:.4g}}"
+                       f"<br>{label}: %{{z:.4g}}<extra></extra>")
+    )
+    fig_grid = go.Figure(trace)
+    fig_grid.update_layout(
+        title=f"{label}: {GRID_INPUTS[y_name][0]} x {GRID_INPUTS[x_name][0]}",
+        xaxis_title=GRID_INPUTS[x_name][0],
+        yaxis_title=GRID_INPUTS[y_name][0],
+        paper_bgcolor='#1f3044',
+        plot_bgcolor='#2d4059',
+        font=dict(color='#e0fbfc')
+    )
+    st.plotly_chart(fig_grid, use_container_width=True)
+    
+    if not np.isfinite(z).any():
+        return
+    n_y, n_x = z.shape
+    col_e, col_f = st.columns(2)
+    col_e.metric(f"Mínimo - {label}", f"{np.nanmin(z):.4g}")
+    col_f.metric(f"Máximo - {label}", f"{np.nanmax(z):.4g}")
+    if len(trace.x) < n_x or len(trace.y) < n_y:
+        st.caption(f"Grade de {n_y:,} × {n_x:,} pontos exibida com {len(trace.y)} × {len(trace.x)}; "
+                   "mínimo e máximo consideram a grade completa.")
+
+
+@timed('figura/materiais')
+def _render_material_comparison(model, rho, mu, flow_rate, pressure_inlet, cache, jobs, base_key):
+    """Renderiza a comparação de materiais: troca de todo o sistema e matriz trecho x material"""
+    st.subheader("Comparação de Materiais")
+    
+    materials = {name: roughness for name, roughness in TUBE_MATERIALS.items() if roughness is not None}
+    comparison, job_key = compute_or_submit(
+        cache, jobs, config_hash(base_key, 'material_what_if', flow_rate, pressure_inlet, materials),
+        lambda progress=None: material_what_if(model, rho, mu, flow_rate, pressure_inlet, materials,
+                                               GRAVITY, progress=progress),
+        len(materials) * len(model), "Comparação de materiais"
+    )
+    if comparison is None:
+        return job_key
+    
+    material_names = comparison['materials']
+    base_head_loss = comparison['base_head_loss']
+    
+    # Sistema inteiro em cada material
+    st.write("**Todos os trechos no mesmo material:**")
     fig_mat = go.Figure(data=[
-        go.Bar(name='Perda de Carga', x=material_names, y=material_head_loss, marker_color='#00d4ff')
+        go.Bar(name='Perda de Carga', x=material_names, y=comparison['swap_head_loss'], marker_color='#00d4ff')
     ])
+    fig_mat.add_hline(y=base_head_loss, line_dash='dash', line_color='#ffd60a',
+                      annotation_text="Sistema atual", annotation_font_color='#ffd60a')
     fig_mat.update_layout(
-        title="Comparação de Perda de Carga por Material",
+        title="Perda de Carga Total por Material",
         xaxis_title="Material",
         yaxis_title="Perda de Carga (m)",
         paper_bgcolor='#1f3044',
@@ -200,5 +367,367 @@ def _render_material_comparison(rho, mu, flow_rate):
         xaxis=dict(color='#e0fbfc'),
         yaxis=dict(color='#e0fbfc')
     )
+    st.plotly_chart(fig_mat, use_container_width=True)
+    
+    st.dataframe(pd.DataFrame({
+        'Material': material_names,
+        'Perda de carga (m)': comparison['swap_head_loss'],
+        'Variação (m)': comparison['swap_head_loss'] - base_head_loss,
+        'Pressão de saída (kPa)': comparison['swap_pressure_outlet'] / 1000
+    }).sort_values('Perda de carga (m)').round(3), use_container_width=True, hide_index=True)
+    
+    # Troca de um trecho por vez: ganho de perda de carga de cada par (trecho, material)
+    st.write("**Troca de um único trecho:**")
+    savings = -comparison['delta_head']
+    ids = comparison['ids']
+    n_top = len(ids)
+    if n_top > 5:
+        n_top = st.slider("Trechos exibidos (maiores ganhos)", 5, min(100, n_top), min(20, n_top),
+                          key='material_top_segments')
+    
+    # Trechos ordenados pelo melhor ganho possível entre os materiais
+    best = savings.max(axis=0)
+    order = np.argsort(-best, kind='stable')[:n_top]
+    labels = [f"Trecho {ids[i]}" for i in order]
+    
+    fig_matrix = go.Figure(go.Heatmap(
+        x=labels, y=material_names, z=savings[:, order], colorscale='RdBu', zmid=0,
+        colorbar=dict(title="Redução (m)"),
+        hovertemplate="%{x} → %{y}<br>Redução da perda: %{z:.4g} m<extra></extra>"
+    ))
+    fig_matrix.update_layout(
+        title="Redução da Perda de Carga ao Trocar o Material de um Trecho",
+        paper_bgcolor='#1f3044',
+        plot_bgcolor='#2d4059',
+        font=dict(color='#e0fbfc'),
+        xaxis=dict(color='#e0fbfc'),
+        yaxis=dict(color='#e0fbfc')
+    )
+    st.plotly_chart(fig_matrix, use_container_width=True)
+    
+    # Ranking dos pares com maior ganho (o material de cada trecho vem do melhor ganho)
+    material_index = savings[:, order].argmax(axis=0)
+    ranking = pd.DataFrame({
+        'Trecho': ids[order],
+        'Melhor material': [material_names[k] for k in material_index],
+        'Redução da perda (m)': best[order],
+        'Redução por metro (m/km)': best[order] / model.length[order] * 1000,
+        'Pressão de saída (kPa)': comparison['pressure_outlet'][material_index, order] / 1000,
+        'Ganho de pressão (kPa)': best[order] * rho * GRAVITY / 1000
+    })
+    st.dataframe(ranking.round(4), use_container_width=True, hide_index=True)
+    st.caption(
+        f"Perda atual: {base_head_loss:.3f} m. Ganhos negativos indicam que o trecho já está em um "
+        "material mais liso que todas as alternativas."
+    )
+    return None
+
+
+@timed('figura/ponto_operacao')
+def _render_pump_operating_point(model, rho, mu, cache, jobs, base_key):
+    """Renderiza o ponto de operação (curva da bomba x curva do sistema)"""
+    st.subheader("Ponto de Operação com Bomba")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.write("**Curva da bomba (pontos tabelados):**")
+        pump_table = st.data_editor(
+            pd.DataFrame({
+                'Vazão (m³/h)': [0.0, 20.0, 40.0, 60.0, 80.0],
+                'Altura (m)': [30.0, 29.0, 26.0, 21.0, 14.0]
+            }),
+            num_rows="dynamic",
+            key="pump_curve_table"
+        ).dropna()
+    
+    with col2:
+        static_head = st.number_input(
+            "Altura estática adicional (m)", value=10.0, min_value=-1000.0, max_value=1000.0, step=1.0,
+            help="Desnível ou pressão a vencer além dos trechos (ex.: reservatório elevado)"
+        )
+    
+    if len(pump_table) < 2:
+        st.info("Informe pelo menos dois pontos da curva da bomba.")
+        return
+    
+    flow_points = pump_table['Vazão (m³/h)'].to_numpy(dtype=float) / 3600
+    head_points = pump_table['Altura (m)'].to_numpy(dtype=float)
+    
+    n_curve = 100
+    
+    def compute(progress=None):
+        pump = PumpCurve.from_points(flow_points, head_points)
+        point = operating_point(pump, model, rho, mu, static_head, GRAVITY)
+        if progress is not None:
+            progress(1, 2)
+        flow_rates = np.linspace(0, pump.max_flow * 1.2, n_curve)
+        return {
+            'point': point,
+            'flow_rates': flow_rates,
+            'system_heads': system_head_curve(model, flow_rates, rho, mu, static_head, GRAVITY),
+            'pump_flow_rates': pump.flow_rates,
+            'pump_heads': pump.heads
+        }
+    
+    # Curva do sistema e iterações do ponto de operação (da mesma ordem)
+    result, job_key = compute_or_submit(
+        cache, jobs, config_hash(base_key, 'pump_operating_point', flow_points, head_points, static_head),
+        compute, 2 * n_curve * len(model), "Ponto de operação"
+    )
+    if result is None:
+        return job_key
+    
+    point = result['point']
+    if point['status'] == 'ok':
+        col_a, col_b = st.columns(2)
+        col_a.metric("Vazão de operação", f"{point['flow_rate']*3600:.2f} m³/h")
+        col_b.metric("Altura de operação", f"{point['head']:.2f} m")
+    elif point['status'] == 'sem vazão':
+        st.warning("A bomba não vence a altura estática do sistema: não há escoamento.")
+    elif point['status'] == 'fora da curva':
+        st.warning("O ponto de operação está além do último ponto da curva da bomba.")
+    else:
+        st.warning("O cálculo do ponto de operação não convergiu.")
+    
+    fig_pump = go.Figure()
+    fig_pump.add_trace(go.Scatter(
+        x=result['flow_rates']*3600, y=result['system_heads'], mode='lines',
+        name='Curva do Sistema', line=dict(color='#00d4ff', width=3)
+    ))
+    fig_pump.add_trace(go.Scatter(
+        x=result['pump_flow_rates']*3600, y=result['pump_heads'], mode='lines+markers',
+        name='Curva da Bomba', line=dict(color='#ff6b6b', width=3)
+    ))
+    if point['status'] == 'ok':
+        fig_pump.add_trace(go.Scatter(
+            x=[point['flow_rate']*3600], y=[point['head']], mode='markers',
+            name='Ponto de Operação', marker=dict(color='#ffd60a', size=14, symbol='star')
+        ))
+    
+    fig_pump.update_layout(
+        title="Curva da Bomba x Curva do Sistema",
+        xaxis_title="Vazão (m³/h)",
+        yaxis_title="Altura Manométrica (m)",
+        paper_bgcolor='#1f3044',
+        plot_bgcolor='#2d4059',
+        font=dict(color='#e0fbfc'),
+        legend=dict(bgcolor='#2d4059', bordercolor='#3d5a73', borderwidth=1)
+    )
+    
+    st.plotly_chart(fig_pump, use_container_width=True)
+    return None
+
+
+@timed('secao/incerteza')
+def _render_uncertainty_analysis(model, sidebar_data, flow_rate, cache, jobs, base_key):
+    """Renderiza a análise de incertezas por Monte Carlo"""
+    st.subheader("Análise de Incertezas (Monte Carlo)")
+    
+    st.markdown("""
+    Rugosidade, diâmetro interno, comprimento, temperatura do fluido e vazão são sorteados a cada amostra
+    e o sistema completo é recalculado. Os resultados mostram a faixa provável da perda de carga e da
+    pressão de saída (percentis P5, P50 e P95).
+    """)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        roughness_cv = st.number_input("Incerteza da rugosidade (%)", value=DEFAULT_UNCERTAINTY['roughness_cv']*100,
+                                       min_value=0.0, max_value=200.0, step=5.0)
+        diameter_cv = st.number_input("Incerteza do diâmetro (%)", value=DEFAULT_UNCERTAINTY['diameter_cv']*100,
+                                      min_value=0.0, max_value=20.0, step=0.5)
+    with col2:
+        length_cv = st.number_input("Incerteza do comprimento (%)", value=DEFAULT_UNCERTAINTY['length_cv']*100,
+                                    min_value=0.0, max_value=20.0, step=0.5)
+        flow_cv = st.number_input("Incerteza da vazão (%)", value=DEFAULT_UNCERTAINTY['flow_cv']*100,
+                                  min_value=0.0, max_value=50.0, step=1.0)
+    with col3:
+        temperature_std = st.number_input("Desvio da temperatura (°C)", value=DEFAULT_UNCERTAINTY['temperature_std'],
+                                          min_value=0.0, max_value=50.0, step=0.5)
+        n_samples = st.selectbox("Número de amostras", [10_000, 100_000, 1_000_000], index=1,
+                                 format_func=lambda n: f"{n:,}".replace(',', '.'))
+    
+    uncertainty = {
+        'roughness_cv': roughness_cv / 100,
+        'diameter_cv': diameter_cv / 100,
+        'length_cv': length_cv / 100,
+        'temperature_std': temperature_std,
+        'flow_cv': flow_cv / 100
+    }
+    pressure_inlet = sidebar_data['pressure_inlet']
+    key = config_hash(base_key, 'monte_carlo', flow_rate, uncertainty, n_samples)
+    
+    def compute(job):
+        def progress(done, stats):
+            # Percentis e histogramas parciais a cada bloco concluído
+            job.report(done / n_samples, {
+                'samples': done,
+                **{name: {'summary': hist.summary(), 'histogram': hist.histogram()}
+                   for name, hist in stats.items()}
+            })
+        return run_monte_carlo(model, flow_rate, pressure_inlet, sidebar_data, uncertainty,
+                               n_samples, seed=0, g=GRAVITY, progress=progress)
+    
+    result = cache.get(key)
+    job = jobs.get(key)
+    if result is None and st.button("🎲 Executar Monte Carlo"):
+        job = submit_job(jobs, key, compute, cache, "Monte Carlo") or job
+    if result is None and job is not None and not job.done:
+        def show_partial(partial):
+            st.caption(f"Resultado parcial com {partial['samples']:,} amostras")
+            _render_uncertainty_result(partial)
+        render_job_progress(job, show_partial, label="Monte Carlo")
+        return key
+    
+    if result is None:
+        render_job_outcome(job)
+        st.info("Ajuste as incertezas e clique em **Executar Monte Carlo**. "
+                "O cálculo roda em segundo plano e pode ser cancelado.")
+        return None
+    render_cache_status(True)
+    _render_uncertainty_result(result)
+    return None
+
+
+def _render_uncertainty_result(result):
+    """Tabela de percentis e histogramas do Monte Carlo (completo ou parcial)"""
+    head = result['head_loss']['summary']
+    pressure = result['pressure_outlet']['summary']
+    st.dataframe(pd.DataFrame({
+        'Grandeza': ['Perda de carga total (m)', 'Pressão de saída (kPa)'],
+        'P5': [head['P5'], pressure['P5'] / 1000],
+        'P50': [head['P50'], pressure['P50'] / 1000],
+        'P95': [head['P95'], pressure['P95'] / 1000],
+        'Média': [head['mean'], pressure['mean'] / 1000],
+        'Desvio padrão': [head['std'], pressure['std'] / 1000]
+    }).round(3), use_container_width=True, hide_index=True)
+    
+    col_a, col_b = st.columns(2)
+    for column, name, title, scale, unit, color in (
+        (col_a, 'head_loss', "Perda de Carga Total", 1.0, "m", '#00d4ff'),
+        (col_b, 'pressure_outlet', "Pressão de Saída", 1000.0, "kPa", '#4ecdc4')
+    ):
+        edges, counts = result[name]['histogram']
+        summary = result[name]['summary']
+        centers = (edges[:-1] + edges[1:]) / 2 / scale
+        
+        fig_hist = go.Figure(go.Bar(
+            x=centers, y=counts / counts.sum(), width=np.diff(edges) / scale,
+            marker_color=color, name='Frequência'
+        ))
+        for label in ('P5', 'P50', 'P95'):
+            fig_hist.add_vline(x=summary[label] / scale, line_dash='dash', line_color='#ffd60a',
+                               annotation_text=label, annotation_font_color='#ffd60a')
+        fig_hist.update_layout(
+            title=f"Distribuição: {title}",
+            xaxis_title=f"{title} ({unit})",
+            yaxis_title="Frequência relativa",
+            paper_bgcolor='#1f3044',
+            plot_bgcolor='#2d4059',
+            font=dict(color='#e0fbfc'),
+            showlegend=False
+        )
+        column.plotly_chart(fig_hist, use_container_width=True)
+
+@timed('figura/referencias')
+def _render_reference_charts(model, sidebar_data, flow_rate, cache, base_key):
+    """
+    Diagrama de Moody com os pontos de operação dos trechos, curvas de
+    propriedades do fluido e tabela de coeficientes K
+
+    As grades e tabelas vêm dos caches compartilhados do processo
+    (utils.shared_cache): são calculadas uma vez e servidas a todas as sessões.
+    """
+    st.subheader("Diagramas de Referência")
+    
+    # Diagrama de Moody com o ponto (Re, f) de cada trecho
+    moody = moody_grid()
+    operating, hit = cache.get_or_compute(
+        config_hash(base_key, 'moody_points', flow_rate),
+        lambda: {name: values[0] for name, values in model.losses(
+            flow_rate, sidebar_data['rho'], sidebar_data['mu'], GRAVITY
+        ).items() if name in ('Re', 'f')}
+    )
+    
+    fig_moody = go.Figure()
+    for eD, f in zip(moody['eD'], moody['f']):
+        fig_moody.add_trace(line_trace(
+            moody['Re'], f, mode='lines', name="liso" if eD == 0 else f"ε/D = {eD:g}",
+            line=dict(width=1.5)
+        ))
+    points = decimate_indices(len(model), PLOT_MAX_POINTS)
+    valid = operating['Re'][points] > 0
+    fig_moody.add_trace(go.Scatter(
+        x=operating['Re'][points][valid], y=operating['f'][points][valid], mode='markers',
+        name="Trechos", customdata=model.ids[points][valid],
+        marker=dict(color='#ffd60a', size=9, line=dict(color='#1f3044', width=1)),
+        hovertemplate="Trecho %{customdata}<br>Re = %{x:.3g}<br>f = %{y:.4f}<extra></extra>"
+    ))
+    fig_moody.update_xaxes(title_text="Número de Reynolds", type='log', color='#e0fbfc')
+    fig_moody.update_yaxes(title_text="Fator de atrito de Darcy", type='log', color='#e0fbfc')
+    fig_moody.update_layout(
+        title="Diagrama de Moody",
+        paper_bgcolor='#1f3044',
+        plot_bgcolor='#2d4059',
+        font=dict(color='#e0fbfc'),
+        height=550
+    )
+    st.plotly_chart(fig_moody, use_container_width=True)
+    render_cache_status(hit)
+    
+    col1, col2 = st.columns(2)
+    
+    # Curvas de propriedades do fluido (0 a 100 °C)
+    with col1:
+        fluid_type = sidebar_data['fluid_type']
+        if fluid_type in FLUID_MODELS:
+            table = property_table(fluid_type, pressure=sidebar_data['pressure_inlet'],
+                                   gas_molar_mass=sidebar_data.get('gas_molar_mass', 0.02896))
+            
+            fig_props = make_subplots(specs=[[{"secondary_y": True}]])
+            fig_props.add_trace(
+                line_trace(table['temperature'], table['rho'], name="Densidade (kg/m³)",
+                           line=dict(color='#00d4ff', width=3)),
+                secondary_y=False
+            )
+            fig_props.add_trace(
+                line_trace(table['temperature'], table['mu'] * 1000, name="Viscosidade (mPa.s)",
+                           line=dict(color='#ff6b6b', width=3)),
+                secondary_y=True
+            )
+            fig_props.add_vline(x=sidebar_data['temp'], line_dash='dash', line_color='#ffd60a',
+                                annotation_text="Atual", annotation_font_color='#ffd60a')
+            fig_props.update_xaxes(title_text="Temperatura (°C)", color='#e0fbfc')
+            fig_props.update_yaxes(title_text="Densidade (kg/m³)", secondary_y=False, color='#00d4ff')
+            fig_props.update_yaxes(title_text="Viscosidade (mPa.s)", secondary_y=True, color='#ff6b6b')
+            fig_props.update_layout(
+                title=f"Propriedades: {fluid_type}",
+                paper_bgcolor='#1f3044',
+                plot_bgcolor='#2d4059',
+                font=dict(color='#e0fbfc')
+            )
+            st.plotly_chart(fig_props, use_container_width=True)
+        else:
+            st.info("Fluido personalizado: propriedades constantes, sem curva de referência.")
     
-    st.plotly_chart(fig_mat, use_container_width=True)
\ No newline at end of file
+    # Coeficientes K dos acessórios: curvas de contração e expansão e os
+    # valores constantes da tabela compartilhada
+    with col2:
+        ratio = np.linspace(1.0, 10.0, 901)
+        fig_K = go.Figure()
+        fig_K.add_trace(line_trace(ratio, K_contraction_round(D1=ratio, D2=1.0), name="Contração (D₁/D₂)",
+                                   line=dict(color='#4ecdc4', width=3)))
+        fig_K.add_trace(line_trace(ratio, K_expansion_round(D1=1.0, D2=ratio), name="Expansão (D₂/D₁)",
+                                   line=dict(color='#ff6b6b', width=3)))
+        fig_K.update_xaxes(title_text="Razão de diâmetros", color='#e0fbfc')
+        fig_K.update_yaxes(title_text="K", color='#e0fbfc')
+        fig_K.update_layout(
+            title="Coeficientes K: Contração e Expansão",
+            paper_bgcolor='#1f3044',
+            plot_bgcolor='#2d4059',
+            font=dict(color='#e0fbfc')
+        )
+        st.plotly_chart(fig_K, use_container_width=True)
+        fixed = {name: value for name, value in K_table().items() if name not in ('contraction', 'expansion')}
+        st.dataframe(pd.DataFrame({'Acessório': [K_TABLE_LABELS[name] for name in fixed], 'K': list(fixed.values())}),
+                     use_container_width=True, hide_index=True)
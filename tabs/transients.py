@@ -0,0 +1,191 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from config.settings import GRAVITY, RESULT_CACHE_MAXSIZE, FLUID_BULK_MODULUS, WATER_VAPOR_PRESSURE
+from components.cache_status import render_cache_status
+from components.charts import line_trace
+from utils.result_cache import config_hash, fluid_key, get_result_cache
+from utils.engine import resolve_flow_rate
+from utils.system_model import get_system_model
+from utils.water_hammer import segment_wave_speeds, simulate_water_hammer, valve_closure_schedule
+from utils.profiling import timed
+
+SCENARIOS = ["Fechamento da válvula de jusante", "Desligamento da bomba"]
+
+def render_transients_tab(sidebar_data):
+    """Renderiza a aba de Transientes Hidráulicos (golpe de aríete)"""
+    st.header("Transientes Hidráulicos (Golpe de Aríete)")
+
+    st.markdown("""
+    Simulação pelo método das características a partir do regime permanente do sistema de tubos.
+    A montante há um reservatório de nível constante (ou uma bomba que é desligada) e a jusante
+    uma válvula gaveta que descarrega num reservatório. A celeridade de cada trecho vem do
+    material do tubo e da compressibilidade do fluido.
+    """)
+
+    fluid_type = sidebar_data['fluid_type']
+    if fluid_type in ("Ar", "Gás ideal"):
+        st.info("O golpe de aríete é simulado apenas para líquidos. Selecione Água, Óleo ou Personalizado.")
+        return
+
+    rho = sidebar_data['rho']
+    mu = sidebar_data['mu']
+    pressure_inlet = sidebar_data['pressure_inlet']
+
+    model = get_system_model(st.session_state.pipes, st.session_state)
+    flow_rate, _ = resolve_flow_rate(model, sidebar_data, st.session_state)
+    if flow_rate is None or flow_rate <= 0:
+        st.warning("É necessária uma vazão inicial positiva para simular o transiente.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        scenario = st.radio("Manobra", SCENARIOS, key='transient_scenario')
+        if scenario == SCENARIOS[0]:
+            closing_time = st.number_input("Tempo de fechamento (s)", value=1.0, min_value=0.0,
+                                           max_value=600.0, step=0.1, key='transient_closing_time',
+                                           help="0 para fechamento instantâneo")
+            exponent = st.number_input("Expoente da lei de fechamento", value=1.0, min_value=0.1,
+                                       max_value=10.0, step=0.1, key='transient_exponent',
+                                       help="τ = (1 - t/T)^Em; Em > 1 fecha devagar no início e rápido no fim")
+        else:
+            shutoff_ratio = st.number_input("Altura de shutoff / altura de operação", value=1.25,
+                                            min_value=1.01, max_value=3.0, step=0.05, key='transient_shutoff')
+            run_down_time = st.number_input("Constante de desaceleração da bomba (s)", value=2.0,
+                                            min_value=0.01, max_value=60.0, step=0.1, key='transient_run_down',
+                                            help="A rotação cai como 1/(1 + t/T)")
+            check_valve = st.checkbox("Válvula de retenção na bomba", value=True, key='transient_check')
+    with col2:
+        duration = st.number_input("Tempo simulado (s)", value=10.0, min_value=0.1, max_value=3600.0,
+                                   step=1.0, key='transient_duration')
+        n_reaches = st.selectbox("Trechos elementares (total)", [100, 1_000, 10_000, 100_000], index=1,
+                                 format_func=lambda n: f"{n:,}".replace(',', '.'), key='transient_reaches')
+    with col3:
+        wall_ratio = st.number_input("Espessura da parede / diâmetro", value=0.05, min_value=0.005,
+                                     max_value=0.5, step=0.005, format="%.3f", key='transient_wall_ratio')
+        default_bulk = FLUID_BULK_MODULUS.get(fluid_type, FLUID_BULK_MODULUS["Água"])
+        bulk_modulus = st.number_input("Módulo de compressibilidade do fluido (GPa)", value=default_bulk / 1e9,
+                                       min_value=0.01, max_value=10.0, step=0.01, key='transient_bulk') * 1e9
+        custom_modulus = st.number_input("Módulo de elasticidade do material Personalizado (GPa)", value=207.0,
+                                         min_value=0.1, max_value=500.0, step=1.0, key='transient_custom_E') * 1e9
+
+    pipes = st.session_state.pipes
+    speeds = segment_wave_speeds(pipes, bulk_modulus, rho, wall_ratio, custom_modulus)
+    travel = float(np.sum(model.length / speeds))
+    n_steps = int(np.ceil(duration / (travel / n_reaches)))
+    st.caption(
+        f"Celeridade: {speeds.min():.0f} a {speeds.max():.0f} m/s • período da onda 2L/a: {2 * travel:.2f} s • "
+        f"≈ {n_steps:,} passos de tempo".replace(',', '.')
+    )
+
+    if scenario == SCENARIOS[0]:
+        schedule = valve_closure_schedule(closing_time, exponent)
+        pump_trip = None
+        options = {'closing_time': closing_time, 'exponent': exponent}
+        check_valve = True
+    else:
+        schedule = None
+        pump_trip = {'shutoff_ratio': shutoff_ratio, 'run_down_time': run_down_time}
+        options = {**pump_trip, 'check_valve': check_valve}
+
+    cache = get_result_cache(st.session_state, RESULT_CACHE_MAXSIZE)
+    key = config_hash(model.key, fluid_key(sidebar_data), 'golpe_de_ariete', flow_rate, scenario,
+                      options, duration, n_reaches, wall_ratio, bulk_modulus, custom_modulus)
+
+    result = cache.get(key)
+    if st.button("🌊 Simular transiente"):
+        progress_bar = st.progress(0.0)
+
+        def compute():
+            return simulate_water_hammer(
+                model, flow_rate, rho, mu, pressure_inlet, speeds, duration, n_reaches=n_reaches,
+                valve_schedule=schedule, existing_valve=bool(pipes[-1].get('has_valve_gate')),
+                pump_trip=pump_trip, check_valve=check_valve, g=GRAVITY,
+                progress=lambda done, total: progress_bar.progress(done / total)
+            )
+
+        try:
+            result, _ = cache.get_or_compute(key, compute)
+        except ValueError as error:
+            st.error(str(error))
+        progress_bar.empty()
+    elif result is not None:
+        render_cache_status(True)
+
+    if result is None:
+        st.info("Ajuste a manobra e clique em **Simular transiente**.")
+        return
+
+    _render_transient_results(result)
+
+@timed('figura/transiente')
+def _render_transient_results(result):
+    """Renderiza o resumo, a envoltória de pressões e as séries no tempo"""
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Pressão máxima", f"{result['max_pressure']/1000:.1f} kPa")
+    col2.metric("Pressão mínima", f"{result['min_pressure']/1000:.1f} kPa")
+    col3.metric("Joukowsky (ρ·a·V₀)", f"{result['joukowsky']/1000:.1f} kPa")
+    col4.metric("Período 2L/a", f"{result['wave_period']:.2f} s")
+
+    st.caption(
+        f"{result['n_nodes']:,} nós • {result['n_steps']:,} passos de Δt = {result['dt']*1000:.3f} ms • "
+        f"ajuste máximo da celeridade: {result['wave_speed_adjustment']*100:.2f}%".replace(',', '.')
+    )
+
+    if result['cavitation'].any():
+        x_cavitation = result['x'][result['cavitation']]
+        st.warning(
+            f"⚠️ A pressão mínima cai abaixo da pressão de vapor ({WATER_VAPOR_PRESSURE/1000:.1f} kPa) "
+            f"entre x = {x_cavitation.min():.1f} m e x = {x_cavitation.max():.1f} m: haveria separação da "
+            "coluna líquida, que o modelo não representa (os valores nesse trecho são apenas indicativos)."
+        )
+
+    x = result['x']
+    fig_envelope = go.Figure()
+    for name, label, color, dash in (
+        ('pressure_max', 'Máxima', '#ff6b6b', None),
+        ('pressure_initial', 'Inicial', '#00d4ff', 'dash'),
+        ('pressure_min', 'Mínima', '#4ecdc4', None)
+    ):
+        fig_envelope.add_trace(line_trace(
+            x, result[name] / 1000, mode='lines', name=label, line=dict(color=color, width=2, dash=dash)
+        ))
+    fig_envelope.add_hline(y=WATER_VAPOR_PRESSURE / 1000, line_dash='dot', line_color='#ffd60a',
+                           annotation_text="Pressão de vapor", annotation_font_color='#ffd60a')
+    fig_envelope.update_layout(
+        title="Envoltória de Pressões ao Longo do Sistema",
+        xaxis_title="Posição (m)",
+        yaxis_title="Pressão (kPa)",
+        paper_bgcolor='#1f3044',
+        plot_bgcolor='#1f3044',
+        font=dict(color='#ffffff'),
+        height=450
+    )
+    st.plotly_chart(fig_envelope, use_container_width=True)
+
+    fig_time = go.Figure()
+    for i, (name, color) in enumerate(zip(result['probe_names'], ('#00d4ff', '#4ecdc4', '#ff6b6b'))):
+        fig_time.add_trace(line_trace(
+            result['t'], result['probes'][:, i] / 1000, mode='lines',
+            name=f"{name} (x = {result['probe_x'][i]:.0f} m)", line=dict(color=color, width=2)
+        ))
+    fig_time.update_layout(
+        title="Pressão no Tempo",
+        xaxis_title="Tempo (s)",
+        yaxis_title="Pressão (kPa)",
+        paper_bgcolor='#1f3044',
+        plot_bgcolor='#1f3044',
+        font=dict(color='#ffffff'),
+        height=450
+    )
+    st.plotly_chart(fig_time, use_container_width=True)
+
+    probes = pd.DataFrame({
+        'Posição': result['probe_names'],
+        'x (m)': result['probe_x'],
+        'Inicial (kPa)': result['probes'][0] / 1000,
+        'Máxima (kPa)': result['probes'].max(axis=0) / 1000,
+        'Mínima (kPa)': result['probes'].min(axis=0) / 1000
+    })
+    st.dataframe(probes.round(2), use_container_width=True, hide_index=True)
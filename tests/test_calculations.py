@@ -0,0 +1,42 @@
+import numpy as np
+from fluids import friction_factor
+from utils.calculations import friction_factor_array, losses_from_invariants, normal_depth
+
+# Laminar, transição (inclui o limite Re = 2040 de fluids) e turbulento
+REYNOLDS = np.concatenate([np.geomspace(10.0, 2000.0, 15), [2039.0, 2040.0, 2041.0],
+                           np.linspace(2300.0, 4000.0, 8), np.geomspace(4000.0, 1e8, 20)])
+RELATIVE_ROUGHNESS = (0.0, 1e-6, 1e-4, 1e-3, 1e-2, 5e-2)
+
+def test_profundidade_normal_com_largura_escalar_e_vazoes_em_array():
+    Q = np.array([5.0, 1.0])
+
+    depths = normal_depth(Q, 3.0, 0.001, 0.015)
+
+    assert depths.shape == (2,)
+    assert np.allclose(depths, [normal_depth(q, 3.0, 0.001, 0.015) for q in Q], rtol=1e-9)
+
+def test_fator_de_atrito_vetorizado_igual_ao_escalar_de_fluids():
+    Re, eD = np.meshgrid(REYNOLDS, RELATIVE_ROUGHNESS)
+
+    f = friction_factor_array(Re, eD)
+
+    expected = [[friction_factor(Re=Re_i, eD=eD_i) for Re_i, eD_i in zip(*row)] for row in zip(Re, eD)]
+    np.testing.assert_allclose(f, expected, rtol=1e-12)
+
+def test_perdas_dos_invariantes_iguais_as_do_caminho_escalar():
+    rho, mu, g = 998.2, 1.002e-3, 9.81
+    D, L, K, dz = 0.05, 120.0, 3.5, 2.0
+    area = np.pi * (D / 2)**2
+    flow_rates = REYNOLDS * (mu / rho) * area / D
+
+    for eD in RELATIVE_ROUGHNESS:
+        losses = losses_from_invariants(flow_rates[:, np.newaxis], D, area, eD, L / D, K, dz, rho, mu, g)
+
+        for i, Q in enumerate(flow_rates):
+            V = Q / area
+            f = friction_factor(Re=V * D * rho / mu, eD=eD)
+            h_distributed = f * (L / D) * V**2 / (2 * g)
+            h_local = K * V**2 / (2 * g)
+            assert np.isclose(losses['f'][i, 0], f, rtol=1e-12)
+            assert np.isclose(losses['h_distributed'][i, 0], h_distributed, rtol=1e-12)
+            assert np.isclose(losses['h_total'][i, 0], h_distributed + h_local + dz, rtol=1e-12)
@@ -0,0 +1,64 @@
+import itertools
+import numpy as np
+from config.settings import COMMERCIAL_DIAMETERS, PIPE_COST_COEFFICIENT, PIPE_COST_EXPONENT
+from utils.diameter_optimization import candidate_losses, optimize_diameters
+from utils.pipe_segment import new_pipe
+
+RHO, MU, G = 998.2, 1.002e-3, 9.81
+
+def _brute_force(pipes, flow_rate, diameters, pressure_inlet, min_outlet_pressure, velocity_range, energy_cost):
+    """Menor custo entre todas as combinações viáveis (None se nenhuma)"""
+    losses = candidate_losses(pipes, flow_rate, diameters, RHO, MU, G)
+    length = np.array([pipe['length'] for pipe in pipes])[:, np.newaxis]
+    cost = (PIPE_COST_COEFFICIENT * np.asarray(diameters)**PIPE_COST_EXPONENT * length
+            + energy_cost * (losses['h_distributed'] + losses['h_local']))
+    allowed = (losses['V'] >= velocity_range[0]) & (losses['V'] <= velocity_range[1])
+    head_budget = (pressure_inlet - min_outlet_pressure) / (RHO * G)
+
+    best = None
+    rows = np.arange(len(pipes))
+    for combination in itertools.product(range(len(diameters)), repeat=len(pipes)):
+        selected = np.array(combination)
+        if not allowed[rows, selected].all() or losses['h_total'][rows, selected].sum() > head_budget + 1e-9:
+            continue
+        total = cost[rows, selected].sum()
+        if best is None or total < best:
+            best = total
+    return best
+
+def test_diametros_otimos_iguais_aos_da_forca_bruta():
+    rng = np.random.default_rng(7)
+    diameters = COMMERCIAL_DIAMETERS[2:9]
+    for _ in range(25):
+        n = int(rng.integers(1, 6))
+        pipes = [
+            new_pipe(i + 1, length=float(rng.uniform(10.0, 500.0)),
+                     elevation_change=float(rng.uniform(-5.0, 10.0)),
+                     has_curves=bool(rng.random() < 0.5), n_curves=int(rng.integers(1, 4)),
+                     has_valve_globe=bool(rng.random() < 0.3))
+            for i in range(n)
+        ]
+        flow_rate = float(rng.uniform(0.002, 0.03))
+        pressure_inlet = 4e5
+        velocity_range = (0.0, float(rng.choice([np.inf, 3.0])))
+        # Bombeamento barato: tubos finos competem com os grossos
+        energy_cost = float(rng.uniform(0.0, 100.0))
+        # Pressão mínima na saída próxima da maior alcançável (a restrição
+        # costuma ficar ativa), às vezes acima dela
+        h_total = candidate_losses(pipes, flow_rate, diameters, RHO, MU, G)['h_total']
+        best, worst = (pressure_inlet - h_total.min(axis=1).sum() * RHO * G,
+                       pressure_inlet - h_total.max(axis=1).sum() * RHO * G)
+        min_outlet_pressure = float(best - rng.uniform(-0.05, 0.3) * (best - worst))
+
+        result = optimize_diameters(pipes, flow_rate, RHO, MU, pressure_inlet, min_outlet_pressure,
+                                    diameters=diameters, velocity_range=velocity_range,
+                                    energy_cost=energy_cost, g=G)
+        expected = _brute_force(pipes, flow_rate, diameters, pressure_inlet, min_outlet_pressure,
+                                velocity_range, energy_cost)
+
+        if expected is None:
+            assert result['status'] != 'ok'
+        else:
+            assert result['status'] == 'ok'
+            assert np.isclose(result['total_cost'], expected, rtol=1e-9)
+            assert result['pressure_outlet'] >= min_outlet_pressure - 1e-6
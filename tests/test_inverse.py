@@ -0,0 +1,53 @@
+import numpy as np
+from utils.inverse import solve_flow_rates
+from utils.pipe_segment import new_pipe
+from utils.pump import PumpCurve, operating_point
+from utils.root_finding import bracketed_root
+from utils.system_model import SystemModel
+
+RHO, MU, G = 998.2, 1.002e-3, 9.81
+
+def _model():
+    return SystemModel.from_pipes([
+        new_pipe(1, diameter=0.05, length=80.0, elevation_change=3.0, has_curves=True, n_curves=2),
+        new_pipe(2, diameter=0.08, length=150.0, has_valve_globe=True),
+        new_pipe(3, diameter=0.04, length=30.0, elevation_change=-1.0)
+    ])
+
+def test_vazao_recuperada_a_partir_da_pressao_de_saida():
+    model = _model()
+    # Laminar, transição e turbulento no trecho mais estreito
+    flow_rates = np.array([2e-5, 1e-4, 5e-4, 2e-3, 1e-2, 3e-2])
+    P_in = 8e5
+    P_out = P_in - model.losses(flow_rates, RHO, MU, G)['h_total'].sum(axis=1) * RHO * G
+
+    result = solve_flow_rates(model, RHO, MU, P_in, P_out, g=G)
+
+    assert list(result['status']) == ['ok'] * flow_rates.size
+    assert result['converged'].all()
+    # xtol do solver é absoluto (1e-12 m³/s)
+    np.testing.assert_allclose(result['flow_rate'], flow_rates, rtol=1e-8, atol=1e-11)
+
+def test_sem_vazao_quando_a_pressao_nao_vence_o_desnivel():
+    model = _model()
+    # Desnível total de 2 m: diferenças de pressão de 0, 1 m e 1,99 m de coluna
+    P_out = 3e5 - np.array([0.0, 1.0, 1.99]) * RHO * G
+
+    result = solve_flow_rates(model, RHO, MU, 3e5, P_out, g=G)
+
+    assert list(result['status']) == ['sem vazão'] * 3
+    assert (result['flow_rate'] == 0.0).all() and result['converged'].all()
+
+def test_intervalo_sem_mudanca_de_sinal_nao_converge():
+    root, converged, _ = bracketed_root(lambda x, idx: x**2 - np.array([2.0, -1.0])[idx],
+                                        np.zeros(2), np.full(2, 2.0))
+
+    assert np.isclose(root[0], np.sqrt(2.0)) and converged[0]
+    assert np.isnan(root[1]) and not converged[1]
+
+def test_bomba_que_nao_vence_a_altura_estatica_fica_sem_vazao():
+    pump = PumpCurve.from_points([0.0, 0.01, 0.02], [20.0, 18.0, 12.0])
+
+    point = operating_point(pump, _model(), RHO, MU, static_head=25.0, g=G)
+
+    assert point['status'] == 'sem vazão'
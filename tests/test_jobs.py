@@ -0,0 +1,22 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from utils.jobs import JobLimitReached, JobManager
+
+def test_sessao_nao_passa_do_limite_de_tarefas_ativas():
+    release = threading.Event()
+    jobs = JobManager(ThreadPoolExecutor(max_workers=4), max_active=2)
+    first = jobs.submit('a', lambda job: release.wait(5))
+    jobs.submit('b', lambda job: release.wait(5))
+
+    # A mesma chave devolve a tarefa em andamento, sem contar no limite
+    assert jobs.submit('a', lambda job: None) is first
+    with pytest.raises(JobLimitReached):
+        jobs.submit('c', lambda job: None)
+
+    release.set()
+    deadline = time.perf_counter() + 5
+    while jobs.active() and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    assert jobs.submit('c', lambda job: 1) is not None
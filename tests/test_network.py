@@ -0,0 +1,65 @@
+import numpy as np
+from utils.network import PipeNetwork, grid_network, solve_network
+
+RHO, MU = 998.2, 1.002e-3
+
+def _loop_head_loss(network, result, loop):
+    """Soma das perdas ao percorrer a malha (nós em ordem), com o sinal do sentido do trecho"""
+    total = 0.0
+    for a, b in zip(loop, loop[1:] + loop[:1]):
+        forward = np.flatnonzero((network.start == a) & (network.end == b))
+        backward = np.flatnonzero((network.start == b) & (network.end == a))
+        total += result['head_loss'][forward].sum() - result['head_loss'][backward].sum()
+    return total
+
+def _node_balance(network, result):
+    """Entradas menos saídas menos demanda em cada junção (m³/s)"""
+    Q = result['flow_rate']
+    balance = (np.bincount(network.end, Q, network.n_nodes)
+               - np.bincount(network.start, Q, network.n_nodes))
+    return (balance - network.demand)[network.junctions]
+
+def test_rede_malhada_fecha_energia_nas_malhas_e_vazao_nos_nos():
+    network = PipeNetwork.from_records(
+        nodes=[
+            {'name': 'R', 'elevation': 40.0, 'head': 60.0},
+            {'name': 'A', 'elevation': 10.0, 'demand': 0.004},
+            {'name': 'B', 'elevation': 12.0, 'demand': 0.006},
+            {'name': 'C', 'elevation': 8.0, 'demand': 0.003},
+            {'name': 'D', 'elevation': 15.0, 'demand': 0.005}
+        ],
+        links=[
+            {'name': 'RA', 'start': 'R', 'end': 'A', 'diameter': 0.2, 'length': 500.0, 'material': 'PVC'},
+            {'name': 'AB', 'start': 'A', 'end': 'B', 'diameter': 0.1, 'length': 300.0, 'material': 'PVC',
+             'has_curves': True, 'n_curves': 2},
+            {'name': 'BC', 'start': 'B', 'end': 'C', 'diameter': 0.08, 'length': 250.0, 'material': 'PVC'},
+            {'name': 'CA', 'start': 'C', 'end': 'A', 'diameter': 0.1, 'length': 400.0, 'material': 'PVC'},
+            {'name': 'CD', 'start': 'C', 'end': 'D', 'diameter': 0.08, 'length': 200.0, 'material': 'PVC',
+             'has_valve_gate': True},
+            {'name': 'DA', 'start': 'D', 'end': 'A', 'diameter': 0.1, 'length': 350.0, 'material': 'PVC'}
+        ]
+    )
+    A, B, C, D = 1, 2, 3, 4
+
+    result = solve_network(network, RHO, MU)
+
+    assert result['converged']
+    tolerance = 1e-6 * np.abs(result['head_loss']).max()
+    for loop in ([A, B, C], [A, C, D]):
+        assert abs(_loop_head_loss(network, result, loop)) < tolerance
+    np.testing.assert_allclose(_node_balance(network, result), 0.0, atol=1e-9)
+
+def test_malha_retangular_fecha_energia_em_cada_celula():
+    n_rows, n_cols = 3, 4
+    network = grid_network(n_rows, n_cols, demand=2e-3)
+
+    result = solve_network(network, RHO, MU)
+
+    assert result['converged']
+    tolerance = 1e-6 * np.abs(result['head_loss']).max()
+    grid = np.arange(n_rows * n_cols).reshape(n_rows, n_cols)
+    for i in range(n_rows - 1):
+        for j in range(n_cols - 1):
+            cell = [grid[i, j], grid[i, j + 1], grid[i + 1, j + 1], grid[i + 1, j]]
+            assert abs(_loop_head_loss(network, result, [int(n) for n in cell])) < tolerance
+    np.testing.assert_allclose(_node_balance(network, result), 0.0, atol=1e-9)
@@ -0,0 +1,33 @@
+import numpy as np
+from utils.calculations import pipe_K_total
+from utils.pipe_segment import PipeColumns, new_pipe
+
+def _random_pipes(rng, n):
+    return [
+        new_pipe(
+            i + 1,
+            diameter=float(rng.uniform(0.02, 0.5)),
+            has_contraction=bool(rng.random() < 0.5),
+            contraction_ratio=float(rng.choice([0.5, 1.0, rng.uniform(1.0, 4.0)])),
+            has_expansion=bool(rng.random() < 0.5),
+            expansion_ratio=float(rng.choice([0.5, 1.0, rng.uniform(1.0, 4.0)])),
+            has_curves=bool(rng.random() < 0.5),
+            n_curves=int(rng.integers(1, 6)),
+            has_valve_gate=bool(rng.random() < 0.5),
+            has_valve_globe=bool(rng.random() < 0.5),
+            has_valve_ball=bool(rng.random() < 0.5),
+            has_valve_check=bool(rng.random() < 0.5),
+            has_tee_through=bool(rng.random() < 0.5),
+            n_tee_through=int(rng.integers(1, 4)),
+            has_tee_branch=bool(rng.random() < 0.5),
+            n_tee_branch=int(rng.integers(1, 4))
+        )
+        for i in range(n)
+    ]
+
+def test_K_total_das_colunas_igual_ao_de_pipe_K_total():
+    pipes = _random_pipes(np.random.default_rng(0), 500)
+
+    K = PipeColumns.from_pipes(pipes).K_total()
+
+    np.testing.assert_allclose(K, [pipe_K_total(pipe) for pipe in pipes], rtol=1e-12, atol=0)
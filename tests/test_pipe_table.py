@@ -0,0 +1,16 @@
+from utils.pipe_table import read_pipe_file, validate_pipe_frame
+
+def test_virgula_decimal_com_celula_invalida_aponta_so_a_linha_invalida():
+    content = (
+        "id;material;diameter;length\n"
+        "1;Aço comercial;0,05;10,5\n"
+        "2;Aço comercial;0,1;20\n"
+        "3;Aço comercial;abc;30\n"
+        "4;Aço comercial;0,2;40\n"
+    ).encode('utf-8')
+
+    frame, errors = validate_pipe_frame(read_pipe_file(content, 'trechos.csv'))
+
+    assert errors[['linha', 'coluna']].values.tolist() == [[3, 'diameter']]
+    assert frame['diameter'].tolist() == [0.05, 0.1, 0.1, 0.2]
+    assert frame['length'].tolist() == [10.5, 20.0, 30.0, 40.0]
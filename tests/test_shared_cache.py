@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+from utils.result_cache import ResultCache
+from utils.shared_cache import SharedCache
+
+def test_resultado_compartilhado_nao_pode_ser_alterado_por_outra_sessao():
+    shared = SharedCache('teste')
+    pressures = np.array([3.0e5, 2.9e5])
+    first, _ = ResultCache(shared=shared, session='a').get_or_compute(
+        'chave', lambda: ({'P_out': pressures}, [{'id': 1, 'P_out': 2.9e5}])
+    )
+    (solution, rows), hit = ResultCache(shared=shared, session='b').get_or_compute('chave', lambda: None)
+
+    assert hit and solution is first[0]
+    with pytest.raises(ValueError):
+        solution['P_out'][0] = 0.0
+    with pytest.raises(TypeError):
+        solution['P_out'] = None
+    with pytest.raises(TypeError):
+        rows[0]['P_out'] = 0.0
+    with pytest.raises(AttributeError):
+        rows.append({})
+    with pytest.raises(ValueError):
+        pressures[0] = 0.0
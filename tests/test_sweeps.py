@@ -0,0 +1,31 @@
+import numpy as np
+from utils.calculations import LOSSES_BYTES_PER_ELEMENT
+from utils.pipe_segment import new_pipe
+from utils.sweeps import flow_rate_sweep, material_what_if
+from utils.system_model import SystemModel
+
+RHO, MU = 998.2, 1.002e-3
+
+def _model(n):
+    return SystemModel.from_pipes([new_pipe(i + 1, diameter=0.05 + 0.01 * (i % 5)) for i in range(n)])
+
+def test_varredura_de_vazao_em_blocos_igual_a_de_um_bloco():
+    model = _model(20)
+    reports = []
+    whole = flow_rate_sweep(model, RHO, MU, 0.0, 0.05, 101)
+    blocks = flow_rate_sweep(model, RHO, MU, 0.0, 0.05, 101,
+                             memory_limit=7 * len(model) * LOSSES_BYTES_PER_ELEMENT,
+                             progress=lambda done, total: reports.append((done, total)))
+
+    for name in ('head_losses', 'velocities'):
+        np.testing.assert_array_equal(blocks[name], whole[name])
+    assert len(reports) == 15 and reports[-1] == (101, 101)
+
+def test_comparacao_de_materiais_informa_progresso_por_material():
+    reports = []
+    materials = {'PVC': 1.5e-6, 'Aço comercial': 4.5e-5, 'Ferro fundido': 2.6e-4}
+    result = material_what_if(_model(10), RHO, MU, 0.01, 300000.0, materials,
+                              progress=lambda done, total: reports.append((done, total)))
+
+    assert reports == [(1, 3), (2, 3), (3, 3)]
+    assert result['delta_head'].shape == (3, 10)
@@ -0,0 +1,18 @@
+from utils.calculations import LOSSES_BYTES_PER_ELEMENT
+from utils.pipe_segment import new_pipe
+from utils.system_model import SystemModel
+from utils.uncertainty import monte_carlo_chunks
+
+FLUID = {'fluid_type': "Água", 'temp': 20.0, 'pressure_inlet': 300000.0}
+
+def test_bloco_do_monte_carlo_respeita_o_limite_de_memoria_com_muitos_trechos():
+    n_segments = 10000
+    memory_limit = 64 * 2**20
+    model = SystemModel.from_pipes([new_pipe(i + 1) for i in range(n_segments)])
+
+    chunks = monte_carlo_chunks(model, 0.01, 300000.0, FLUID, n_samples=100000,
+                                seed=0, memory_limit=memory_limit)
+    first_chunk, _ = next(chunks)
+
+    assert first_chunk >= 1
+    assert first_chunk * n_segments * LOSSES_BYTES_PER_ELEMENT <= memory_limit
@@ -0,0 +1,39 @@
+import numpy as np
+from config.settings import GRAVITY
+from utils.pipe_segment import new_pipe
+from utils.system_model import SystemModel
+from utils.water_hammer import simulate_water_hammer, valve_closure_schedule
+
+RHO, MU = 998.2, 1.002e-3
+
+def test_fechamento_instantaneo_produz_o_golpe_de_joukowsky():
+    model = SystemModel.from_pipes([new_pipe(1, diameter=0.1, length=1000.0)])
+    flow_rate = 0.01
+
+    result = simulate_water_hammer(model, flow_rate, RHO, MU, 5e5, 1000.0, duration=1.5,
+                                   n_reaches=200, valve_schedule=valve_closure_schedule(0.0))
+
+    a = result['wave_speeds'][-1]
+    surge = RHO * a * flow_rate / model.area[-1]
+    assert np.isclose(result['joukowsky'], surge)
+    valve = result['probes'][:, -1]
+    # Primeiro passo: ΔP = ρ·a·ΔV exato; até a reflexão (2L/a) a pressão
+    # só cresce pelo empacotamento da linha, limitado pela perda por atrito
+    assert np.isclose(valve[1] - valve[0], surge, rtol=1e-9)
+    line_packing = RHO * GRAVITY * model.losses(flow_rate, RHO, MU)['h_distributed'].sum()
+    rise = valve[result['t'] < result['wave_period']].max() - valve[0]
+    assert surge <= rise <= surge + line_packing
+
+def test_sem_manobra_o_regime_permanente_se_mantem():
+    model = SystemModel.from_pipes([
+        new_pipe(1, diameter=0.1, length=400.0, elevation_change=5.0, has_curves=True, n_curves=3),
+        new_pipe(2, diameter=0.08, length=250.0, has_valve_globe=True),
+        new_pipe(3, diameter=0.1, length=300.0, elevation_change=-2.0, has_valve_gate=True)
+    ])
+
+    result = simulate_water_hammer(model, 0.008, RHO, MU, 6e5, [1200.0, 1100.0, 1000.0], duration=5.0,
+                                   n_reaches=300, existing_valve=True)
+
+    tolerance = 1e-9 * result['pressure_initial'].max()
+    np.testing.assert_allclose(result['pressure_max'], result['pressure_initial'], atol=tolerance)
+    np.testing.assert_allclose(result['pressure_min'], result['pressure_initial'], atol=tolerance)
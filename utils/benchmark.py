@@ -0,0 +1,214 @@
+"""
+Medição de desempenho (tempo e pico de memória) com comparação a uma
+linha de base em JSON
+
+Não depende do Streamlit: os casos chamam diretamente os módulos de cálculo.
+"""
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+class BenchmarkCase:
+    """
+    Caso de benchmark
+    name: Identificador estável (chave na linha de base)
+    setup: Função sem argumentos que prepara os dados (não é medida)
+    run: Função que recebe o retorno de setup e executa o trabalho medido
+    group: Agrupamento para relatórios (p.ex. 'propriedades', 'sistema')
+    """
+
+    def __init__(self, name, run, setup=None, group=None):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.group = group or 'geral'
+
+def measure(func, repeat=5, min_time=0.05, max_number=100000):
+    """
+    Tempo por chamada de func()
+
+    O número de chamadas por repetição é calibrado para que cada repetição
+    dure pelo menos min_time, o que reduz o ruído em funções muito rápidas.
+    O pico de memória é medido à parte, em uma única chamada sob tracemalloc
+    (que deixaria os tempos mais lentos).
+
+    Retorna: dicionário com time_min e time_median (s por chamada), number,
+    repeat e memory_peak (bytes)
+    """
+    func()  # aquecimento (importações, caches, alocações iniciais)
+
+    # Como no timeit, o coletor de lixo fica desligado durante as medições
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        number = 1
+        while number < max_number:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            if time.perf_counter() - start >= min_time:
+                break
+            number *= 2
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            timings.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        func()
+        _, memory_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'time_min': min(timings),
+        'time_median': statistics.median(timings),
+        'number': number,
+        'repeat': repeat,
+        'memory_peak': memory_peak
+    }
+
+def run_suite(cases, repeat=5, min_time=0.05, name_filter=None, progress=None):
+    """
+    Executa os casos e retorna {nome: medição (ver measure) + group}
+    name_filter: Executa apenas casos cujo nome contém este texto
+    progress: Função chamada com (caso, medição) após cada caso
+    """
+    results = {}
+    for case in cases:
+        if name_filter and name_filter not in case.name:
+            continue
+        data = case.setup() if case.setup is not None else None
+        result = measure(lambda: case.run(data), repeat, min_time)
+        result['group'] = case.group
+        results[case.name] = result
+        if progress is not None:
+            progress(case, result)
+    return results
+
+def best_of(*runs):
+    """
+    Combina execuções de run_suite mantendo, por caso, o menor tempo e o
+    menor pico de memória (o ruído da máquina só aumenta as medições)
+    """
+    combined = {}
+    for results in runs:
+        for name, result in results.items():
+            if name not in combined:
+                combined[name] = dict(result)
+                continue
+            best = combined[name]
+            for key in ('time_min', 'time_median', 'memory_peak'):
+                best[key] = min(best[key], result[key])
+    return combined
+
+def environment_info():
+    """Versões e máquina, gravadas junto da linha de base"""
+    import fluids
+    import scipy
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'scipy': scipy.__version__,
+        'fluids': fluids.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'system': platform.system()
+    }
+
+def load_baseline(path):
+    """Linha de base gravada por save_baseline, ou None se o arquivo não existir"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def save_baseline(path, results, time_threshold=0.25, memory_threshold=0.25):
+    """
+    Grava os resultados como linha de base
+
+    Os limites de regressão (aumento relativo tolerado) ficam no próprio
+    arquivo, para que a comparação use sempre os mesmos critérios.
+    """
+    baseline = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': environment_info(),
+        'time_threshold': time_threshold,
+        'memory_threshold': memory_threshold,
+        'results': {
+            name: {key: result[key] for key in ('group', 'time_min', 'time_median', 'memory_peak')}
+            for name, result in sorted(results.items())
+        }
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    return baseline
+
+def compare_to_baseline(results, baseline, time_threshold=None, memory_threshold=None,
+                        time_floor=5e-6, memory_floor=64 * 1024):
+    """
+    Compara medições com a linha de base
+    time_threshold, memory_threshold: Aumento relativo tolerado (0.25 =
+        25%); por padrão, os valores gravados na linha de base
+    time_floor, memory_floor: Diferenças absolutas abaixo destes valores
+        (s, bytes) nunca contam como regressão, pois estão no nível do ruído
+
+    Retorna: lista de dicionários por caso com name, time_ratio,
+    memory_ratio, status ('ok', 'regressão', 'melhoria' ou 'novo')
+    """
+    if time_threshold is None:
+        time_threshold = baseline.get('time_threshold', 0.25)
+    if memory_threshold is None:
+        memory_threshold = baseline.get('memory_threshold', 0.25)
+
+    comparison = []
+    for name, result in results.items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            comparison.append({
+                'name': name, 'time_ratio': None, 'memory_ratio': None,
+                'slower': False, 'bigger': False, 'status': 'novo'
+            })
+            continue
+
+        time_ratio = result['time_min'] / max(reference['time_min'], 1e-12)
+        memory_ratio = result['memory_peak'] / max(reference['memory_peak'], 1)
+
+        slower = (time_ratio > 1 + time_threshold
+                  and result['time_min'] - reference['time_min'] > time_floor)
+        bigger = (memory_ratio > 1 + memory_threshold
+                  and result['memory_peak'] - reference['memory_peak'] > memory_floor)
+
+        if slower or bigger:
+            status = 'regressão'
+        elif time_ratio < 1 / (1 + time_threshold):
+            status = 'melhoria'
+        else:
+            status = 'ok'
+
+        comparison.append({
+            'name': name,
+            'time_ratio': time_ratio,
+            'memory_ratio': memory_ratio,
+            'slower': slower,
+            'bigger': bigger,
+            'status': status
+        })
+    return comparison
@@ -1,7 +1,14 @@
 import math
+import threading
+from collections import OrderedDict
+import numpy as np
 from fluids import friction_factor, Reynolds
-from config.settings import GRAVITY
+from fluids.friction import LAMINAR_TRANSITION_PIPE
+from config.settings import GRAVITY, SHARED_TABLE_MAXSIZE, SHARED_TABLE_MAX_BYTES
 from utils.loss_coefficients import *
+from utils.open_channel import ChannelSections
+from utils.profiling import timed
+from utils.shared_cache import shared_resource
 
 def Froude(V, L, g=GRAVITY):
     """
@@ -12,74 +19,171 @@ def Froude(V, L, g=GRAVITY):
     """
     return V / (g * L)**0.5
 
-def calculate_pipe_losses(pipe, flow_rate, rho, mu, g=GRAVITY):
+class FrictionFactorCache:
     """
-    Calcula todas as perdas de carga para um trecho de tubulação
+    Cache LRU limitado para fluids.friction_factor, com chave (Re, eD, método)
     
-    Retorna: dicionário com resultados detalhados
+    maxsize: Número máximo de entradas (as menos usadas são descartadas)
+    quantization: Passo relativo q da quantização de Re e eD
+    
+    Re e eD são arredondados para a grade logarítmica (1+q)^k e o fator de
+    atrito é avaliado no ponto da grade, de modo que valores próximos
+    compartilham a mesma entrada e o resultado não depende da ordem das
+    consultas. Cada variável se desloca no máximo ln(1+q)/2 em escala log e,
+    como |d ln f/d ln Re| <= 1 e |d ln f/d ln eD| <= 0.5 para eD <= 0.05,
+    o erro relativo em f fica limitado a q (padrão: 1e-6).
+    quantization = 0 usa chaves exatas (erro nulo).
     """
-    # Área e velocidade no trecho
-    A = math.pi * (pipe['diameter']/2)**2
-    V = flow_rate / A
     
-    # Reynolds e fator de atrito
-    Re = Reynolds(V=V, D=pipe['diameter'], rho=rho, mu=mu)
-    try:
-        f = friction_factor(Re=Re, eD=pipe['roughness']/pipe['diameter'])
-    except:
-        f = 0.02
+    def __init__(self, maxsize=4096, quantization=1e-6):
+        self.maxsize = maxsize
+        self.quantization = quantization
+        self._log_step = math.log1p(quantization) if quantization > 0 else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
     
-    # Perda distribuída
-    h_distributed = f * (pipe['length'] / pipe['diameter']) * (V**2 / (2 * g))
+    def _quantize(self, x):
+        """Retorna (chave, valor representativo) de x na grade logarítmica"""
+        if self._log_step is None or not x > 0 or math.isinf(x):
+            return x, x
+        k = round(math.log(x) / self._log_step)
+        return k, math.exp(k * self._log_step)
     
-    # Perdas localizadas
-    h_local = 0
+    def get(self, Re, eD, method='Clamond'):
+        """
+        Fator de atrito de Darcy para (Re, eD) pelo método indicado
+        Erros de avaliação (p.ex. Re = 0) retornam f = 0.02, como em
+        calculate_pipe_losses.
+        """
+        key_Re, Re_q = self._quantize(Re)
+        key_eD, eD_q = self._quantize(eD)
+        key = (key_Re, key_eD, method)
+        
+        with self._lock:
+            f = self._entries.get(key)
+            if f is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return f
+            self.misses += 1
+        
+        try:
+            f = friction_factor(Re=Re_q, eD=eD_q, Method=method)
+        except:
+            f = 0.02
+        
+        with self._lock:
+            self._entries[key] = f
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        
+        return f
+    
+    def clear(self):
+        """Esvazia o cache e zera os contadores"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+    
+    def stats(self):
+        """Contadores de acertos, falhas e descartes"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'quantization': self.quantization,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+# Cache padrão do processo, usado por calculate_pipe_losses
+FRICTION_CACHE = FrictionFactorCache()
+
+def configure_friction_cache(maxsize=4096, quantization=1e-6):
+    """
+    Substitui o cache padrão de fator de atrito por um novo com os parâmetros dados
+    """
+    global FRICTION_CACHE
+    FRICTION_CACHE = FrictionFactorCache(maxsize, quantization)
+    return FRICTION_CACHE
+
+@timed('atrito/fluids')
+def cached_friction_factor(Re, eD, method='Clamond'):
+    """
+    Fator de atrito de Darcy através do cache padrão (ver FrictionFactorCache)
+    """
+    return FRICTION_CACHE.get(Re, eD, method)
+
+def pipe_K_total(pipe):
+    """
+    Soma os coeficientes K de todos os acessórios de um trecho
+    pipe: Dicionário com dados do tubo
+
+    Os coeficientes vêm de K_table (tabela compartilhada entre as sessões,
+    endereçada pelas razões de contração e expansão do trecho).
+    """
+    has_contraction = pipe.get('has_contraction', False)
+    has_expansion = pipe.get('has_expansion', False)
+    K = K_table(pipe.get('contraction_ratio', 2.0) if has_contraction else None,
+                pipe.get('expansion_ratio', 2.0) if has_expansion else None)
     K_total = 0
     
-    if pipe.get('has_contraction', False):
-        K = K_contraction_round(D1=pipe['diameter']*pipe.get('contraction_ratio', 2.0), D2=pipe['diameter'])
-        h_local += K * (V**2 / (2 * g))
-        K_total += K
+    if has_contraction:
+        K_total += K['contraction']
     
-    if pipe.get('has_expansion', False):
-        K = K_expansion_round(D1=pipe['diameter'], D2=pipe['diameter']*pipe.get('expansion_ratio', 2.0))
-        h_local += K * (V**2 / (2 * g))
-        K_total += K
+    if has_expansion:
+        K_total += K['expansion']
     
     if pipe.get('has_curves', False):
-        K = K_90_rounded(D=pipe['diameter']) * pipe.get('n_curves', 1)
-        h_local += K * (V**2 / (2 * g))
-        K_total += K
+        K_total += K['curve'] * pipe.get('n_curves', 1)
     
     if pipe.get('has_valve_gate', False):
-        K = K_valve_gate_open()
-        h_local += K * (V**2 / (2 * g))
-        K_total += K
+        K_total += K['valve_gate']
     
     if pipe.get('has_valve_globe', False):
-        K = K_valve_globe_open()
-        h_local += K * (V**2 / (2 * g))
-        K_total += K
+        K_total += K['valve_globe']
     
     if pipe.get('has_valve_ball', False):
-        K = K_valve_ball_open()
-        h_local += K * (V**2 / (2 * g))
-        K_total += K
+        K_total += K['valve_ball']
     
     if pipe.get('has_valve_check', False):
-        K = K_valve_check()
-        h_local += K * (V**2 / (2 * g))
-        K_total += K
+        K_total += K['valve_check']
     
     if pipe.get('has_tee_through', False):
-        K = K_tee_through() * pipe.get('n_tee_through', 1)
-        h_local += K * (V**2 / (2 * g))
-        K_total += K
+        K_total += K['tee_through'] * pipe.get('n_tee_through', 1)
     
     if pipe.get('has_tee_branch', False):
-        K = K_tee_branch() * pipe.get('n_tee_branch', 1)
-        h_local += K * (V**2 / (2 * g))
-        K_total += K
+        K_total += K['tee_branch'] * pipe.get('n_tee_branch', 1)
+    
+    return K_total
+
+@timed('perdas/trecho')
+def calculate_pipe_losses(pipe, flow_rate, rho, mu, g=GRAVITY):
+    """
+    Calcula todas as perdas de carga para um trecho de tubulação
+    
+    Retorna: dicionário com resultados detalhados
+    """
+    # Área e velocidade no trecho
+    A = math.pi * (pipe['diameter']/2)**2
+    V = flow_rate / A
+    
+    # Reynolds e fator de atrito
+    Re = Reynolds(V=V, D=pipe['diameter'], rho=rho, mu=mu)
+    f = cached_friction_factor(Re, pipe['roughness']/pipe['diameter'])
+    
+    # Perda distribuída
+    h_distributed = f * (pipe['length'] / pipe['diameter']) * (V**2 / (2 * g))
+    
+    # Perdas localizadas
+    K_total = pipe_K_total(pipe)
+    h_local = K_total * (V**2 / (2 * g))
     
     # Perda total no trecho
     h_total_pipe = h_distributed + h_local + pipe.get('elevation_change', 0)
@@ -104,33 +208,195 @@ def calculate_pipe_losses(pipe, flow_rate, rho, mu, g=GRAVITY):
         'K_total': K_total
     }
 
+@timed('atrito/vetorizado')
+def friction_factor_array(Re, eD, method='Clamond'):
+    """
+    Fator de atrito de Darcy vetorizado (mesmo critério de fluids.friction_factor)
+    Re: Número(s) de Reynolds
+    eD: Rugosidade(s) relativa(s)
+    method: Correlação de fluids.friction_factor
+    
+    Usa f = 64/Re abaixo de Re = 2040 e a solução de Clamond para Colebrook
+    acima disso. Pontos inválidos (Re <= 0) recebem f = 0.02, como no
+    caminho escalar. Outros métodos são avaliados ponto a ponto através do
+    cache de fator de atrito, uma vez por par (Re, eD) distinto.
+    """
+    Re, eD = np.broadcast_arrays(np.asarray(Re, dtype=float), np.asarray(eD, dtype=float))
+    
+    if method not in (None, 'Clamond'):
+        pairs, inverse = np.unique(np.stack([Re.ravel(), eD.ravel()], axis=1), axis=0, return_inverse=True)
+        f_unique = np.array([cached_friction_factor(Re_i, eD_i, method) for Re_i, eD_i in pairs])
+        return f_unique[inverse.ravel()].reshape(Re.shape)
+    
+    f = np.full(Re.shape, 0.02)
+    
+    valid = np.isfinite(Re) & (Re > 0)
+    laminar = valid & (Re < LAMINAR_TRANSITION_PIPE)
+    turbulent = valid & ~laminar
+    
+    f[laminar] = 64.0 / Re[laminar]
+    
+    # Clamond (2009): duas iterações, mesma precisão de fluids.Clamond
+    Re_t = Re[turbulent]
+    X1 = eD[turbulent] * Re_t * 0.1239681863354175460160858261654858382699
+    X2 = np.log(Re_t) - 0.7793974884556819406441139701653776731705
+    F = X2 - 0.2
+    X1F = X1 + F
+    X1F1 = 1. + X1F
+    E = (np.log(X1F) - 0.2) / X1F1
+    F = F - (X1F1 + 0.5*E)*E*X1F / (X1F1 + E*(1. + E/3.0))
+    X1F = X1 + F
+    X1F1 = 1. + X1F
+    E = (np.log(X1F) + F - X2) / X1F1
+    b = X1F1 + E*(1. + E/3.0)
+    F = b / (b*F - (X1F1 + 0.5*E)*E*X1F)
+    f[turbulent] = 1.325474527619599502640416597148504422899 * F*F
+    
+    return f
+
+# Rugosidades relativas das curvas do diagrama de Moody (0: tubo liso)
+MOODY_ROUGHNESS = (0.0, 1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 2e-4, 5e-4, 1e-3, 2e-3, 5e-3, 1e-2, 2e-2, 5e-2)
+
+@shared_resource('moody', SHARED_TABLE_MAXSIZE, SHARED_TABLE_MAX_BYTES)
+def moody_grid(Re_min=600.0, Re_max=1e8, n_Re=600, eD=MOODY_ROUGHNESS):
+    """
+    Grade do diagrama de Moody compartilhada entre as sessões (ver
+    utils.shared_cache)
+    Re_min, Re_max, n_Re: Faixa do número de Reynolds (escala log) e número de pontos
+    eD: Rugosidades relativas das curvas (tupla)
+
+    Retorna: dicionário com Re (n_Re), eD (n_eD) e f (n_eD x n_Re), fator de
+    atrito de Darcy de friction_factor_array
+    """
+    Re = np.geomspace(Re_min, Re_max, n_Re)
+    eD = np.asarray(eD, dtype=float)
+    return {'Re': Re, 'eD': eD, 'f': friction_factor_array(Re[np.newaxis, :], eD[:, np.newaxis])}
+
+def pipe_losses_arrays(flow_rate, diameter, length, roughness, K_total, elevation, rho, mu, g=GRAVITY):
+    """
+    Núcleo vetorizado das perdas de carga (mesmas equações de calculate_pipe_losses)
+    
+    Todos os argumentos aceitam escalares ou arrays NumPy compatíveis por
+    broadcasting, p.ex. vazões com shape (n_pontos, 1) e propriedades dos
+    trechos com shape (n_trechos,).
+    
+    Retorna: dicionário de arrays com V, Re, f e as parcelas de perda (m)
+    """
+    diameter = np.asarray(diameter, dtype=float)
+    
+    return losses_from_invariants(
+        flow_rate,
+        diameter,
+        np.pi * (diameter/2)**2,
+        np.asarray(roughness, dtype=float) / diameter,
+        np.asarray(length, dtype=float) / diameter,
+        np.asarray(K_total, dtype=float),
+        np.asarray(elevation, dtype=float),
+        rho, mu, g
+    )
+
+# Memória (bytes) por elemento avaliado em losses_from_invariants, contando
+# os arrays intermediários; usada para dimensionar os blocos do Monte Carlo
+# e das varreduras
+LOSSES_BYTES_PER_ELEMENT = 8 * 24
+
+@timed('perdas/vetorizado')
+def losses_from_invariants(flow_rate, diameter, area, eD, L_D, K_total, elevation, rho, mu, g=GRAVITY):
+    """
+    Perdas de carga a partir das grandezas geométricas já pré-calculadas
+    area: Área da seção (m²)
+    eD: Rugosidade relativa
+    L_D: Razão comprimento / diâmetro
+    K_total: Soma dos coeficientes K dos acessórios
+    
+    Usado por pipe_losses_arrays e por SystemModel, que guarda esses
+    invariantes por trecho para não recalculá-los a cada chamada.
+    """
+    V = np.asarray(flow_rate, dtype=float) / area
+    Re = V * diameter / (mu / rho)
+    f = friction_factor_array(Re, eD)
+    
+    dynamic_head = V**2 / (2 * g)
+    h_distributed = f * L_D * dynamic_head
+    h_local = K_total * dynamic_head
+    h_elevation = np.broadcast_to(elevation, h_distributed.shape)
+    
+    return {
+        'V': V,
+        'Re': Re,
+        'f': f,
+        'h_distributed': h_distributed,
+        'h_local': h_local,
+        'h_elevation': h_elevation,
+        'h_total': h_distributed + h_local + h_elevation
+    }
+
+def flow_regime_array(Re):
+    """
+    Classificação do regime (mesmos limites de calculate_pipe_losses) para um array de Re
+    """
+    Re = np.asarray(Re)
+    return np.select([Re < 2300, Re < 4000], ["Laminar", "Transição"], default="Turbulento")
+
+def calculate_system_losses_batch(pipes, flow_rates, rho, mu, g=GRAVITY):
+    """
+    Calcula as perdas de todos os trechos para um conjunto de vazões de uma vez
+    pipes: Lista de trechos (mesmo formato de st.session_state.pipes)
+    flow_rates: Vazão ou array de vazões (m³/s)
+    
+    Retorna: dicionário de arrays com shape (n_vazões, n_trechos)
+    """
+    Q = np.atleast_1d(np.asarray(flow_rates, dtype=float))[:, np.newaxis]
+    
+    return pipe_losses_arrays(
+        Q,
+        [pipe['diameter'] for pipe in pipes],
+        [pipe['length'] for pipe in pipes],
+        [pipe['roughness'] for pipe in pipes],
+        [pipe_K_total(pipe) for pipe in pipes],
+        [pipe.get('elevation_change', 0) for pipe in pipes],
+        rho, mu, g
+    )
+
 def normal_depth(Q, b, S, n):
     """
-    Calcula a profundidade normal em um canal aberto usando iteração
+    Calcula a profundidade normal em um canal aberto retangular
     Q: Vazão (m³/s)
     b: Largura do canal (m)
     S: Inclinação do canal
     n: Coeficiente de Manning
+
+    Resolve A^(5/3)·P^(-2/3) = n·Q/√S por Newton protegido por intervalo.
+    Arrays são resolvidos em lote por utils.open_channel.ChannelSections,
+    que também trata seções trapezoidais e circulares.
     """
-    y_guess = 1.0
-    tolerance = 1e-6
-    max_iter = 100
-    
-    for i in range(max_iter):
-        A = b * y_guess
-        P = b + 2 * y_guess
-        R = A / P
-        Q_calc = (1/n) * A * (R**(2/3)) * (S**0.5)
-        
-        if abs(Q_calc - Q) < tolerance:
-            return y_guess
-        
-        if Q_calc < Q:
-            y_guess *= 1.1
+    if not (np.ndim(Q) == np.ndim(b) == np.ndim(S) == np.ndim(n) == 0):
+        shape = np.broadcast_shapes(np.shape(Q), np.shape(b), np.shape(S), np.shape(n))
+        return ChannelSections(width=np.broadcast_to(b, shape)).normal_depth(Q, S, n)
+    if S <= 0 or Q <= 0 or b <= 0:
+        return math.nan
+
+    target = n * Q / math.sqrt(S)
+    lo, hi = 0.0, (target / b)**0.6
+    while hi**(5/3) * b**(5/3) / (b + 2 * hi)**(2/3) < target:
+        lo, hi = hi, 2 * hi
+    y = 0.5 * (lo + hi)
+    for _ in range(100):
+        A = b * y
+        P = b + 2 * y
+        conveyance = A**(5/3) / P**(2/3)
+        residual = conveyance - target
+        if residual > 0:
+            hi = y
         else:
-            y_guess *= 0.9
-    
-    return y_guess
+            lo = y
+        y_new = y - residual / (conveyance * (5/3 * b / A - 2/3 * 2 / P))
+        if not lo < y_new < hi:
+            y_new = 0.5 * (lo + hi)
+        if abs(y_new - y) <= 1e-12 * y:
+            return y_new
+        y = y_new
+    return y
 
 def critical_depth(Q, b, g=GRAVITY):
     """
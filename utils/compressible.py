@@ -0,0 +1,222 @@
+"""
+Escoamento compressível isotérmico de gases em trechos em série
+
+A densidade é recalculada na pressão local (rho_air / rho_ideal_gas) ao
+longo de cada trecho, em vez de fixada na pressão de entrada. A equação da
+quantidade de movimento para gás ideal isotérmico,
+
+    dP/dx = -[G²/(2ρ)·(f/D + K/L) + ρ·g·Δz/L] / (1 - G²/(ρ·P))
+
+é integrada com passo adaptativo (Runge-Kutta de Bogacki-Shampine 3(2)):
+o passo cresce enquanto o erro estimado fica abaixo da tolerância, de modo
+que trechos com pouca variação de densidade custam poucas avaliações de
+propriedades. Com temperatura constante, μ e portanto Re e f são
+constantes em cada trecho; só a densidade varia.
+"""
+import numpy as np
+from config.settings import GRAVITY, GAS_CONSTANT, AIR_GAS_CONSTANT, GAS_HEAT_CAPACITY_RATIO
+from utils.calculations import friction_factor_array
+from utils.fluid_properties import FLUID_MODELS, get_fluid_properties
+from utils.profiling import timed
+
+# Fluidos tratados como gás ideal no modo compressível
+GAS_FLUIDS = ("Ar", "Gás ideal")
+
+# Coeficientes do par embutido de Bogacki-Shampine 3(2)
+_B3 = (2/9, 1/3, 4/9)
+_ERR = (-5/72, 1/12, 1/9, -1/8)
+
+def specific_gas_constant(fluid_type, gas_molar_mass=0.02896):
+    """Constante do gás (J/(kg·K)) usada na velocidade do som"""
+    if fluid_type == "Ar":
+        return AIR_GAS_CONSTANT
+    return GAS_CONSTANT / gas_molar_mass
+
+def speed_of_sound(fluid_type, temp, gas_molar_mass=0.02896, gamma=GAS_HEAT_CAPACITY_RATIO):
+    """Velocidade do som (m/s) no gás à temperatura temp (°C)"""
+    return np.sqrt(gamma * specific_gas_constant(fluid_type, gas_molar_mass) * (temp + 273.15))
+
+class _DensityModel:
+    """
+    Densidade na pressão local, contando as avaliações de propriedades
+
+    Chama diretamente o modelo do fluido em FLUID_MODELS, sem a conversão
+    de temperatura e a instrumentação de get_fluid_properties a cada passo.
+    """
+
+    def __init__(self, fluid_type, temp, gas_molar_mass):
+        self.model = FLUID_MODELS[fluid_type]
+        self.T_K = temp + 273.15
+        self.gas_molar_mass = gas_molar_mass
+        self.evaluations = 0
+
+    def __call__(self, pressure):
+        self.evaluations += 1
+        return self.model(self.T_K, pressure, self.gas_molar_mass)[0]
+
+def _segment_slope(density, G, resistance, elevation_slope, g):
+    """
+    Função dP/dx de um trecho; retorna (dP/dx, ρ) ou (nan, nan) onde o
+    escoamento não é possível (pressão não positiva ou além do
+    estrangulamento)
+    """
+    def slope(P):
+        if not P > 0:
+            return np.nan, np.nan
+        rho = density(P)
+        denominator = 1.0 - G * G / (rho * P)
+        if denominator <= 0:
+            return np.nan, rho
+        return -(G * G / (2 * rho) * resistance + rho * g * elevation_slope) / denominator, rho
+    return slope
+
+@timed('compressivel/sistema')
+def solve_compressible_system(model, flow_rate, fluid_type, temp, pressure_inlet,
+                              gas_molar_mass=0.02896, rtol=1e-6, max_steps=10000,
+                              gamma=GAS_HEAT_CAPACITY_RATIO, g=GRAVITY):
+    """
+    Resolve o sistema em série com densidade variável
+    model: SystemModel do sistema
+    flow_rate: Vazão (m³/s) nas condições de entrada; a vazão mássica
+               ρ_entrada·Q é a mesma em todos os trechos
+    fluid_type: "Ar" ou "Gás ideal"
+    temp: Temperatura (°C), constante ao longo da linha
+    rtol: Tolerância do erro de cada passo, relativa à pressão de entrada
+
+    As perdas localizadas (K) são distribuídas ao longo do trecho como um
+    comprimento equivalente. O número de Mach usa a velocidade do som
+    adiabática √(γRT); no escoamento isotérmico o estrangulamento ocorre em
+    Mach = 1/√γ. Se ele for atingido, a integração para no ponto de
+    estrangulamento e os trechos seguintes ficam com NaN.
+
+    Retorna: dicionário com mass_flow, pressure_outlet, max_mach,
+    mach_limit, converged (False se max_steps foi atingido), choked,
+    choke_segment (id), choke_position (m), steps, rejected_steps,
+    property_evaluations, segments (arrays por trecho:
+    P_in, P_out, rho_in, rho_out, V_in, V_out, mach_in, mach_out, Re, f,
+    steps) e profile (x, P, rho, V, mach nos pontos de integração)
+    """
+    density = _DensityModel(fluid_type, temp, gas_molar_mass)
+    mu = get_fluid_properties(fluid_type, temp, pressure_inlet, gas_molar_mass)[1]
+    sound = speed_of_sound(fluid_type, temp, gas_molar_mass, gamma)
+
+    rho_inlet = density(pressure_inlet)
+    mass_flow = rho_inlet * flow_rate
+    G_all = mass_flow / model.area
+    Re = G_all * model.diameter / mu
+    f = friction_factor_array(Re, model.eD)
+    tolerance = rtol * pressure_inlet
+
+    n_segments = len(model)
+    segments = {name: np.full(n_segments, np.nan) for name in
+                ('P_in', 'P_out', 'rho_in', 'rho_out', 'V_in', 'V_out', 'mach_in', 'mach_out')}
+    segments['Re'] = Re
+    segments['f'] = f
+    segments['steps'] = np.zeros(n_segments, dtype=int)
+
+    profile = {'x': [0.0], 'P': [pressure_inlet], 'rho': [rho_inlet], 'V': [G_all[0] / rho_inlet]}
+    result = {
+        'mass_flow': mass_flow,
+        'choked': False,
+        'choke_segment': None,
+        'choke_position': None,
+        'converged': True,
+        'steps': 0,
+        'rejected_steps': 0
+    }
+
+    P, rho = pressure_inlet, rho_inlet
+    x_start = 0.0
+    for i in range(n_segments):
+        L, G = model.length[i], G_all[i]
+        slope = _segment_slope(density, G, f[i] / model.diameter[i] + model.K_total[i] / L,
+                               model.elevation[i] / L, g)
+        segments['P_in'][i], segments['rho_in'][i] = P, rho
+        segments['V_in'][i] = G / rho
+
+        x = 0.0
+        h = L  # primeiro passo tenta o trecho inteiro
+        k1, _ = slope(P)
+        while x < L and np.isfinite(k1):
+            if result['steps'] + segments['steps'][i] + result['rejected_steps'] >= max_steps:
+                result['converged'] = False
+                break
+            h = min(h, L - x)
+            k2, _ = slope(P + 0.5 * h * k1)
+            k3, _ = slope(P + 0.75 * h * k2)
+            P_new = P + h * (_B3[0] * k1 + _B3[1] * k2 + _B3[2] * k3)
+            k4, rho_new = slope(P_new)
+            error = abs(h * (_ERR[0] * k1 + _ERR[1] * k2 + _ERR[2] * k3 + _ERR[3] * k4))
+
+            if not np.isfinite(error) or error > tolerance:
+                # Passo rejeitado: reduz e tenta de novo a partir de x
+                result['rejected_steps'] += 1
+                if h < L * 1e-9:
+                    break
+                factor = 0.9 * (tolerance / error) ** (1/3) if np.isfinite(error) else 0.25
+                h *= min(max(factor, 0.1), 0.5)
+                continue
+
+            x += h
+            P, rho, k1 = P_new, rho_new, k4
+            segments['steps'][i] += 1
+            profile['x'].append(x_start + x)
+            profile['P'].append(P)
+            profile['rho'].append(rho)
+            profile['V'].append(G / rho)
+            factor = 0.9 * (tolerance / error) ** (1/3) if error > 0 else 5.0
+            h *= min(max(factor, 0.2), 5.0)
+
+        result['steps'] += int(segments['steps'][i])
+        if not result['converged']:
+            break
+        if x < L:
+            result['choked'] = True
+            result['choke_segment'] = model.ids[i].item()
+            result['choke_position'] = float(x_start + x)
+            break
+
+        segments['P_out'][i], segments['rho_out'][i] = P, rho
+        segments['V_out'][i] = G / rho
+        x_start += L
+
+    segments['mach_in'] = segments['V_in'] / sound
+    segments['mach_out'] = segments['V_out'] / sound
+    profile = {name: np.array(values) for name, values in profile.items()}
+    profile['mach'] = profile['V'] / sound
+
+    result.update({
+        'pressure_outlet': float(segments['P_out'][-1]),
+        'max_mach': float(profile['mach'].max()),
+        'mach_limit': 1 / np.sqrt(gamma),
+        'property_evaluations': density.evaluations,
+        'segments': segments,
+        'profile': profile
+    })
+    return result
+
+def choked_flow_rate(model, fluid_type, temp, pressure_inlet, gas_molar_mass=0.02896,
+                     flow_rate_max=None, rtol=1e-3, g=GRAVITY):
+    """
+    Maior vazão (m³/s, nas condições de entrada) que atravessa o sistema
+    sem estrangulamento, por bisseção
+    flow_rate_max: Vazão já conhecida como estrangulada (padrão: procurada
+                   dobrando a partir de 1 m³/s)
+    rtol: Precisão relativa da vazão
+    """
+    def chokes(flow_rate):
+        return solve_compressible_system(
+            model, flow_rate, fluid_type, temp, pressure_inlet, gas_molar_mass, rtol=1e-5, g=g
+        )['choked']
+
+    hi = flow_rate_max if flow_rate_max is not None else 1.0
+    while not chokes(hi):
+        hi *= 2
+    lo = 0.0
+    while hi - lo > rtol * hi:
+        mid = 0.5 * (lo + hi)
+        if chokes(mid):
+            hi = mid
+        else:
+            lo = mid
+    return lo
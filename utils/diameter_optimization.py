@@ -0,0 +1,226 @@
+"""
+Escolha de diâmetros comerciais por trecho (custo de tubulação + bombeamento)
+
+Para uma vazão fixa, a perda de cada trecho depende apenas do seu próprio
+diâmetro. O problema é então uma mochila de múltipla escolha: minimizar a
+soma dos custos com a soma das perdas limitada pela pressão mínima na saída.
+A programação dinâmica percorre os trechos mantendo só os rótulos
+(perda acumulada, custo acumulado) não dominados, em vez de enumerar as
+combinações.
+"""
+import numpy as np
+from config.settings import (
+    GRAVITY, WATER_VELOCITY_MIN, WATER_VELOCITY_MAX, AIR_VELOCITY_MAX,
+    COMMERCIAL_DIAMETERS, PIPE_COST_COEFFICIENT, PIPE_COST_EXPONENT,
+    ENERGY_PRICE, PUMP_EFFICIENCY, OPERATING_HOURS_PER_YEAR, DESIGN_LIFE_YEARS
+)
+from utils.calculations import losses_from_invariants, pipe_K_total
+from utils.system_model import pipe_roughness
+from utils.profiling import timed
+
+# Folga numérica na restrição de pressão (m)
+_HEAD_TOLERANCE = 1e-9
+
+def velocity_limits(fluid_type):
+    """
+    Faixa de velocidade recomendada (m/s) para o fluido, a mesma usada nos
+    alertas da aba de sistema
+    """
+    if fluid_type == "Água":
+        return WATER_VELOCITY_MIN, WATER_VELOCITY_MAX
+    if fluid_type == "Ar":
+        return 0.0, AIR_VELOCITY_MAX
+    return 0.0, np.inf
+
+def energy_cost_per_head(flow_rate, rho, g=GRAVITY, energy_price=ENERGY_PRICE,
+                         efficiency=PUMP_EFFICIENCY, hours_per_year=OPERATING_HOURS_PER_YEAR,
+                         years=DESIGN_LIFE_YEARS):
+    """
+    Custo de bombeamento (R$) de cada metro de perda ao longo da vida útil
+    (potência ρ·g·Q/η, sem desconto financeiro)
+    """
+    power_kW = rho * g * flow_rate / efficiency / 1000
+    return power_kW * hours_per_year * years * energy_price
+
+def candidate_losses(pipes, flow_rate, diameters, rho, mu, g=GRAVITY):
+    """
+    Perdas de cada trecho para cada diâmetro candidato
+    pipes: Lista de trechos (formato de st.session_state.pipes)
+    diameters: Diâmetros candidatos (m)
+
+    Os acessórios são mantidos; os coeficientes K que dependem do diâmetro
+    (curvas) são recalculados para cada candidato.
+
+    Retorna: dicionário de arrays (n_trechos x n_diâmetros) de
+    losses_from_invariants
+    """
+    D = np.asarray(diameters, dtype=float)[np.newaxis, :]
+    length = np.array([pipe['length'] for pipe in pipes], dtype=float)[:, np.newaxis]
+    roughness = np.array([pipe_roughness(pipe) for pipe in pipes], dtype=float)[:, np.newaxis]
+    elevation = np.array([pipe.get('elevation_change', 0.0) for pipe in pipes], dtype=float)[:, np.newaxis]
+    K_total = np.array([
+        [pipe_K_total({**pipe, 'diameter': d}) for d in D[0]] for pipe in pipes
+    ], dtype=float)
+
+    losses = losses_from_invariants(
+        flow_rate, D, np.pi * (D/2)**2, roughness / D, length / D,
+        K_total, elevation, rho, mu, g
+    )
+    return {name: np.broadcast_to(value, K_total.shape) for name, value in losses.items()}
+
+def _lagrangian_upper_bound(cost, head, head_budget, iterations=60):
+    """
+    Custo de uma solução viável: cada trecho escolhe o mínimo de
+    custo + λ·perda, com o menor λ (por bisseção) que cumpre a pressão
+    """
+    rows = np.arange(cost.shape[0])
+    # Opções proibidas já têm custo infinito; zerar a perda evita inf·0
+    finite_head = np.where(np.isfinite(cost), head, 0.0)
+
+    def choose(multiplier):
+        choice = np.argmin(cost + multiplier * finite_head, axis=1)
+        return cost[rows, choice].sum(), head[rows, choice].sum()
+
+    total, used = choose(0.0)
+    if used <= head_budget:
+        return total
+
+    lo, hi = 0.0, 1.0
+    while choose(hi)[1] > head_budget and hi < 1e30:
+        hi *= 10
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        if choose(mid)[1] > head_budget:
+            lo = mid
+        else:
+            hi = mid
+    return choose(hi)[0]
+
+@timed('otimizacao/diametros')
+def optimize_diameters(pipes, flow_rate, rho, mu, pressure_inlet, min_outlet_pressure,
+                       diameters=COMMERCIAL_DIAMETERS, velocity_range=(0.0, np.inf),
+                       cost_coefficient=PIPE_COST_COEFFICIENT, cost_exponent=PIPE_COST_EXPONENT,
+                       energy_cost=None, g=GRAVITY):
+    """
+    Diâmetro comercial ótimo de cada trecho
+    pipes: Lista de trechos (formato de st.session_state.pipes)
+    flow_rate: Vazão de projeto (m³/s)
+    pressure_inlet, min_outlet_pressure: Pressão de entrada e mínima
+                                         admissível na saída (Pa)
+    velocity_range: (V_min, V_max) em m/s (ver velocity_limits)
+    cost_coefficient, cost_exponent: Custo de tubulação a·D^b (R$/m)
+    energy_cost: Custo por metro de perda (R$/m); por padrão,
+                 energy_cost_per_head com os valores de config.settings
+
+    Minimiza Σ custo da tubulação + custo de bombeamento das perdas
+    (distribuída + localizada), com V_min ≤ V ≤ V_max em cada trecho e
+    P_saída ≥ min_outlet_pressure. A cada trecho são descartados os rótulos
+    que não podem mais cumprir a pressão (mesmo com as menores perdas nos
+    trechos restantes) ou que já custam mais que uma solução viável
+    conhecida; dos demais só a fronteira de Pareto perda x custo é mantida.
+
+    Retorna: dicionário com status ('ok', 'velocidade' ou 'pressão'),
+    diameters, velocity, head_loss (por trecho), pipe_cost, energy_cost,
+    total_cost, pressure_outlet, infeasible_segments e labels (rótulos
+    avaliados)
+    """
+    n_segments = len(pipes)
+    diameters = np.asarray(diameters, dtype=float)
+    if energy_cost is None:
+        energy_cost = energy_cost_per_head(flow_rate, rho, g)
+
+    losses = candidate_losses(pipes, flow_rate, diameters, rho, mu, g)
+    V = losses['V']
+    h_total = losses['h_total']
+    h_friction = losses['h_distributed'] + losses['h_local']
+
+    length = np.array([pipe['length'] for pipe in pipes], dtype=float)[:, np.newaxis]
+    cost = cost_coefficient * diameters**cost_exponent * length + energy_cost * h_friction
+
+    result = {
+        'status': 'ok',
+        'diameters': None,
+        'velocity': None,
+        'head_loss': None,
+        'pipe_cost': None,
+        'energy_cost': None,
+        'total_cost': None,
+        'pressure_outlet': None,
+        'infeasible_segments': [],
+        'labels': 0
+    }
+
+    V_min, V_max = velocity_range
+    allowed = (V >= V_min) & (V <= V_max)
+    no_option = ~allowed.any(axis=1)
+    if no_option.any():
+        result['status'] = 'velocidade'
+        result['infeasible_segments'] = [pipes[i]['id'] for i in np.flatnonzero(no_option)]
+        return result
+
+    # Menor perda ainda possível nos trechos seguintes a cada estágio
+    head_budget = (pressure_inlet - min_outlet_pressure) / (rho * g) + _HEAD_TOLERANCE
+    head_options = np.where(allowed, h_total, np.inf)
+    cost_options = np.where(allowed, cost, np.inf)
+    min_head = head_options.min(axis=1)
+    remaining_head = np.concatenate([np.cumsum(min_head[::-1])[::-1][1:], [0.0]])
+    if min_head.sum() > head_budget:
+        result['status'] = 'pressão'
+        return result
+
+    # Limites do branch-and-bound: menor custo ainda possível nos trechos
+    # seguintes e o custo de uma solução viável obtida pela relaxação
+    min_cost = cost_options.min(axis=1)
+    remaining_cost = np.concatenate([np.cumsum(min_cost[::-1])[::-1][1:], [0.0]])
+    rows = np.arange(n_segments)
+    upper_bound = _lagrangian_upper_bound(cost_options, head_options, head_budget) * (1 + 1e-12)
+
+    front_head = np.zeros(1)
+    front_cost = np.zeros(1)
+    parents, choices = [], []
+
+    for i in range(n_segments):
+        options = np.flatnonzero(allowed[i])
+        head = (front_head[:, np.newaxis] + h_total[i, options]).ravel()
+        total = (front_cost[:, np.newaxis] + cost[i, options]).ravel()
+        parent = np.repeat(np.arange(front_head.size), options.size)
+        choice = np.tile(options, front_head.size)
+        result['labels'] += head.size
+
+        # Rótulos que ainda podem cumprir a pressão mínima sem superar o
+        # custo de uma solução viável já conhecida
+        keep = (head + remaining_head[i] <= head_budget) & (total + remaining_cost[i] <= upper_bound)
+        head, total, parent, choice = head[keep], total[keep], parent[keep], choice[keep]
+
+        # Fronteira de Pareto: ordenado por perda, cada rótulo precisa ser
+        # mais barato que todos os de menor perda
+        order = np.lexsort((total, head))
+        head, total, parent, choice = head[order], total[order], parent[order], choice[order]
+        pareto = np.ones(head.size, dtype=bool)
+        pareto[1:] = total[1:] < np.minimum.accumulate(total)[:-1]
+
+        front_head, front_cost = head[pareto], total[pareto]
+        parents.append(parent[pareto])
+        choices.append(choice[pareto])
+
+    # Reconstrução do melhor rótulo final
+    label = int(np.argmin(front_cost))
+    selected = np.empty(n_segments, dtype=int)
+    for i in range(n_segments - 1, -1, -1):
+        selected[i] = choices[i][label]
+        label = parents[i][label]
+
+    head_loss = h_total[rows, selected]
+    pipe_cost = cost_coefficient * diameters[selected]**cost_exponent * length[:, 0]
+    energy = energy_cost * h_friction[rows, selected]
+
+    result.update({
+        'diameters': diameters[selected],
+        'velocity': V[rows, selected],
+        'head_loss': head_loss,
+        'pipe_cost': pipe_cost,
+        'energy_cost': energy,
+        'total_cost': float(pipe_cost.sum() + energy.sum()),
+        'pressure_outlet': float(pressure_inlet - head_loss.sum() * rho * g)
+    })
+    return result
@@ -0,0 +1,98 @@
+"""
+Redução de séries para gráficos
+
+Séries longas são reduzidas a um número fixo de pontos antes de irem para
+o Plotly, de modo que o tamanho do gráfico enviado ao navegador não cresce
+com o número de trechos ou de pontos da varredura. As duas reduções
+preservam o primeiro e o último ponto.
+"""
+import numpy as np
+
+def minmax_indices(y, n_out):
+    """
+    Índices do mínimo e do máximo de cada faixa de pontos consecutivos
+    y: Série (array 1D)
+    n_out: Número máximo de pontos mantidos
+
+    Picos e vales nunca são perdidos, o que torna a redução adequada para
+    perfis de pressão e séries com extremos importantes.
+    """
+    y = np.asarray(y, dtype=float)
+    n = y.size
+    if n <= n_out:
+        return np.arange(n)
+
+    interior = y[1:-1]
+    n_buckets = max(1, (n_out - 2) // 2)
+    size = int(np.ceil(interior.size / n_buckets))
+    rows = int(np.ceil(interior.size / size))
+
+    padded = np.full(rows * size, np.inf)
+    padded[:interior.size] = interior
+    lo = np.argmin(padded.reshape(rows, size), axis=1)
+    padded[interior.size:] = -np.inf
+    hi = np.argmax(padded.reshape(rows, size), axis=1)
+
+    offsets = 1 + size * np.arange(rows)
+    pairs = np.sort(np.stack([lo, hi], axis=1), axis=1) + offsets[:, np.newaxis]
+    return np.unique(np.concatenate(([0], pairs.ravel(), [n - 1])))
+
+def lttb_indices(x, y, n_out):
+    """
+    Índices escolhidos pelo Largest-Triangle-Three-Buckets (Steinarsson, 2013)
+    x, y: Série (arrays 1D, x crescente)
+    n_out: Número de pontos mantidos
+
+    Em cada faixa fica o ponto que forma o maior triângulo com o ponto
+    escolhido na faixa anterior e a média da faixa seguinte, o que preserva
+    a forma visual da curva.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = y.size
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    edges = np.append(edges, n)
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2]
+        x_next = x[next_start:next_end].mean()
+        y_next = y[next_start:next_end].mean()
+        area = np.abs((x[a] - x_next) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (y_next - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def downsample_indices(x, y, n_out, method='minmax'):
+    """Índices da série reduzida a n_out pontos ('minmax' ou 'lttb')"""
+    if method == 'lttb':
+        return lttb_indices(x, y, n_out)
+    if method == 'minmax':
+        return minmax_indices(y, n_out)
+    raise ValueError(f"Método de redução desconhecido: {method}")
+
+def decimate_indices(n, n_max):
+    """Até n_max índices igualmente espaçados de 0 a n-1 (inclusive)"""
+    if n <= n_max:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n - 1, n_max).round().astype(int))
+
+def aggregate_groups(values, n_groups):
+    """
+    Soma grupos de linhas consecutivas
+    values: Array (n, ...) com os valores por trecho
+    n_groups: Número máximo de grupos
+
+    Retorna: (índice inicial de cada grupo, índice final (inclusive), somas)
+    """
+    values = np.asarray(values, dtype=float)
+    n = values.shape[0]
+    starts = decimate_indices(n + 1, n_groups + 1)[:-1] if n > n_groups else np.arange(n)
+    ends = np.append(starts[1:], n) - 1
+    return starts, ends, np.add.reduceat(values, starts, axis=0)
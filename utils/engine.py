@@ -0,0 +1,323 @@
+"""
+Motor de cálculo sem interface (headless)
+
+Resolve sistemas de trechos em série sem depender do Streamlit e executa
+lotes de casos de projeto em paralelo, gravando os resultados em JSON Lines.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from config.settings import GRAVITY
+from utils.calculations import flow_regime_array, losses_from_invariants
+from utils.fluid_properties import get_fluid_properties
+from utils.inverse import solve_flow_rate
+from utils.system_model import SystemModel
+from utils.profiling import timed
+
+# Valores padrão de um caso (mesmos padrões da sidebar)
+CASE_DEFAULTS = {
+    'fluid_type': "Água",
+    'temp': 20.0,
+    'pressure_inlet': 300000.0,
+    'gas_molar_mass': 0.02896,
+    'custom_rho': None,
+    'custom_mu': None,
+    'flow_rate': None,
+    'velocity': None,
+    'pressure_outlet': None
+}
+
+@timed('sistema/solucao')
+def solve_series_system(model, flow_rate, rho, mu, pressure_inlet, g=GRAVITY):
+    """
+    Resolve o sistema em série para uma vazão
+    model: SystemModel do sistema
+    flow_rate: Vazão (m³/s)
+    pressure_inlet: Pressão na entrada do primeiro trecho (Pa)
+
+    Retorna: dicionário com arrays por trecho e os totais do sistema
+    """
+    losses = {name: values[0] for name, values in model.losses(flow_rate, rho, mu, g).items()}
+    return _chain_pressures(model, flow_rate, losses, rho, pressure_inlet, g)
+
+def _chain_pressures(model, flow_rate, losses, rho, pressure_inlet, g):
+    """Monta a solução a partir das perdas por trecho (pressões por soma acumulada)"""
+    h_total = losses['h_total']
+
+    # Pressões de entrada e saída de cada trecho
+    pressures_out = pressure_inlet - np.cumsum(h_total * rho * g)
+    pressures_in = np.concatenate(([pressure_inlet], pressures_out[:-1]))
+
+    return {
+        'flow_rate': flow_rate,
+        'V': losses['V'],
+        'Re': losses['Re'],
+        'f': losses['f'],
+        'h_distributed': losses['h_distributed'],
+        'h_local': losses['h_local'],
+        'h_elevation': losses['h_elevation'],
+        'h_total': h_total,
+        'P_in': pressures_in,
+        'P_out': pressures_out,
+        'total_head_loss': float(h_total.sum()),
+        'total_length': model.total_length,
+        'pressure_outlet': float(pressures_out[-1])
+    }
+
+class IncrementalSeriesSolver:
+    """
+    Solução em série que reaproveita as perdas dos trechos não alterados
+
+    As perdas de cada trecho dependem só dos parâmetros do trecho, da vazão
+    e do fluido. Com vazão e fluido iguais aos da solução anterior, apenas
+    os trechos novos ou alterados (assinatura ausente no modelo anterior)
+    são avaliados; as pressões são refeitas com uma soma acumulada. Mudar a
+    vazão ou o fluido recalcula todos os trechos.
+    """
+
+    def __init__(self):
+        self._state = None
+        self._model = None
+        self._losses = None
+        self.evaluated = 0
+        self.reused = 0
+
+    @timed('sistema/solucao_incremental')
+    def solve(self, model, flow_rate, rho, mu, pressure_inlet, g=GRAVITY):
+        """
+        Mesmo retorno de solve_series_system, com 'evaluated' (trechos
+        avaliados nesta chamada)
+        """
+        state = (float(flow_rate), float(rho), float(mu), float(g))
+        if (state != self._state or self._model is None
+                or self._model.signature is None or model.signature is None):
+            losses = {name: values[0] for name, values in model.losses(flow_rate, rho, mu, g).items()}
+            changed = np.arange(len(model))
+        else:
+            if model.base_signature is self._model.signature:
+                source = model.source  # modelo compilado a partir do anterior
+            else:
+                source = self._model.locate(model.signature)
+            changed = np.flatnonzero(source < 0)
+            reused = np.maximum(source, 0)
+            losses = {name: values[reused] for name, values in self._losses.items()}
+            if changed.size:
+                fresh = losses_from_invariants(
+                    flow_rate, model.diameter[changed], model.area[changed], model.eD[changed],
+                    model.L_D[changed], model.K_total[changed], model.elevation[changed], rho, mu, g
+                )
+                for name, values in fresh.items():
+                    losses[name][changed] = values
+
+        self._state, self._model, self._losses = state, model, losses
+        self.evaluated += changed.size
+        self.reused += len(model) - changed.size
+
+        solution = _chain_pressures(model, flow_rate, losses, rho, pressure_inlet, g)
+        solution['evaluated'] = int(changed.size)
+        return solution
+
+def get_incremental_solver(store):
+    """
+    Retorna o IncrementalSeriesSolver guardado em store (p.ex.
+    st.session_state), criando-o na primeira chamada
+    """
+    solver = store.get('series_solver')
+    if solver is None:
+        solver = IncrementalSeriesSolver()
+        store['series_solver'] = solver
+    return solver
+
+def resolve_flow_rate(model, data, store=None):
+    """
+    Vazão do sistema a partir das entradas da sidebar
+    data: Dicionário retornado por create_sidebar
+    store: Mapeamento (p.ex. st.session_state) onde a última solução do modo
+           inverso é guardada e usada como estimativa inicial no rerun seguinte
+
+    Retorna: (vazão em m³/s, resultado do solver inverso ou None)
+    """
+    input_type = data['input_type']
+    
+    if input_type == "Velocidade (V)":
+        return model.flow_rate_from_velocity(data['velocity']), None
+    
+    if input_type != "Pressão de saída (P)":
+        return data['flow_rate'], None
+    
+    key = (model.key, data['rho'], data['mu'], data['pressure_inlet'], data['pressure_outlet'])
+    previous = store.get('inverse_solution') if store is not None else None
+    
+    # Mesmas entradas: reaproveita a solução (vazão idêntica entre reruns)
+    if previous is not None and previous['key'] == key:
+        return previous['flow_rate'], previous
+    
+    x0 = previous['flow_rate'] if previous is not None and previous['flow_rate'] > 0 else None
+    result = solve_flow_rate(model, data['rho'], data['mu'], data['pressure_inlet'], data['pressure_outlet'], x0)
+    result['key'] = key
+    
+    if store is not None:
+        store['inverse_solution'] = result
+    
+    return result['flow_rate'], result
+
+def segment_rows(model, solution):
+    """
+    Converte a solução vetorial em uma lista de dicionários por trecho
+    (formato usado pelas tabelas e gráficos da aba de sistema)
+    """
+    columns = {
+        'id': model.ids.tolist(),
+        'V': solution['V'].tolist(),
+        'Re': solution['Re'].tolist(),
+        'regime': flow_regime_array(solution['Re']).tolist(),
+        'f': solution['f'].tolist(),
+        'h_distributed': solution['h_distributed'].tolist(),
+        'h_local': solution['h_local'].tolist(),
+        'h_elevation': solution['h_elevation'].tolist(),
+        'h_total': solution['h_total'].tolist(),
+        'P_in': solution['P_in'].tolist(),
+        'P_out': solution['P_out'].tolist(),
+        'K_total': model.K_total.tolist()
+    }
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+def run_case(case):
+    """
+    Executa um caso de projeto
+    case: Dicionário com fluid_type, temp (°C), pressure_inlet (Pa),
+          flow_rate (m³/s) ou velocity (m/s) e pipes (lista de trechos no
+          formato de st.session_state.pipes). Com 'pressure_outlet' (Pa) no
+          lugar da vazão, a vazão é obtida pelo solver inverso.
+
+    Retorna: dicionário serializável em JSON. Erros de um caso são
+    devolvidos no campo 'error' para não interromper o lote.
+    """
+    name = case.get('name')
+
+    try:
+        data = {**CASE_DEFAULTS, **case}
+        pipes = data.get('pipes')
+        if not pipes:
+            raise ValueError("caso sem trechos ('pipes')")
+
+        rho, mu, nu = get_fluid_properties(
+            data['fluid_type'], data['temp'], data['pressure_inlet'],
+            data['gas_molar_mass'], data['custom_rho'], data['custom_mu']
+        )
+
+        model = SystemModel.from_pipes(pipes)
+
+        if data['flow_rate'] is not None:
+            flow_rate = float(data['flow_rate'])
+        elif data['velocity'] is not None:
+            flow_rate = float(model.flow_rate_from_velocity(data['velocity']))
+        elif data['pressure_outlet'] is not None:
+            flow_rate = solve_flow_rate(model, rho, mu, data['pressure_inlet'], data['pressure_outlet'])['flow_rate']
+        else:
+            raise ValueError("informe 'flow_rate', 'velocity' ou 'pressure_outlet'")
+
+        solution = solve_series_system(model, flow_rate, rho, mu, data['pressure_inlet'])
+
+        return {
+            'name': name,
+            'fluid_type': data['fluid_type'],
+            'rho': float(rho),
+            'mu': float(mu),
+            'flow_rate': flow_rate,
+            'pressure_inlet': float(data['pressure_inlet']),
+            'pressure_outlet': solution['pressure_outlet'],
+            'total_head_loss': solution['total_head_loss'],
+            'total_length': solution['total_length'],
+            'segments': segment_rows(model, solution)
+        }
+    except Exception as e:
+        return {'name': name, 'error': f"{type(e).__name__}: {e}"}
+
+def load_cases(path):
+    """
+    Lê casos de um arquivo JSON, JSON Lines ou YAML
+
+    O arquivo pode conter um único caso, uma lista de casos ou um objeto
+    {"defaults": {...}, "cases": [...]}, em que os valores de "defaults"
+    são aplicados a todos os casos. Casos sem nome recebem
+    "<arquivo>#<índice>".
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+
+    with open(path, encoding='utf-8') as file:
+        if suffix in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Leitura de YAML requer o pacote PyYAML (pip install pyyaml)")
+            content = yaml.safe_load(file)
+        elif suffix == '.jsonl':
+            content = [json.loads(line) for line in file if line.strip()]
+        else:
+            content = json.load(file)
+
+    defaults = {}
+    if isinstance(content, dict) and 'cases' in content:
+        defaults = content.get('defaults') or {}
+        content = content['cases']
+    elif isinstance(content, dict):
+        content = [content]
+
+    cases = []
+    for idx, case in enumerate(content):
+        case = {**defaults, **case}
+        case.setdefault('name', f"{path.name}#{idx}")
+        cases.append(case)
+
+    return cases
+
+def run_batch(cases, output_path, workers=None, chunksize=None):
+    """
+    Executa um lote de casos em um pool de processos
+    cases: Iterável de casos (ver run_case)
+    output_path: Arquivo JSON Lines de saída (uma linha por caso)
+    workers: Número de processos (padrão: número de CPUs)
+    chunksize: Casos enviados por vez a cada processo
+
+    Os resultados são gravados à medida que ficam prontos, na ordem dos
+    casos, de modo que um lote interrompido preserva o que já foi calculado.
+
+    Retorna: (número de casos, número de casos com erro)
+    """
+    cases = list(cases)
+    workers = workers or os.cpu_count() or 1
+
+    # Lotes grandes o bastante para amortizar a comunicação entre processos,
+    # pequenos o bastante para manter todos os processos ocupados até o fim
+    if chunksize is None:
+        chunksize = max(1, len(cases) // (workers * 8))
+
+    n_done = 0
+    n_errors = 0
+
+    with open(output_path, 'w', encoding='utf-8') as output:
+        if workers == 1:
+            results = map(run_case, cases)
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            results = executor.map(run_case, cases, chunksize=chunksize)
+
+        try:
+            for result in results:
+                output.write(json.dumps(result, ensure_ascii=False) + '\n')
+                output.flush()
+                n_done += 1
+                if 'error' in result:
+                    n_errors += 1
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    return n_done, n_errors
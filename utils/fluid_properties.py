@@ -1,39 +1,56 @@
+"""
+Propriedades termofísicas dos fluidos
+
+Todas as funções aceitam escalares ou arrays NumPy de temperatura e pressão
+(com broadcasting entre eles); entradas escalares retornam escalares, sem
+passar pelo custo de criação de arrays.
+"""
 import numpy as np
-from config.settings import GAS_CONSTANT, AIR_GAS_CONSTANT
+from config.settings import GAS_CONSTANT, AIR_GAS_CONSTANT, SHARED_TABLE_MAXSIZE, SHARED_TABLE_MAX_BYTES
+from utils.profiling import timed
+from utils.shared_cache import shared_resource
+
+# Tabela de viscosidade da água (0 a 100 °C), montada uma única vez
+_WATER_TEMPERATURES = np.array([273.15, 283.15, 293.15, 303.15, 313.15, 323.15,
+                                333.15, 343.15, 353.15, 363.15, 373.15])
+_WATER_VISCOSITIES = np.array([0.00179, 0.00131, 0.00100, 0.00080, 0.00065, 0.00055,
+                               0.00047, 0.00040, 0.00035, 0.00031, 0.00028])
+
+# Constantes de Sutherland para o ar
+_SUTHERLAND_T0 = 273.15
+_SUTHERLAND_MU0 = 1.716e-5
+_SUTHERLAND_S = 110.4
+
+def _constant(value, T):
+    """Valor constante com a forma de T (escalar para T escalar)"""
+    return value if np.isscalar(T) else np.full(np.shape(T), value)
 
 def rho_water(T):
     """
     Calcula a densidade da água em função da temperatura
-    T: Temperatura em Kelvin
-    Retorna: Densidade em kg/m³
+    T: Temperatura em Kelvin (escalar ou array)
+    Retorna: Densidade em kg/m³ (constante fora da faixa de 0 a 100 °C)
     """
-    if T < 273.15:
-        return 1000
-    elif T > 373.15:
-        return 958
+    if np.isscalar(T):
+        T_clipped = min(max(T, 273.15), 373.15)
     else:
-        return 1000 - 0.42 * (T - 273.15)
+        T_clipped = np.clip(T, 273.15, 373.15)
+    return 1000 - 0.42 * (T_clipped - 273.15)
 
 def mu_water(T):
     """
     Calcula a viscosidade dinâmica da água em função da temperatura
-    T: Temperatura em Kelvin
-    Retorna: Viscosidade em Pa.s
+    T: Temperatura em Kelvin (escalar ou array)
+    Retorna: Viscosidade em Pa.s (interpolada na tabela; constante fora
+    da faixa de 0 a 100 °C)
     """
-    if T <= 273.15:
-        return 0.00179
-    elif T >= 373.15:
-        return 0.00028
-    else:
-        temps = [273.15, 283.15, 293.15, 303.15, 313.15, 323.15, 333.15, 343.15, 353.15, 363.15, 373.15]
-        viscosities = [0.00179, 0.00131, 0.00100, 0.00080, 0.00065, 0.00055, 0.00047, 0.00040, 0.00035, 0.00031, 0.00028]
-        return np.interp(T, temps, viscosities)
+    return np.interp(T, _WATER_TEMPERATURES, _WATER_VISCOSITIES)
 
 def rho_air(T, P=101325):
     """
     Calcula a densidade do ar em função da temperatura e pressão
-    T: Temperatura em Kelvin
-    P: Pressão em Pa (padrão: 101325 Pa = 1 atm)
+    T: Temperatura em Kelvin (escalar ou array)
+    P: Pressão em Pa (padrão: 101325 Pa = 1 atm; escalar ou array)
     Retorna: Densidade em kg/m³
     """
     return P / (AIR_GAS_CONSTANT * T)
@@ -41,71 +58,136 @@ def rho_air(T, P=101325):
 def mu_air(T):
     """
     Calcula a viscosidade dinâmica do ar usando a equação de Sutherland
-    T: Temperatura em Kelvin
+    T: Temperatura em Kelvin (escalar ou array)
     Retorna: Viscosidade em Pa.s
     """
-    T0 = 273.15
-    mu0 = 1.716e-5
-    S = 110.4
-    return mu0 * (T/T0)**1.5 * (T0 + S)/(T + S)
+    return _SUTHERLAND_MU0 * (T/_SUTHERLAND_T0)**1.5 * (_SUTHERLAND_T0 + _SUTHERLAND_S)/(T + _SUTHERLAND_S)
 
 def rho_light_oil(T):
     """
     Densidade do óleo leve (simplificado)
-    T: Temperatura em Kelvin
+    T: Temperatura em Kelvin (escalar ou array)
     Retorna: Densidade em kg/m³
     """
-    return 850
+    return _constant(850.0, T)
 
 def mu_light_oil(T):
     """
     Viscosidade dinâmica do óleo leve (simplificado)
-    T: Temperatura em Kelvin
+    T: Temperatura em Kelvin (escalar ou array)
     Retorna: Viscosidade em Pa.s
     """
-    return 0.01
+    return _constant(0.01, T)
 
 def rho_ideal_gas(P, T, M):
     """
     Calcula a densidade de um gás ideal
-    P: Pressão em Pa
-    T: Temperatura em Kelvin
+    P: Pressão em Pa (escalar ou array)
+    T: Temperatura em Kelvin (escalar ou array)
     M: Massa molar em kg/mol
     Retorna: Densidade em kg/m³
     """
     return (P * M) / (GAS_CONSTANT * T)
 
-def get_fluid_properties(fluid_type, temp, pressure, gas_molar_mass=0.02896, custom_rho=None, custom_mu=None):
+def _water(T_K, pressure, gas_molar_mass):
+    return rho_water(T_K), mu_water(T_K)
+
+def _air(T_K, pressure, gas_molar_mass):
+    return rho_air(T_K, pressure), mu_air(T_K)
+
+def _light_oil(T_K, pressure, gas_molar_mass):
+    return rho_light_oil(T_K), mu_light_oil(T_K)
+
+def _ideal_gas(T_K, pressure, gas_molar_mass):
+    return rho_ideal_gas(pressure, T_K, gas_molar_mass), mu_air(T_K)
+
+# Modelo de propriedades por tipo de fluido: (T_K, P, M) -> (rho, mu)
+FLUID_MODELS = {
+    "Água": _water,
+    "Ar": _air,
+    "Óleo": _light_oil,
+    "Gás ideal": _ideal_gas
+}
+# Fluidos cujas propriedades dependem da pressão (e, no gás ideal, da massa molar)
+PRESSURE_DEPENDENT_FLUIDS = ("Ar", "Gás ideal")
+
+@timed('propriedades')
+def get_fluid_properties(fluid_type, temp, pressure, gas_molar_mass=0.02896, custom_rho=None, custom_mu=None,
+                         shared=False):
     """
     Retorna as propriedades do fluido (densidade, viscosidade dinâmica e cinemática)
-    
+
     Parâmetros:
     - fluid_type: Tipo de fluido ("Água", "Ar", "Óleo", "Gás ideal", "Personalizado")
-    - temp: Temperatura em °C
-    - pressure: Pressão em Pa
+    - temp: Temperatura em °C (escalar ou array)
+    - pressure: Pressão em Pa (escalar ou array)
     - gas_molar_mass: Massa molar para gás ideal (kg/mol)
     - custom_rho: Densidade personalizada (kg/m³)
     - custom_mu: Viscosidade personalizada (Pa.s)
-    
+    - shared: Com temp e pressure escalares, lê as propriedades da tabela
+      compartilhada entre as sessões (ver property_table)
+
+    Com arrays, temp e pressure são combinados por broadcasting e os três
+    resultados têm a forma combinada, p.ex. uma grade temperatura x pressão
+    com temp[:, None] e pressure[None, :].
+
     Retorna: (rho, mu, nu)
     """
-    T_K = temp + 273.15
-    
-    if fluid_type == "Água":
-        rho = rho_water(T_K)
-        mu = mu_water(T_K)
-    elif fluid_type == "Ar":
-        rho = rho_air(T_K, pressure)
-        mu = mu_air(T_K)
-    elif fluid_type == "Óleo":
-        rho = rho_light_oil(T_K)
-        mu = mu_light_oil(T_K)
-    elif fluid_type == "Gás ideal":
-        rho = rho_ideal_gas(pressure, T_K, gas_molar_mass)
-        mu = mu_air(T_K)
+    if shared and np.isscalar(temp) and np.isscalar(pressure):
+        table = property_table(fluid_type, temp, temp, 1, pressure, gas_molar_mass, custom_rho, custom_mu)
+        return float(table['rho'][0]), float(table['mu'][0]), float(table['nu'][0])
+
+    if np.isscalar(temp) and np.isscalar(pressure):
+        T_K = temp + 273.15
+    else:
+        # Todas as saídas têm a forma combinada de temp e pressure, mesmo
+        # para fluidos cujas propriedades não dependem de uma delas
+        shape = np.broadcast_shapes(np.shape(temp), np.shape(pressure))
+        T_K = np.broadcast_to(np.asarray(temp, dtype=float) + 273.15, shape)
+        pressure = np.broadcast_to(np.asarray(pressure, dtype=float), shape)
+
+    model = FLUID_MODELS.get(fluid_type)
+    if model is not None:
+        rho, mu = model(T_K, pressure, gas_molar_mass)
     else:  # Personalizado
-        rho = custom_rho if custom_rho is not None else 1000.0
-        mu = custom_mu if custom_mu is not None else 0.001
-    
+        rho = _constant(custom_rho if custom_rho is not None else 1000.0, T_K)
+        mu = _constant(custom_mu if custom_mu is not None else 0.001, T_K)
+
     nu = mu / rho
     return rho, mu, nu
+
+@shared_resource('propriedades', SHARED_TABLE_MAXSIZE, SHARED_TABLE_MAX_BYTES)
+def _shared_property_table(fluid_type, t_min, t_max, n_points, pressure, gas_molar_mass, custom_rho, custom_mu):
+    temperature = np.linspace(t_min, t_max, n_points)
+    rho, mu, nu = get_fluid_properties(fluid_type, temperature, pressure, gas_molar_mass, custom_rho, custom_mu)
+    return {'temperature': temperature, 'rho': rho, 'mu': mu, 'nu': nu}
+
+def property_table(fluid_type, t_min=0.0, t_max=100.0, n_points=501, pressure=101325.0,
+                   gas_molar_mass=0.02896, custom_rho=None, custom_mu=None):
+    """
+    Tabela de propriedades em função da temperatura, compartilhada entre as
+    sessões (ver utils.shared_cache)
+
+    Parâmetros:
+    - fluid_type: Tipo de fluido (como em get_fluid_properties)
+    - t_min, t_max, n_points: Faixa de temperatura (°C) e número de pontos
+    - pressure: Pressão em Pa
+    - gas_molar_mass: Massa molar para gás ideal (kg/mol)
+    - custom_rho, custom_mu: Propriedades do fluido personalizado
+
+    A chave da tabela só inclui a pressão, a massa molar e as propriedades
+    personalizadas nos fluidos que dependem delas, de modo que a mesma
+    tabela atende todas as sessões com o mesmo fluido e temperaturas.
+
+    Retorna: dicionário com temperature (°C), rho, mu e nu (arrays somente leitura)
+    """
+    if fluid_type not in PRESSURE_DEPENDENT_FLUIDS:
+        pressure = 101325.0
+    if fluid_type != "Gás ideal":
+        gas_molar_mass = 0.02896
+    if fluid_type in FLUID_MODELS:
+        custom_rho = custom_mu = None
+    return _shared_property_table(
+        fluid_type, float(t_min), float(t_max), int(n_points), float(pressure), float(gas_molar_mass),
+        None if custom_rho is None else float(custom_rho), None if custom_mu is None else float(custom_mu)
+    )
@@ -0,0 +1,91 @@
+"""
+Problema inverso: vazão a partir das pressões de entrada e saída
+"""
+import numpy as np
+from config.settings import GRAVITY
+from utils.root_finding import safeguarded_newton
+from utils.profiling import timed
+
+def solve_flow_rates(model, rho, mu, pressures_inlet, pressures_outlet, x0=None,
+                     g=GRAVITY, xtol=1e-12, maxiter=50):
+    """
+    Vazões que produzem as diferenças de pressão dadas no sistema em série
+    model: SystemModel do sistema
+    pressures_inlet, pressures_outlet: Pressões (Pa), escalares ou arrays
+    x0: Estimativa inicial da vazão (p.ex. a solução do rerun anterior)
+
+    Resolve H(Q) = (P_in - P_out)/(ρg), em que H é a soma de h_total de
+    todos os trechos (desnível incluído), para todos os pares de pressão de
+    uma vez. Como H cresce com Q, a raiz é única; pares em que a diferença
+    de pressão não vence o desnível resultam em vazão nula.
+
+    Retorna: dicionário com arrays flow_rate, converged, status ('ok' ou
+    'sem vazão') e o número de iterações
+    """
+    P_in, P_out = np.broadcast_arrays(
+        np.array(pressures_inlet, dtype=float, ndmin=1),
+        np.array(pressures_outlet, dtype=float, ndmin=1)
+    )
+    target_head = (P_in - P_out) / (rho * g)
+    n = target_head.size
+
+    def head(Q):
+        """Altura total do sistema e sua parcela dinâmica para cada vazão"""
+        losses = model.losses(Q, rho, mu, g)
+        h_total = losses['h_total'].sum(axis=1)
+        return h_total, h_total - model.total_elevation
+
+    def residual(Q, idx):
+        h_total, h_dynamic = head(Q)
+        # dH/dQ ≈ 2·h_dinâmica/Q (exata para f constante); o intervalo
+        # protege o passo quando f varia com Re
+        dH = 2 * h_dynamic / np.maximum(Q, 1e-300)
+        return h_total - target_head[idx], dH
+
+    # Sem vazão: a diferença de pressão não supera o desnível
+    f_zero = model.total_elevation - target_head
+    no_flow = f_zero >= 0
+
+    # Limite superior: a partir da estimativa inicial, dobra até haver mudança de sinal
+    if x0 is None or not np.all(np.asarray(x0) > 0):
+        x0 = model.flow_rate_from_velocity(1.0)
+    x0 = np.broadcast_to(np.asarray(x0, dtype=float), n).copy()
+    hi = 2 * x0
+    f_hi = head(hi)[0] - target_head
+    for _ in range(200):
+        low = (f_hi < 0) & ~no_flow
+        if not low.any():
+            break
+        hi[low] *= 2
+        f_hi[low] = head(hi[low])[0] - target_head[low]
+
+    Q, converged, iterations = safeguarded_newton(
+        residual, np.zeros(n), hi, x0, f_zero, f_hi, xtol=xtol,
+        ftol=1e-10 * np.maximum(np.abs(target_head), 1.0).min(), maxiter=maxiter
+    )
+
+    Q[no_flow] = 0.0
+    converged[no_flow] = True
+    status = np.where(no_flow, 'sem vazão', 'ok').astype(object)
+
+    return {
+        'flow_rate': Q,
+        'converged': converged,
+        'status': status,
+        'iterations': iterations
+    }
+
+@timed('sistema/vazao_inversa')
+def solve_flow_rate(model, rho, mu, pressure_inlet, pressure_outlet, x0=None, g=GRAVITY):
+    """
+    Vazão (m³/s) para um único par de pressões (ver solve_flow_rates)
+
+    Retorna: dicionário com flow_rate, converged, status e iterations
+    """
+    result = solve_flow_rates(model, rho, mu, pressure_inlet, pressure_outlet, x0, g)
+    return {
+        'flow_rate': float(result['flow_rate'][0]),
+        'converged': bool(result['converged'][0]),
+        'status': result['status'][0],
+        'iterations': result['iterations']
+    }
@@ -0,0 +1,201 @@
+"""
+Execução de cálculos longos em segundo plano
+
+Os cálculos rodam em um pool de threads compartilhado pelo processo (as
+rotinas NumPy liberam o GIL nos laços internos), de modo que o script do
+Streamlit termina o rerun enquanto o cálculo continua. Cada tarefa é
+endereçada pela mesma chave do cache de resultados: a interface consulta o
+progresso e o resultado parcial a cada rerun, e o resultado final é gravado
+no ResultCache da sessão, onde o rerun seguinte o encontra.
+
+O pool tem JOB_MAX_WORKERS threads para todo o processo, e cada sessão
+pode ter no máximo JOB_MAX_ACTIVE_PER_SESSION tarefas não terminadas, de
+modo que cálculos longos de uma sessão não ocupem o pool inteiro.
+
+O cancelamento é cooperativo: a função da tarefa recebe o objeto Job e
+deve chamar job.report(...) a cada bloco (p.ex. a partir do callback
+progress das varreduras); após job.cancel(), a próxima chamada levanta
+JobCancelled e a tarefa termina sem gravar resultado.
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import JOB_HISTORY, JOB_MAX_ACTIVE_PER_SESSION, JOB_MAX_WORKERS
+
+# Estados de uma tarefa
+PENDING = "pendente"
+RUNNING = "executando"
+DONE = "concluída"
+CANCELLED = "cancelada"
+FAILED = "erro"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+class JobCancelled(Exception):
+    """Levantada dentro da tarefa quando o cancelamento foi pedido"""
+
+class JobLimitReached(Exception):
+    """Levantada por JobManager.submit quando a sessão já tem o máximo de tarefas ativas"""
+
+class Job:
+    """
+    Tarefa em segundo plano
+
+    Atributos lidos pela interface:
+    - key, description: Chave (hash da configuração) e descrição
+    - status: PENDING, RUNNING, DONE, CANCELLED ou FAILED
+    - progress: Fração concluída (0 a 1)
+    - partial: Último resultado parcial informado pela tarefa
+    - result, error: Resultado final ou mensagem de erro
+    """
+
+    def __init__(self, key, description=""):
+        self.key = key
+        self.description = description
+        self.status = PENDING
+        self.progress = 0.0
+        self.partial = None
+        self.result = None
+        self.error = None
+        self.submitted = time.perf_counter()
+        self.started = None
+        self.finished = None
+        self._cancel = threading.Event()
+
+    @property
+    def done(self):
+        """True quando a tarefa terminou (com sucesso, erro ou cancelada)"""
+        return self.status in (DONE, CANCELLED, FAILED)
+
+    @property
+    def elapsed(self):
+        """Tempo de execução (s) até agora ou até o fim"""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    def cancel(self):
+        """Pede o cancelamento; a tarefa para na próxima chamada de report"""
+        self._cancel.set()
+        if self.status == PENDING:
+            self.status = CANCELLED
+
+    def report(self, progress, partial=None):
+        """
+        Informa o progresso (fração de 0 a 1) e, opcionalmente, um
+        resultado parcial; chamado de dentro da tarefa
+        """
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.progress = min(max(float(progress), 0.0), 1.0)
+        if partial is not None:
+            self.partial = partial
+
+    def _run(self, func, cache):
+        """Executa func(job) na thread do pool e grava o resultado no cache"""
+        if self._cancel.is_set():
+            self.status = CANCELLED
+            return
+        self.status = RUNNING
+        self.started = time.perf_counter()
+        try:
+            result = func(self)
+            if cache is not None:
+                # A tarefa passa a expor a mesma instância (congelada) do cache
+                result, _ = cache.get_or_compute(self.key, lambda: result)
+            self.result = result
+            self.progress = 1.0
+            self.status = DONE
+        except JobCancelled:
+            self.status = CANCELLED
+        except Exception as error:
+            self.error = f"{type(error).__name__}: {error}"
+            self.status = FAILED
+        finally:
+            self.finished = time.perf_counter()
+            # O parcial não é mais necessário e pode ser grande
+            self.partial = None
+
+def get_executor(max_workers=JOB_MAX_WORKERS):
+    """Pool de threads compartilhado por todas as sessões do processo"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="simulador-job")
+        return _executor
+
+class JobManager:
+    """
+    Tarefas de uma sessão, indexadas pela chave
+
+    history: Número de tarefas terminadas mantidas (as mais antigas são
+             descartadas; seus resultados continuam no cache)
+    max_active: Número máximo de tarefas não terminadas da sessão
+    """
+
+    def __init__(self, executor, history=JOB_HISTORY, max_active=JOB_MAX_ACTIVE_PER_SESSION):
+        self.executor = executor
+        self.history = history
+        self.max_active = max_active
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, key, func, cache=None, description=""):
+        """
+        Inicia func(job) em segundo plano, a menos que já exista uma tarefa
+        não terminada com a mesma chave (nesse caso ela é retornada)
+        cache: ResultCache que recebe o resultado ao final
+
+        Levanta JobLimitReached se a sessão já tem max_active tarefas não
+        terminadas.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.done:
+                return job
+            active = sum(1 for other in self._jobs.values() if not other.done)
+            if active >= self.max_active:
+                raise JobLimitReached(
+                    f"Limite de {self.max_active} cálculo(s) em segundo plano por sessão: "
+                    "aguarde ou cancele um cálculo em andamento"
+                )
+            job = Job(key, description)
+            self._jobs[key] = job
+            self._jobs.move_to_end(key)
+            self._prune()
+        self.executor.submit(job._run, func, cache)
+        return job
+
+    def get(self, key):
+        """Tarefa com a chave, ou None"""
+        with self._lock:
+            return self._jobs.get(key)
+
+    def active(self):
+        """Tarefas ainda não terminadas, da mais antiga para a mais recente"""
+        with self._lock:
+            return [job for job in self._jobs.values() if not job.done]
+
+    def cancel_all(self):
+        """Pede o cancelamento de todas as tarefas não terminadas"""
+        for job in self.active():
+            job.cancel()
+
+    def _prune(self):
+        finished = [key for key, job in self._jobs.items() if job.done]
+        for key in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[key]
+
+def get_job_manager(store, max_workers=JOB_MAX_WORKERS, history=JOB_HISTORY,
+                    max_active=JOB_MAX_ACTIVE_PER_SESSION):
+    """
+    Retorna o gerenciador de tarefas guardado em store (p.ex.
+    st.session_state), criando-o na primeira chamada
+    """
+    manager = store.get('job_manager')
+    if manager is None:
+        manager = JobManager(get_executor(max_workers), history, max_active)
+        store['job_manager'] = manager
+    return manager
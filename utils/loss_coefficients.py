@@ -1,6 +1,13 @@
 """
 Coeficientes de perda de carga localizada (K) para diversos acessórios
+
+Os coeficientes de contração e expansão aceitam escalares ou arrays NumPy
+de diâmetros; entradas escalares retornam escalares. K_table reúne os
+coeficientes de um trecho em uma tabela compartilhada entre as sessões.
 """
+import numpy as np
+from config.settings import SHARED_K_TABLE_MAXSIZE, SHARED_TABLE_MAX_BYTES
+from utils.shared_cache import shared_resource
 
 def K_contraction_round(D1, D2):
     """
@@ -9,9 +16,11 @@ def K_contraction_round(D1, D2):
     D2: Diâmetro menor (downstream)
     """
     beta = D2 / D1
-    if beta >= 1:
-        return 0
-    return 0.5 * (1 - beta**2)
+    if np.isscalar(beta):
+        if beta >= 1:
+            return 0
+        return 0.5 * (1 - beta**2)
+    return np.where(beta < 1, 0.5 * (1 - beta**2), 0.0)
 
 def K_expansion_round(D1, D2):
     """
@@ -20,9 +29,11 @@ def K_expansion_round(D1, D2):
     D2: Diâmetro maior (downstream)
     """
     beta = D1 / D2
-    if beta >= 1:
-        return 0
-    return (1 - beta**2)**2
+    if np.isscalar(beta):
+        if beta >= 1:
+            return 0
+        return (1 - beta**2)**2
+    return np.where(beta < 1, (1 - beta**2)**2, 0.0)
 
 def K_90_rounded(D, angle=90, fd=None, rc_ratio=1.5):
     """
@@ -57,3 +68,39 @@ def K_tee_through():
 def K_tee_branch():
     """Coeficiente K para tê - passagem lateral"""
     return 1.8
+
+@shared_resource('coeficientes_K', SHARED_K_TABLE_MAXSIZE, SHARED_TABLE_MAX_BYTES)
+def K_table(contraction_ratio=None, expansion_ratio=None):
+    """
+    Tabela de coeficientes K dos acessórios, compartilhada entre as sessões
+    (ver utils.shared_cache)
+    contraction_ratio: Razão D1/D2 da contração (None: trecho sem contração)
+    expansion_ratio: Razão D2/D1 da expansão (None: trecho sem expansão)
+
+    Retorna: dicionário {acessório: K}, com contraction e expansion nulos
+    quando a razão correspondente é None; K das curvas e dos tês por unidade
+    """
+    return {
+        'contraction': 0 if contraction_ratio is None else K_contraction_round(D1=contraction_ratio, D2=1.0),
+        'expansion': 0 if expansion_ratio is None else K_expansion_round(D1=1.0, D2=expansion_ratio),
+        'curve': K_90_rounded(None),
+        'valve_gate': K_valve_gate_open(),
+        'valve_globe': K_valve_globe_open(),
+        'valve_ball': K_valve_ball_open(),
+        'valve_check': K_valve_check(),
+        'tee_through': K_tee_through(),
+        'tee_branch': K_tee_branch()
+    }
+
+# Nome exibido de cada acessório de K_table
+K_TABLE_LABELS = {
+    'contraction': "Contração",
+    'expansion': "Expansão",
+    'curve': "Curva 90°",
+    'valve_gate': "Válvula gaveta",
+    'valve_globe': "Válvula globo",
+    'valve_ball': "Válvula esfera",
+    'valve_check': "Válvula de retenção",
+    'tee_through': "Tê passagem direta",
+    'tee_branch': "Tê passagem lateral"
+}
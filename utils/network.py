@@ -0,0 +1,326 @@
+"""
+Redes de tubulações malhadas (nós, trechos e demandas)
+
+Resolve vazões nos trechos e cargas nos nós pelo método do gradiente
+global (Todini e Pilati, 1988): a cada iteração de Newton as equações de
+energia dos trechos são eliminadas e resta um sistema esparso, simétrico e
+positivo definido, apenas nas cargas das junções. A perda em cada trecho usa
+o mesmo fator de atrito e os mesmos coeficientes K do sistema em série.
+"""
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import spsolve
+from fluids.friction import LAMINAR_TRANSITION_PIPE
+from config.settings import GRAVITY
+from utils.calculations import friction_factor_array, pipe_K_total
+from utils.system_model import pipe_roughness
+from utils.profiling import timed
+
+# Vazão mínima usada nas derivadas, para trechos com vazão nula (m³/s)
+_MIN_FLOW = 1e-12
+
+# Fim da faixa de transição laminar/turbulento na perda dos trechos
+_TURBULENT_RE = 4000.0
+
+class PipeNetwork:
+    """
+    Modelo compilado de uma rede de tubulações
+
+    Nós de carga fixa (reservatórios) têm fixed_head definido; os demais
+    (junções) têm carga desconhecida e uma demanda (m³/s, positiva quando
+    sai da rede). Cada trecho liga start a end; a vazão é positiva nesse
+    sentido. O desnível é dado pelas cotas dos nós, e não pelos trechos.
+    """
+
+    def __init__(self, node_names, elevation, demand, fixed_head,
+                 link_names, start, end, diameter, length, roughness, K_total):
+        self.node_names = list(node_names)
+        self.elevation = np.ascontiguousarray(elevation, dtype=float)
+        self.demand = np.ascontiguousarray(demand, dtype=float)
+        self.fixed_head = np.ascontiguousarray(fixed_head, dtype=float)
+
+        self.link_names = list(link_names)
+        self.start = np.ascontiguousarray(start, dtype=np.int64)
+        self.end = np.ascontiguousarray(end, dtype=np.int64)
+        self.diameter = np.ascontiguousarray(diameter, dtype=float)
+        self.length = np.ascontiguousarray(length, dtype=float)
+        self.roughness = np.ascontiguousarray(roughness, dtype=float)
+        self.K_total = np.ascontiguousarray(K_total, dtype=float)
+
+        self.area = np.pi * (self.diameter/2)**2
+        self.eD = self.roughness / self.diameter
+        self.L_D = self.length / self.diameter
+
+        self.is_fixed = np.isfinite(self.fixed_head)
+        self.junctions = np.flatnonzero(~self.is_fixed)
+        self.reservoirs = np.flatnonzero(self.is_fixed)
+
+        # Índice de cada nó entre as junções (-1 para reservatórios)
+        self.junction_index = np.full(len(self.node_names), -1, dtype=np.int64)
+        self.junction_index[self.junctions] = np.arange(self.junctions.size)
+
+        self._validate()
+
+    @property
+    def n_nodes(self):
+        return len(self.node_names)
+
+    @property
+    def n_links(self):
+        return len(self.link_names)
+
+    def _validate(self):
+        """Verifica índices, dimensões e a ligação de cada junção a um reservatório"""
+        if self.reservoirs.size == 0:
+            raise ValueError("A rede precisa de pelo menos um reservatório (nó de carga fixa)")
+        if self.n_links == 0:
+            raise ValueError("A rede não possui trechos")
+        for name in ('start', 'end'):
+            nodes = getattr(self, name)
+            if nodes.min() < 0 or nodes.max() >= self.n_nodes:
+                raise ValueError(f"Trecho com nó inexistente ({name})")
+        if np.any(self.start == self.end):
+            raise ValueError("Trecho ligando um nó a ele mesmo")
+        if not (np.all(self.diameter > 0) and np.all(self.length > 0)):
+            raise ValueError("Diâmetros e comprimentos dos trechos devem ser positivos")
+
+        # Componentes conexas sem reservatório tornam o sistema singular
+        graph = sp.coo_matrix(
+            (np.ones(self.n_links), (self.start, self.end)), shape=(self.n_nodes, self.n_nodes)
+        )
+        _, labels = connected_components(graph, directed=False)
+        fed = np.zeros(labels.max() + 1, dtype=bool)
+        fed[labels[self.reservoirs]] = True
+        isolated = np.flatnonzero(~fed[labels])
+        if isolated.size:
+            names = ', '.join(str(self.node_names[i]) for i in isolated[:5])
+            raise ValueError(f"Nós sem ligação a um reservatório: {names}")
+
+    @classmethod
+    def from_records(cls, nodes, links):
+        """
+        Constrói a rede a partir de listas de dicionários
+        nodes: {'name', 'elevation', 'demand' (m³/s), 'head' (m, apenas
+               reservatórios; None ou ausente para junções)}
+        links: {'name', 'start', 'end', 'diameter', 'length'} e, como nos
+               trechos da sessão, 'roughness' ou 'material' e os acessórios
+               (has_curves, has_valve_gate, ...) ou um 'K_total' explícito
+        """
+        node_names = [node['name'] for node in nodes]
+        index = {name: i for i, name in enumerate(node_names)}
+        if len(index) != len(node_names):
+            raise ValueError("Nomes de nós repetidos")
+
+        def node_index(name):
+            if name not in index:
+                raise ValueError(f"Nó inexistente: {name}")
+            return index[name]
+
+        heads = [node.get('head') for node in nodes]
+        return cls(
+            node_names=node_names,
+            elevation=[node.get('elevation', 0.0) for node in nodes],
+            demand=[node.get('demand', 0.0) for node in nodes],
+            fixed_head=[np.nan if head is None else head for head in heads],
+            link_names=[link['name'] for link in links],
+            start=[node_index(link['start']) for link in links],
+            end=[node_index(link['end']) for link in links],
+            diameter=[link['diameter'] for link in links],
+            length=[link['length'] for link in links],
+            roughness=[pipe_roughness(link) for link in links],
+            K_total=[link['K_total'] if link.get('K_total') is not None else pipe_K_total(link)
+                     for link in links]
+        )
+
+def link_losses(network, flow_rate, rho, mu, g=GRAVITY):
+    """
+    Perda de carga (m) em cada trecho e sua derivada em relação à vazão
+
+    h = (f·L/D + K)·V|V|/(2g), com o sinal da vazão. O fator de atrito é o
+    de friction_factor_array, exceto entre Re = 2040 e Re = 4000, onde é
+    interpolado linearmente entre o valor laminar e o turbulento (como no
+    EPANET): sem isso a perda salta na transição e trechos com vazão nessa
+    faixa não têm solução, fazendo o método oscilar.
+
+    Retorna: dicionário com V, Re, f, h e dh (derivada, m/(m³/s))
+    """
+    V = flow_rate / network.area
+    V_abs = np.maximum(np.abs(V), _MIN_FLOW / network.area)
+    Re = V_abs * network.diameter / (mu / rho)
+    f = friction_factor_array(Re, network.eD)
+
+    # Re·(df/dRe)/f: -1 no laminar, ≈ 0 no turbulento
+    log_slope = np.where(Re < LAMINAR_TRANSITION_PIPE, -1.0, 0.0)
+
+    transition = (Re >= LAMINAR_TRANSITION_PIPE) & (Re < _TURBULENT_RE)
+    if transition.any():
+        Re_t = Re[transition]
+        f_laminar = 64.0 / LAMINAR_TRANSITION_PIPE
+        f_turbulent = friction_factor_array(_TURBULENT_RE, network.eD[transition])
+        slope = (f_turbulent - f_laminar) / (_TURBULENT_RE - LAMINAR_TRANSITION_PIPE)
+        f[transition] = f_laminar + slope * (Re_t - LAMINAR_TRANSITION_PIPE)
+        log_slope[transition] = slope * Re_t / f[transition]
+
+    friction = f * network.L_D
+    velocity_head = V * V_abs / (2 * g)
+
+    return {
+        'V': V,
+        'Re': Re,
+        'f': f,
+        'h': (friction + network.K_total) * velocity_head,
+        'dh': ((2 + log_slope) * friction + 2 * network.K_total) * V_abs / (2 * g * network.area)
+    }
+
+@timed('rede/solucao')
+def solve_network(network, rho, mu, flow_rate=None, tol=1e-8, maxiter=50, g=GRAVITY):
+    """
+    Vazões e cargas de uma rede malhada pelo método do gradiente global
+    network: PipeNetwork
+    rho, mu: Propriedades do fluido
+    flow_rate: Estimativa inicial das vazões (p.ex. uma solução anterior);
+               por padrão, velocidade de 1 m/s em todos os trechos
+    tol: Critério de parada sobre a variação relativa das vazões,
+         Σ|ΔQ| / Σ|Q|
+
+    A cada iteração resolve (A21·D⁻¹·A12)·ΔH = E2 - A21·D⁻¹·E1, em que D é a
+    derivada da perda em cada trecho, E1 o resíduo de energia dos trechos e
+    E2 o de continuidade nas junções, e atualiza as vazões com
+    ΔQ = -D⁻¹·(E1 + A12·ΔH). A matriz tem uma linha por junção e é montada
+    diretamente em formato esparso.
+
+    Retorna: dicionário com flow_rate, velocity, reynolds, friction_factor,
+    head_loss (por trecho), head e pressure (por nó), converged, iterations,
+    energy_residual (m), continuity_residual (m³/s) e residuals (histórico
+    por iteração)
+    """
+    n_junctions = network.junctions.size
+    s = network.junction_index[network.start]
+    e = network.junction_index[network.end]
+    s_free, e_free = s >= 0, e >= 0
+    both_free = s_free & e_free
+
+    # Estrutura fixa da matriz: diagonais de cada extremidade livre e
+    # termos fora da diagonal dos trechos entre duas junções
+    rows = np.concatenate([s[s_free], e[e_free], s[both_free], e[both_free]])
+    cols = np.concatenate([s[s_free], e[e_free], e[both_free], s[both_free]])
+    signs = np.concatenate([
+        np.ones(s_free.sum()), np.ones(e_free.sum()),
+        -np.ones(both_free.sum()), -np.ones(both_free.sum())
+    ])
+    link_of_entry = np.concatenate([
+        np.flatnonzero(s_free), np.flatnonzero(e_free),
+        np.flatnonzero(both_free), np.flatnonzero(both_free)
+    ])
+
+    def junction_balance(values):
+        """A21·values: entradas menos saídas em cada junção"""
+        balance = (np.bincount(network.end, values, network.n_nodes)
+                   - np.bincount(network.start, values, network.n_nodes))
+        return balance[network.junctions]
+
+    demand = network.demand[network.junctions]
+    head = network.fixed_head.copy()
+    head[network.junctions] = network.fixed_head[network.reservoirs].max()
+
+    if flow_rate is None:
+        Q = network.area * 1.0
+    else:
+        Q = np.array(flow_rate, dtype=float).copy()
+
+    residuals = []
+    converged = False
+    iterations = 0
+
+    while iterations < maxiter:
+        iterations += 1
+        losses = link_losses(network, Q, rho, mu, g)
+
+        # Resíduos de energia (trechos) e de continuidade (junções)
+        E1 = losses['h'] - (head[network.start] - head[network.end])
+        E2 = junction_balance(Q) - demand
+
+        inv_D = 1.0 / losses['dh']
+        # Matriz simétrica: CSC montado direto, com ordenação para A+Aᵀ
+        matrix = sp.csc_matrix(
+            (signs * inv_D[link_of_entry], (rows, cols)), shape=(n_junctions, n_junctions)
+        )
+        rhs = E2 - junction_balance(inv_D * E1)
+        dH_junctions = np.atleast_1d(spsolve(matrix, rhs, permc_spec='MMD_AT_PLUS_A'))
+
+        dH = np.zeros(network.n_nodes)
+        dH[network.junctions] = dH_junctions
+        dQ = -inv_D * (E1 + dH[network.end] - dH[network.start])
+
+        relative_change = np.abs(dQ).sum() / max(np.abs(Q + dQ).sum(), _MIN_FLOW)
+
+        Q += dQ
+        head += dH
+
+        residuals.append({
+            'iteration': iterations,
+            'energy': float(np.abs(E1).max()),
+            'continuity': float(np.abs(E2).max()) if n_junctions else 0.0,
+            'relative_change': float(relative_change)
+        })
+
+        if not np.all(np.isfinite(Q)):
+            break
+        if relative_change <= tol:
+            converged = True
+            break
+
+    # Resíduos finais, avaliados na solução retornada
+    losses = link_losses(network, Q, rho, mu, g)
+    energy_residual = np.abs(losses['h'] - (head[network.start] - head[network.end])).max()
+    continuity_residual = np.abs(junction_balance(Q) - demand).max() if n_junctions else 0.0
+
+    return {
+        'flow_rate': Q,
+        'velocity': losses['V'],
+        'reynolds': losses['Re'],
+        'friction_factor': losses['f'],
+        'head_loss': losses['h'],
+        'head': head,
+        'pressure': rho * g * (head - network.elevation),
+        'converged': converged,
+        'iterations': iterations,
+        'energy_residual': float(energy_residual),
+        'continuity_residual': float(continuity_residual),
+        'residuals': residuals
+    }
+
+def grid_network(n_rows, n_cols, diameter=0.15, length=100.0, roughness=4.5e-5,
+                 demand=1e-4, reservoir_head=60.0):
+    """
+    Rede em malha retangular com um reservatório em um canto
+    (útil para testes e medições de desempenho)
+
+    Cada nó tem a mesma demanda; os diâmetros variam ±50% de forma
+    determinística para que as vazões não sejam uniformes.
+    """
+    n_nodes = n_rows * n_cols
+    grid = np.arange(n_nodes).reshape(n_rows, n_cols)
+    start = np.concatenate([grid[:, :-1].ravel(), grid[:-1, :].ravel()])
+    end = np.concatenate([grid[:, 1:].ravel(), grid[1:, :].ravel()])
+    n_links = start.size
+
+    fixed_head = np.full(n_nodes, np.nan)
+    fixed_head[0] = reservoir_head
+    node_demand = np.full(n_nodes, demand)
+    node_demand[0] = 0.0
+
+    return PipeNetwork(
+        node_names=[f"N{i}" for i in range(n_nodes)],
+        elevation=np.zeros(n_nodes),
+        demand=node_demand,
+        fixed_head=fixed_head,
+        link_names=[f"T{i}" for i in range(n_links)],
+        start=start,
+        end=end,
+        diameter=diameter * (1 + 0.5 * np.sin(np.arange(n_links))),
+        length=np.full(n_links, length),
+        roughness=np.full(n_links, roughness),
+        K_total=np.zeros(n_links)
+    )
@@ -0,0 +1,307 @@
+"""
+Canais abertos: profundidades normal e crítica e curvas de remanso
+
+As seções são tratadas em lote (struct of arrays, como o SystemModel):
+retangulares e trapezoidais pela largura de fundo b e talude z (H:V; z = 0
+é retangular) e circulares pelo diâmetro D. As profundidades são obtidas
+pelo Newton protegido de utils.root_finding para todos os canais de uma
+vez, e as curvas de remanso (escoamento gradualmente variado)
+
+    dy/dx = (S₀ - S_f) / (1 - Fr²)
+
+são integradas por Runge-Kutta de 4ª ordem com todos os canais avançando
+juntos a cada passo.
+"""
+import numpy as np
+from config.settings import GRAVITY
+from utils.root_finding import safeguarded_newton
+from utils.profiling import timed
+
+SECTION_SHAPES = ("Retangular", "Trapezoidal", "Circular")
+
+# Profundidade relativa de máxima vazão em seção circular (y/D)
+CIRCULAR_MAX_CONVEYANCE = 0.9381
+
+class ChannelSections:
+    """
+    Lote de seções transversais de canais
+
+    Atributos (arrays de mesmo tamanho):
+    - width: Largura de fundo b (m); 0 nas circulares
+    - side_slope: Talude z (H:V); 0 nas retangulares e circulares
+    - diameter: Diâmetro D (m); NaN nas não circulares
+    - circular: Máscara das seções circulares
+    """
+
+    def __init__(self, width=0.0, side_slope=0.0, diameter=np.nan):
+        width, side_slope, diameter = np.broadcast_arrays(
+            np.array(width, dtype=float, ndmin=1),
+            np.array(side_slope, dtype=float, ndmin=1),
+            np.array(diameter, dtype=float, ndmin=1)
+        )
+        self.circular = np.isfinite(diameter) & (diameter > 0)
+        self.width = np.where(self.circular, 0.0, width)
+        self.side_slope = np.where(self.circular, 0.0, side_slope)
+        self.diameter = np.where(self.circular, diameter, np.nan)
+        self._wall = 2 * np.sqrt(1 + self.side_slope**2)
+
+    @classmethod
+    def from_shapes(cls, shapes, width=0.0, side_slope=0.0, diameter=0.0):
+        """
+        Seções a partir dos nomes em SECTION_SHAPES, com os parâmetros
+        irrelevantes de cada forma ignorados
+        """
+        shapes = np.array(shapes, ndmin=1)
+        width, side_slope, diameter, shapes = np.broadcast_arrays(
+            np.array(width, dtype=float, ndmin=1), np.array(side_slope, dtype=float, ndmin=1),
+            np.array(diameter, dtype=float, ndmin=1), shapes
+        )
+        circular = shapes == "Circular"
+        return cls(
+            np.where(circular, 0.0, width),
+            np.where(shapes == "Trapezoidal", side_slope, 0.0),
+            np.where(circular, diameter, np.nan)
+        )
+
+    def __len__(self):
+        return len(self.width)
+
+    def max_depth(self):
+        """Maior profundidade possível (D nas circulares, infinita nas demais)"""
+        return np.where(self.circular, self.diameter, np.inf)
+
+    def geometry(self, y, idx=None):
+        """
+        Geometria molhada para profundidades y
+        idx: Índices das seções a que y se refere (None: todas)
+
+        Retorna: (área A, perímetro P, largura de topo T, dP/dy, dT/dy)
+        """
+        if idx is None:
+            idx = slice(None)
+        y = np.asarray(y, dtype=float)
+        b, z, wall = self.width[idx], self.side_slope[idx], self._wall[idx]
+        A = (b + z * y) * y
+        P = b + wall * y
+        T = b + 2 * z * y
+        dP = np.array(wall, dtype=float)
+        dT = 2 * z
+
+        circular = self.circular[idx]
+        if circular.any():
+            D = self.diameter[idx][circular]
+            yc = np.clip(y[circular], 0.0, D)
+            theta = 2 * np.arccos(1 - 2 * yc / D)
+            half_sin, half_cos = np.sin(theta / 2), np.cos(theta / 2)
+            A[circular] = D**2 / 8 * (theta - np.sin(theta))
+            P[circular] = D * theta / 2
+            T[circular] = D * half_sin
+            with np.errstate(divide='ignore'):
+                dP[circular] = 2 / half_sin
+                dT[circular] = 2 * half_cos / half_sin
+        return A, P, T, dP, dT
+
+    @timed('canal/profundidade_normal')
+    def normal_depth(self, Q, S, n, xtol=1e-12):
+        """
+        Profundidade normal (m) pela equação de Manning, para todos os canais
+        Q: Vazão (m³/s)
+        S: Declividade do fundo (> 0)
+        n: Coeficiente de Manning
+
+        Resolve A^(5/3)·P^(-2/3) = n·Q/√S. Canais sem declividade positiva
+        e seções circulares cuja vazão excede a capacidade máxima
+        (y/D ≈ 0,938) retornam NaN.
+        """
+        Q, S, n = np.broadcast_arrays(*(np.array(v, dtype=float, ndmin=1) for v in (Q, S, n)))
+        Q, S, n = (np.broadcast_to(v, self.width.shape) for v in (Q, S, n))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            target = n * Q / np.sqrt(S)
+        valid = (S > 0) & (Q > 0)
+        target = np.where(valid, target, np.nan)
+
+        def residual(y, idx):
+            A, P, T, dP, _ = self.geometry(y, idx)
+            conveyance = A**(5/3) * P**(-2/3)
+            derivative = conveyance * (5/3 * T / A - 2/3 * dP / P)
+            return conveyance - target[idx], derivative
+
+        # Estimativa inicial de canal largo (R ≈ y) ou do tubo cheio
+        wide = (target / np.maximum(self.width, 1e-12))**0.6
+        full = np.where(self.circular, self.diameter, 1.0)
+        x0 = np.where(self.circular, 0.5 * full, np.where(self.width > 0, wide, 1.0))
+
+        lo = np.full(target.shape, 1e-12)
+        hi = np.where(self.circular, CIRCULAR_MAX_CONVEYANCE * full, 2 * np.nan_to_num(x0, nan=1.0))
+        f_lo = -target
+        f_hi = residual(hi, np.arange(hi.size))[0]
+        # Seções abertas: dobra o limite superior até haver mudança de sinal
+        for _ in range(100):
+            low = (f_hi < 0) & ~self.circular
+            if not low.any():
+                break
+            hi[low] *= 2
+            f_hi[low] = residual(hi[low], np.flatnonzero(low))[0]
+
+        depth, converged, _ = safeguarded_newton(residual, lo, hi, x0, f_lo, f_hi, xtol=xtol,
+                                                 ftol=1e-12 * np.nanmax(np.append(target, 1.0)))
+        return np.where(valid & converged, depth, np.nan)
+
+    @timed('canal/profundidade_critica')
+    def critical_depth(self, Q, g=GRAVITY, xtol=1e-12):
+        """
+        Profundidade crítica (m), em que Fr = 1, para todos os canais
+        Q: Vazão (m³/s)
+
+        Resolve √g·A^(3/2)·T^(-1/2) = Q, crescente em y para as três formas.
+        """
+        Q = np.broadcast_to(np.array(Q, dtype=float, ndmin=1), self.width.shape)
+        valid = Q > 0
+
+        def residual(y, idx):
+            A, _, T, _, dT = self.geometry(y, idx)
+            flow = np.sqrt(g * A**3 / T)
+            derivative = flow * (1.5 * T / A - 0.5 * dT / T)
+            return flow - Q[idx], derivative
+
+        # Retangular: y_c = (q²/g)^(1/3) com a largura de topo
+        rectangular = (Q**2 / (g * np.maximum(self.width, 1e-12)**2))**(1/3)
+        x0 = np.where(self.circular, 0.5 * np.nan_to_num(self.diameter), np.where(self.width > 0, rectangular, 1.0))
+        lo = np.full(Q.shape, 1e-12)
+        hi = np.where(self.circular, self.diameter * (1 - 1e-9), 2 * x0)
+        f_lo = -Q
+        f_hi = residual(hi, np.arange(hi.size))[0]
+        for _ in range(100):
+            low = (f_hi < 0) & ~self.circular
+            if not low.any():
+                break
+            hi[low] *= 2
+            f_hi[low] = residual(hi[low], np.flatnonzero(low))[0]
+
+        depth, converged, _ = safeguarded_newton(residual, lo, hi, x0, f_lo, f_hi, xtol=xtol,
+                                                 ftol=1e-12 * np.max(np.append(Q, 1.0)))
+        return np.where(valid & converged, depth, np.nan)
+
+    def hydraulics(self, y, Q, g=GRAVITY):
+        """
+        Grandezas do escoamento na profundidade y
+
+        Retorna: dicionário com area, wetted_perimeter, hydraulic_radius,
+        top_width, hydraulic_depth, velocity, froude e specific_energy
+        """
+        A, P, T, _, _ = self.geometry(np.broadcast_to(np.asarray(y, dtype=float), self.width.shape).copy())
+        V = Q / A
+        hydraulic_depth = A / T
+        return {
+            'area': A,
+            'wetted_perimeter': P,
+            'hydraulic_radius': A / P,
+            'top_width': T,
+            'hydraulic_depth': hydraulic_depth,
+            'velocity': V,
+            'froude': V / np.sqrt(g * hydraulic_depth),
+            'specific_energy': y + V**2 / (2 * g)
+        }
+
+def classify_profile(depth, normal, critical, slope, rtol=1e-3):
+    """
+    Tipo da curva de remanso (M1, M2, M3, S1, ..., C1, C3, H2, H3, A2, A3),
+    "Uniforme" na profundidade normal ou "Seção cheia" quando a vazão excede
+    a capacidade da seção circular
+    depth: Profundidade de controle
+    normal, critical: Profundidades normal e crítica
+    slope: Declividade do fundo
+    """
+    depth, normal, critical, slope = np.broadcast_arrays(depth, normal, critical, slope)
+    letter = np.where(
+        slope < 0, "A",
+        np.where(slope == 0, "H",
+                 np.where(np.abs(normal - critical) <= rtol * critical, "C",
+                          np.where(normal > critical, "M", "S")))
+    )
+    upper = np.fmax(normal, critical)
+    lower = np.fmin(normal, critical)
+    zone = np.where(depth > upper, "1", np.where(depth < lower, "3", "2"))
+    # Sem profundidade normal (H e A) só há as zonas acima e abaixo da crítica
+    no_normal = slope <= 0
+    zone = np.where(no_normal, np.where(depth > critical, "2", "3"), zone)
+    profile = np.char.add(letter.astype(str), zone.astype(str))
+    at_normal = ~no_normal & (np.abs(depth - normal) <= rtol * normal)
+    profile = np.where(at_normal, "Uniforme", profile)
+    # Seção circular acima da capacidade: não há profundidade normal livre
+    return np.where(~no_normal & np.isnan(normal), "Seção cheia", profile)
+
+@timed('canal/remanso')
+def water_surface_profiles(sections, Q, slope, n, length, control_depth, n_steps=200, g=GRAVITY):
+    """
+    Curvas de remanso de todos os canais por Runge-Kutta de 4ª ordem
+    sections: ChannelSections
+    Q, slope, n, length: Vazão, declividade, Manning e comprimento de cada canal
+    control_depth: Profundidade na seção de controle
+
+    Profundidades de controle acima da crítica (escoamento subcrítico) são
+    impostas na extremidade de jusante e a integração segue para montante;
+    abaixo da crítica, são impostas a montante e a integração segue para
+    jusante. A integração de um canal é interrompida quando a profundidade
+    atinge a crítica (ressalto ou afogamento da seção de controle), e os
+    pontos seguintes ficam NaN.
+
+    Retorna: dicionário com station (fração do comprimento, de montante para
+    jusante), depth (canais x estações), normal_depth, critical_depth,
+    profile (tipo da curva), subcritical, reached_critical e
+    end_depth (profundidade na extremidade oposta ao controle)
+    """
+    n_channels = len(sections)
+    Q, slope, n, length, control = (
+        np.broadcast_to(np.array(v, dtype=float, ndmin=1), (n_channels,)).copy()
+        for v in (Q, slope, n, length, control_depth)
+    )
+    normal = sections.normal_depth(Q, slope, n)
+    critical = sections.critical_depth(Q, g)
+    subcritical = control > critical
+    # Subcrítico: controle a jusante e passo negativo
+    dx = np.where(subcritical, -length, length) / n_steps
+    ceiling = sections.max_depth()
+
+    def derivative(y):
+        A, P, T, _, _ = sections.geometry(y)
+        friction_slope = (n * Q)**2 / (A**2 * (A / P)**(4/3))
+        froude_sq = Q**2 * T / (g * A**3)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (slope - friction_slope) / (1 - froude_sq)
+
+    depth = np.full((n_channels, n_steps + 1), np.nan)
+    y = control.copy()
+    active = np.isfinite(y) & (y > 0) & (y < ceiling)
+    y[~active] = np.nan
+    depth[:, 0] = y
+    for step in range(1, n_steps + 1):
+        if not active.any():
+            break
+        with np.errstate(invalid='ignore', over='ignore'):
+            k1 = derivative(y)
+            k2 = derivative(y + 0.5 * dx * k1)
+            k3 = derivative(y + 0.5 * dx * k2)
+            k4 = derivative(y + dx * k3)
+            y_new = y + dx / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+        # Interrompe ao cruzar a crítica ou sair da seção
+        crossed = (y_new > critical) != subcritical
+        invalid = ~np.isfinite(y_new) | (y_new <= 0) | (y_new >= ceiling) | crossed
+        active &= ~invalid
+        y = np.where(active, y_new, np.nan)
+        depth[:, step] = y
+
+    reached_critical = np.isnan(depth[:, -1]) & np.isfinite(depth[:, 0])
+    # Estações de montante para jusante
+    depth = np.where(subcritical[:, None], depth[:, ::-1], depth)
+    end_depth = np.where(subcritical, depth[:, 0], depth[:, -1])
+    return {
+        'station': np.linspace(0.0, 1.0, n_steps + 1),
+        'depth': depth,
+        'normal_depth': normal,
+        'critical_depth': critical,
+        'profile': classify_profile(control, normal, critical, slope),
+        'subcritical': subcritical,
+        'reached_critical': reached_critical,
+        'end_depth': end_depth
+    }
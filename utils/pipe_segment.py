@@ -0,0 +1,283 @@
+"""
+Representação compacta dos trechos
+
+PipeSegment guarda um trecho em atributos com __slots__ (sem o dicionário
+de cada instância) e aceita a mesma interface de dicionário usada no resto
+do código (pipe['diameter'], pipe.get('n_curves', 1), pipe.update(...)),
+de modo que listas de PipeSegment e de dicionários são intercambiáveis.
+
+PipeColumns guarda muitos trechos como colunas NumPy (material como
+código em uma lista de categorias) e é a forma usada na serialização
+compacta (.npz) e na montagem vetorizada do SystemModel.
+"""
+import io
+import zipfile
+from operator import attrgetter
+import numpy as np
+from config.settings import TUBE_MATERIALS
+from utils.loss_coefficients import K_contraction_round, K_expansion_round, K_table
+
+# Campos de um trecho e valores padrão (também as colunas da tabela de trechos)
+PIPE_DEFAULTS = {
+    'id': None,
+    'material': 'Aço comercial',
+    'roughness': None,
+    'diameter': 0.1,
+    'length': 100.0,
+    'elevation_change': 0.0,
+    'has_contraction': False,
+    'contraction_ratio': 2.0,
+    'has_expansion': False,
+    'expansion_ratio': 2.0,
+    'has_curves': False,
+    'n_curves': 0,
+    'has_valve_gate': False,
+    'has_valve_globe': False,
+    'has_valve_ball': False,
+    'has_valve_check': False,
+    'has_tee_through': False,
+    'n_tee_through': 0,
+    'has_tee_branch': False,
+    'n_tee_branch': 0
+}
+PIPE_FIELDS = tuple(PIPE_DEFAULTS)
+
+# Tipos das colunas de PipeColumns
+_FLOAT_FIELDS = ('roughness', 'diameter', 'length', 'elevation_change', 'contraction_ratio', 'expansion_ratio')
+_COUNT_FIELDS = ('n_curves', 'n_tee_through', 'n_tee_branch')
+_BOOL_FIELDS = tuple(name for name in PIPE_FIELDS if name.startswith('has_'))
+
+_FIELD_SET = frozenset(PIPE_FIELDS)
+_values_of = attrgetter(*PIPE_FIELDS)
+
+class PipeSegment:
+    """
+    Um trecho da tubulação (campos de PIPE_DEFAULTS)
+
+    Campos omitidos recebem o valor padrão; campos desconhecidos são
+    rejeitados (KeyError na atribuição por chave, TypeError na criação).
+    """
+
+    __slots__ = PIPE_FIELDS
+
+    def __init__(self, **values):
+        for name, default in PIPE_DEFAULTS.items():
+            setattr(self, name, values.pop(name, default))
+        if values:
+            raise TypeError(f"Campos desconhecidos para um trecho: {', '.join(values)}")
+
+    @classmethod
+    def from_values(cls, values):
+        """Trecho a partir dos valores na ordem de PIPE_FIELDS"""
+        segment = cls.__new__(cls)
+        for name, value in zip(PIPE_FIELDS, values):
+            setattr(segment, name, value)
+        return segment
+
+    @classmethod
+    def from_mapping(cls, pipe):
+        """Trecho a partir de um dicionário (p.ex. lido de JSON)"""
+        return cls(**{name: pipe[name] for name in PIPE_FIELDS if name in pipe})
+
+    def astuple(self):
+        """Valores na ordem de PIPE_FIELDS"""
+        return _values_of(self)
+
+    def to_dict(self):
+        return dict(zip(PIPE_FIELDS, _values_of(self)))
+
+    def copy(self):
+        return PipeSegment.from_values(_values_of(self))
+
+    # Interface de dicionário
+    def __getitem__(self, name):
+        try:
+            return getattr(self, name)
+        except (AttributeError, TypeError):
+            raise KeyError(name) from None
+
+    def __setitem__(self, name, value):
+        if name not in _FIELD_SET:
+            raise KeyError(name)
+        setattr(self, name, value)
+
+    def get(self, name, default=None):
+        return getattr(self, name, default) if name in _FIELD_SET else default
+
+    def __contains__(self, name):
+        return name in _FIELD_SET
+
+    def __iter__(self):
+        return iter(PIPE_FIELDS)
+
+    def __len__(self):
+        return len(PIPE_FIELDS)
+
+    def keys(self):
+        return PIPE_FIELDS
+
+    def values(self):
+        return _values_of(self)
+
+    def items(self):
+        return zip(PIPE_FIELDS, _values_of(self))
+
+    def update(self, other=(), **values):
+        for name, value in (other.items() if hasattr(other, 'items') else other):
+            self[name] = value
+        for name, value in values.items():
+            self[name] = value
+
+    def __eq__(self, other):
+        if isinstance(other, PipeSegment):
+            return _values_of(self) == _values_of(other)
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"PipeSegment({', '.join(f'{name}={value!r}' for name, value in self.items())})"
+
+def new_pipe(pipe_id, material=PIPE_DEFAULTS['material'], **values):
+    """
+    Trecho novo com os valores padrão
+    pipe_id: Número do trecho
+    material: Material (a rugosidade vem de TUBE_MATERIALS, exceto no
+              Personalizado, que usa values['roughness'])
+    values: Demais campos a alterar
+    """
+    if material != "Personalizado":
+        values['roughness'] = TUBE_MATERIALS[material]
+    return PipeSegment(id=pipe_id, material=material, **values)
+
+def as_segments(pipes):
+    """Lista de PipeSegment a partir de trechos em dicionários ou PipeSegment"""
+    return [pipe if isinstance(pipe, PipeSegment) else PipeSegment.from_mapping(pipe) for pipe in pipes]
+
+class PipeColumns:
+    """
+    Trechos em colunas
+
+    Atributos: um array por campo de PIPE_FIELDS (id int64, material como
+    código int8 em materials, floats em float64, quantidades em int16 e
+    acessórios em bool). Rugosidade ausente é NaN.
+    """
+
+    def __init__(self, columns, materials):
+        self.materials = list(materials)
+        for name in PIPE_FIELDS:
+            setattr(self, name, columns[name])
+
+    @classmethod
+    def from_pipes(cls, pipes):
+        """Colunas a partir de uma lista de PipeSegment ou dicionários completos"""
+        rows = [pipe.astuple() if isinstance(pipe, PipeSegment) else tuple(pipe[name] for name in PIPE_FIELDS)
+                for pipe in pipes]
+        values = dict(zip(PIPE_FIELDS, zip(*rows))) if rows else {name: () for name in PIPE_FIELDS}
+        return cls.from_lists(values)
+
+    @classmethod
+    def from_lists(cls, values):
+        """Colunas a partir de um dicionário {campo: sequência} (p.ex. de um DataFrame)"""
+        materials = list(TUBE_MATERIALS)
+        extra = sorted(set(values['material']) - set(materials))
+        materials += extra
+        code = {name: i for i, name in enumerate(materials)}
+        columns = {
+            'id': np.array(values['id'], dtype=np.int64),
+            'material': np.array([code[name] for name in values['material']], dtype=np.int8)
+        }
+        for name in _FLOAT_FIELDS:
+            columns[name] = np.array([np.nan if value is None else value for value in values[name]], dtype=float)
+        for name in _COUNT_FIELDS:
+            columns[name] = np.array(values[name], dtype=np.int16)
+        for name in _BOOL_FIELDS:
+            columns[name] = np.array(values[name], dtype=bool)
+        return cls(columns, materials)
+
+    def __len__(self):
+        return len(self.id)
+
+    def __getitem__(self, index):
+        """Um PipeSegment (índice inteiro) ou um PipeColumns (fatia ou máscara)"""
+        if isinstance(index, (int, np.integer)):
+            return PipeSegment.from_values(self._row(index))
+        return PipeColumns({name: getattr(self, name)[index] for name in PIPE_FIELDS}, self.materials)
+
+    def _row(self, i):
+        """Valores nativos do Python do trecho i, na ordem de PIPE_FIELDS"""
+        values = []
+        for name in PIPE_FIELDS:
+            value = getattr(self, name)[i].item()
+            if name == 'material':
+                value = self.materials[value]
+            elif name == 'roughness' and value != value:
+                value = None
+            values.append(value)
+        return values
+
+    def to_pipes(self):
+        """Lista de PipeSegment"""
+        lists = []
+        for name in PIPE_FIELDS:
+            values = getattr(self, name).tolist()
+            if name == 'material':
+                values = [self.materials[code] for code in values]
+            elif name == 'roughness':
+                values = [None if value != value else value for value in values]
+            lists.append(values)
+        return [PipeSegment.from_values(row) for row in zip(*lists)]
+
+    @property
+    def nbytes(self):
+        """Memória ocupada pelas colunas (bytes)"""
+        return sum(getattr(self, name).nbytes for name in PIPE_FIELDS)
+
+    def roughness_values(self):
+        """Rugosidade efetiva (m): a do material ou, no Personalizado, a do trecho"""
+        table = np.array([np.nan if TUBE_MATERIALS.get(name) is None else TUBE_MATERIALS[name]
+                          for name in self.materials])
+        tabulated = table[self.material]
+        return np.nan_to_num(np.where(np.isnan(self.roughness), tabulated, self.roughness))
+
+    def K_total(self):
+        """
+        Soma dos coeficientes K dos acessórios de cada trecho (a mesma conta
+        de calculations.pipe_K_total, na mesma ordem, para todos os trechos)
+        """
+        K_fixed = K_table()
+        K = np.zeros(len(self))
+        K += np.where(self.has_contraction, K_contraction_round(D1=self.contraction_ratio, D2=1.0), 0.0)
+        K += np.where(self.has_expansion, K_expansion_round(D1=1.0, D2=self.expansion_ratio), 0.0)
+        K += np.where(self.has_curves, K_fixed['curve'] * self.n_curves, 0.0)
+        K += np.where(self.has_valve_gate, K_fixed['valve_gate'], 0.0)
+        K += np.where(self.has_valve_globe, K_fixed['valve_globe'], 0.0)
+        K += np.where(self.has_valve_ball, K_fixed['valve_ball'], 0.0)
+        K += np.where(self.has_valve_check, K_fixed['valve_check'], 0.0)
+        K += np.where(self.has_tee_through, K_fixed['tee_through'] * self.n_tee_through, 0.0)
+        K += np.where(self.has_tee_branch, K_fixed['tee_branch'] * self.n_tee_branch, 0.0)
+        return K
+
+    def to_bytes(self):
+        """Serialização compacta (.npz comprimido)"""
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, materials=np.array(self.materials),
+                            **{name: getattr(self, name) for name in PIPE_FIELDS})
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Colunas a partir de to_bytes (ValueError se o conteúdo não for um .npz de trechos)"""
+        try:
+            archive = np.load(io.BytesIO(data), allow_pickle=False)
+        except (OSError, zipfile.BadZipFile) as error:
+            raise ValueError(f"Arquivo .npz inválido: {error}") from None
+        if not isinstance(archive, np.lib.npyio.NpzFile):
+            raise ValueError("O arquivo não é um .npz de trechos")
+        with archive:
+            missing = [name for name in PIPE_FIELDS + ('materials',) if name not in archive.files]
+            if missing:
+                raise ValueError(f"Arquivo de trechos sem as colunas: {', '.join(missing)}")
+            return cls({name: archive[name] for name in PIPE_FIELDS}, archive['materials'].tolist())
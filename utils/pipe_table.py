@@ -0,0 +1,206 @@
+"""
+Lista de trechos em forma de tabela: importação, exportação e validação
+
+A tabela tem uma linha por trecho e as mesmas chaves dos dicionários de
+st.session_state.pipes. A validação é feita coluna a coluna sobre a tabela
+inteira (operações do pandas), sem percorrer as linhas.
+"""
+import io
+
+import numpy as np
+import pandas as pd
+from config.settings import TUBE_MATERIALS
+from utils.pipe_segment import PIPE_DEFAULTS, PipeColumns, PipeSegment
+
+# Colunas da tabela: os campos de um trecho, com os valores padrão de PIPE_DEFAULTS
+PIPE_COLUMNS = list(PIPE_DEFAULTS)
+
+BOOLEAN_COLUMNS = [name for name in PIPE_COLUMNS if name.startswith('has_')]
+COUNT_COLUMNS = ['n_curves', 'n_tee_through', 'n_tee_branch']
+NUMERIC_COLUMNS = ['id', 'roughness', 'diameter', 'length', 'elevation_change',
+                   'contraction_ratio', 'expansion_ratio'] + COUNT_COLUMNS
+
+# Faixas admissíveis (as mesmas dos campos do formulário de cada trecho)
+NUMERIC_LIMITS = {
+    'diameter': (0.001, 2.0),
+    'length': (0.1, 10000.0),
+    'elevation_change': (-1000.0, 1000.0),
+    'roughness': (0.0, 0.01),
+    'contraction_ratio': (1.01, 10.0),
+    'expansion_ratio': (1.01, 10.0),
+    'n_curves': (0, 20),
+    'n_tee_through': (0, 10),
+    'n_tee_branch': (0, 10)
+}
+
+# Acessório -> quantidade que precisa ser ao menos 1 quando ele está marcado
+_COUNT_OF = {'has_curves': 'n_curves', 'has_tee_through': 'n_tee_through', 'has_tee_branch': 'n_tee_branch'}
+
+_TRUE_VALUES = {'true', '1', 'sim', 's', 'yes', 'y', 'x', 'verdadeiro'}
+_FALSE_VALUES = {'false', '0', 'não', 'nao', 'n', 'no', '', 'nan', 'none', 'falso'}
+
+def pipes_to_frame(pipes):
+    """Tabela (uma linha por trecho) a partir da lista de trechos (PipeSegment ou dicionários)"""
+    frame = pd.DataFrame({name: [pipe.get(name, default) for pipe in pipes]
+                          for name, default in PIPE_DEFAULTS.items()})
+    named = frame['material'] != 'Personalizado'
+    frame.loc[named, 'roughness'] = frame.loc[named, 'material'].map(TUBE_MATERIALS)
+    return frame.astype({'roughness': float})
+
+def frame_to_pipes(frame):
+    """Lista de PipeSegment (tipos nativos do Python) a partir de uma tabela validada"""
+    columns = [frame[name].tolist() for name in PIPE_COLUMNS]
+    return [PipeSegment.from_values(row) for row in zip(*columns)]
+
+def frame_to_columns(frame):
+    """PipeColumns a partir de uma tabela validada"""
+    return PipeColumns.from_lists({name: frame[name].tolist() for name in PIPE_COLUMNS})
+
+def columns_to_frame(columns):
+    """Tabela a partir de um PipeColumns (rugosidade ausente vira NaN)"""
+    frame = pd.DataFrame({name: getattr(columns, name) for name in PIPE_COLUMNS})
+    frame['material'] = np.array(columns.materials, dtype=object)[columns.material]
+    return frame
+
+def _parse_booleans(column):
+    """Converte a coluna em bool; retorna (valores, máscara de valores inválidos)"""
+    if column.dtype == bool:
+        return column, pd.Series(False, index=column.index)
+    text = column.astype(str).str.strip().str.lower()
+    is_true = text.isin(_TRUE_VALUES)
+    is_false = text.isin(_FALSE_VALUES) | column.isna()
+    return is_true, ~(is_true | is_false)
+
+def validate_pipe_frame(frame):
+    """
+    Normaliza e valida uma tabela de trechos
+    frame: DataFrame com as colunas de PIPE_COLUMNS (colunas ausentes
+           recebem os valores de PIPE_DEFAULTS; colunas extras são ignoradas)
+
+    Rugosidade de materiais tabelados é tomada de TUBE_MATERIALS; ids
+    ausentes são numerados depois do maior id existente.
+
+    Retorna: (tabela normalizada, DataFrame de erros com as colunas
+    'linha' (a partir de 1), 'coluna' e 'erro'; vazio se tudo é válido)
+    """
+    frame = frame.copy()
+    frame.columns = [str(name).strip() for name in frame.columns]
+    for name, default in PIPE_DEFAULTS.items():
+        if name not in frame.columns:
+            frame[name] = default
+    frame = frame[PIPE_COLUMNS].reset_index(drop=True)
+
+    problems = []
+
+    def flag(mask, column, message):
+        rows = np.flatnonzero(np.asarray(mask, dtype=bool))
+        if rows.size:
+            problems.append(pd.DataFrame({'linha': rows + 1, 'coluna': column, 'erro': message}))
+
+    # Material
+    frame['material'] = frame['material'].fillna(PIPE_DEFAULTS['material']).astype(str).str.strip()
+    flag(~frame['material'].isin(list(TUBE_MATERIALS)), 'material',
+         f"material desconhecido (use: {', '.join(TUBE_MATERIALS)})")
+
+    # Colunas booleanas
+    for name in BOOLEAN_COLUMNS:
+        frame[name], invalid = _parse_booleans(frame[name])
+        frame[name] = frame[name].astype(bool)
+        flag(invalid, name, "valor lógico inválido (use verdadeiro/falso, sim/não ou 1/0)")
+
+    # Colunas numéricas: conversão e faixas
+    for name in NUMERIC_COLUMNS:
+        original = frame[name]
+        frame[name] = pd.to_numeric(original, errors='coerce')
+        flag(frame[name].isna() & original.notna() & (original.astype(str).str.strip() != ''),
+             name, "valor não numérico")
+
+    # Valores ausentes recebem o padrão (exceto id e rugosidade, tratados abaixo)
+    for name in ('diameter', 'length', 'elevation_change', 'contraction_ratio', 'expansion_ratio') + tuple(COUNT_COLUMNS):
+        frame[name] = frame[name].fillna(PIPE_DEFAULTS[name])
+
+    named = frame['material'] != 'Personalizado'
+    frame.loc[named, 'roughness'] = frame.loc[named, 'material'].map(TUBE_MATERIALS)
+    flag(~named & frame['roughness'].isna(), 'roughness', "material Personalizado exige a rugosidade")
+
+    for name, (low, high) in NUMERIC_LIMITS.items():
+        values = frame[name]
+        flag(values.notna() & ((values < low) | (values > high)), name,
+             f"fora da faixa [{low:g}, {high:g}]")
+
+    for name in COUNT_COLUMNS:
+        flag(frame[name] != frame[name].round(), name, "quantidade deve ser inteira")
+    for flag_column, count in _COUNT_OF.items():
+        flag(frame[flag_column] & (frame[count] < 1), count, "acessório marcado com quantidade menor que 1")
+
+    # Identificadores: inteiros, únicos; ausentes numerados em sequência
+    flag(frame['id'].notna() & (frame['id'] != frame['id'].round()), 'id', "id deve ser inteiro")
+    missing = frame['id'].isna()
+    if missing.any():
+        start = int(frame['id'].max()) + 1 if (~missing).any() else 1
+        frame.loc[missing, 'id'] = np.arange(start, start + missing.sum())
+    flag(frame['id'].duplicated(keep=False), 'id', "id repetido")
+
+    frame['id'] = frame['id'].astype(np.int64)
+    for name in COUNT_COLUMNS:
+        frame[name] = frame[name].round().astype(np.int64)
+    for name in ('roughness', 'diameter', 'length', 'elevation_change', 'contraction_ratio', 'expansion_ratio'):
+        frame[name] = frame[name].astype(float)
+
+    if not len(frame):
+        problems.append(pd.DataFrame({'linha': [0], 'coluna': [''], 'erro': ["tabela sem trechos"]}))
+
+    errors = (pd.concat(problems, ignore_index=True).sort_values(['linha', 'coluna'], kind='stable')
+              if problems else pd.DataFrame(columns=['linha', 'coluna', 'erro']))
+    return frame, errors.reset_index(drop=True)
+
+def read_pipe_file(data, filename):
+    """
+    Lê uma tabela de trechos em CSV, Parquet ou no formato compacto .npz
+    (PipeColumns.to_bytes)
+
+    CSV com separador ';' é lido com vírgula decimal (formato das planilhas
+    em português); com separador ',', com ponto decimal.
+    data: Conteúdo do arquivo (bytes ou objeto de arquivo)
+    filename: Nome do arquivo, usado para identificar o formato
+    """
+    buffer = io.BytesIO(data) if isinstance(data, (bytes, bytearray)) else data
+    if str(filename).lower().endswith('.npz'):
+        return columns_to_frame(PipeColumns.from_bytes(buffer.read()))
+    if str(filename).lower().endswith('.parquet'):
+        try:
+            return pd.read_parquet(buffer)
+        except ImportError:
+            raise ImportError("Leitura de Parquet requer o pacote pyarrow (pip install pyarrow)")
+    # Separador ';' é o padrão de planilhas em português, com vírgula decimal
+    content = buffer.read()
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    header = content.split(b'\n', 1)[0]
+    semicolon = header.count(b';') > header.count(b',')
+    frame = pd.read_csv(
+        io.BytesIO(content), sep=';' if semicolon else ',', decimal=',' if semicolon else '.',
+        encoding='utf-8-sig', float_precision='round_trip'
+    )
+    if semicolon:
+        # Uma célula inválida faz o pandas ler a coluna inteira como texto, sem
+        # converter a vírgula decimal: a conversão é refeita aqui para que só a
+        # célula inválida seja apontada na validação
+        for name in frame.columns:
+            if str(name).strip() in NUMERIC_COLUMNS and not pd.api.types.is_numeric_dtype(frame[name]):
+                frame[name] = frame[name].str.replace(',', '.', regex=False)
+    return frame
+
+def write_pipe_file(frame, file_format='csv'):
+    """Conteúdo (bytes) da tabela de trechos em 'csv', 'parquet' ou 'npz' (compacto)"""
+    frame = frame[PIPE_COLUMNS]
+    if file_format == 'npz':
+        return frame_to_columns(frame).to_bytes()
+    if file_format == 'parquet':
+        buffer = io.BytesIO()
+        try:
+            frame.to_parquet(buffer, index=False)
+        except ImportError:
+            raise ImportError("Gravação de Parquet requer o pacote pyarrow (pip install pyarrow)")
+        return buffer.getvalue()
+    return frame.to_csv(index=False).encode('utf-8')
@@ -0,0 +1,137 @@
+"""
+Instrumentação de tempo dos estágios de cálculo e exibição
+
+Funções e blocos marcados com timed/stage registram tempo e número de
+chamadas no Profiler ativo da thread atual. Sem Profiler ativo (o caso
+normal), o custo é uma consulta a uma variável local da thread. Cada
+sessão do Streamlit executa o script em sua própria thread, então os
+registros de sessões diferentes não se misturam.
+"""
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+_local = threading.local()
+
+class Profiler:
+    """
+    Tempos por estágio de um rerun e histórico dos últimos reruns
+    history_size: Número de reruns guardados para exportação
+
+    Os tempos são inclusivos ('total') e próprios ('self', descontando os
+    estágios instrumentados chamados dentro do estágio).
+    """
+
+    def __init__(self, history_size=50):
+        self.history = deque(maxlen=history_size)
+        self.runs = 0
+        self.stages = {}
+        self._stack = []
+        self._run_started = None
+
+    def start_run(self):
+        """Zera os registros no início de um rerun"""
+        self.stages = {}
+        self._stack = []
+        self._run_started = time.perf_counter()
+
+    def enter(self):
+        self._stack.append(0.0)
+
+    def exit(self, name, elapsed):
+        """Registra um estágio que durou elapsed segundos"""
+        children = self._stack.pop()
+        if self._stack:
+            self._stack[-1] += elapsed
+
+        entry = self.stages.get(name)
+        if entry is None:
+            entry = self.stages[name] = {'calls': 0, 'total': 0.0, 'self': 0.0, 'max': 0.0}
+        entry['calls'] += 1
+        entry['total'] += elapsed
+        entry['self'] += elapsed - children
+        entry['max'] = max(entry['max'], elapsed)
+
+    def report(self):
+        """
+        Registros do rerun atual
+
+        Retorna: dicionário com run, timestamp, total (s, desde start_run) e
+        stages (lista por estágio com name, calls, total, self, mean e max
+        em s, do maior tempo próprio para o menor)
+        """
+        total = time.perf_counter() - self._run_started if self._run_started is not None else 0.0
+        stages = [
+            {'name': name, **entry, 'mean': entry['total'] / entry['calls']}
+            for name, entry in self.stages.items()
+        ]
+        stages.sort(key=lambda item: item['self'], reverse=True)
+        return {
+            'run': self.runs,
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'total': total,
+            'stages': stages
+        }
+
+    def end_run(self):
+        """Fecha o rerun atual, guarda-o no histórico e retorna o relatório"""
+        self.runs += 1
+        report = self.report()
+        self.history.append(report)
+        return report
+
+    def to_json(self):
+        """Histórico de reruns em JSON, com as versões do ambiente"""
+        from utils.benchmark import environment_info
+        return json.dumps({
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'environment': environment_info(),
+            'runs': list(self.history)
+        }, indent=2, ensure_ascii=False)
+
+def activate(profiler):
+    """Passa a registrar os estágios da thread atual em profiler"""
+    _local.profiler = profiler
+
+def deactivate():
+    """Desliga o registro na thread atual"""
+    _local.profiler = None
+
+def active_profiler():
+    """Profiler ativo na thread atual, ou None"""
+    return getattr(_local, 'profiler', None)
+
+@contextmanager
+def stage(name):
+    """Bloco instrumentado: with stage('aba/sistema'): ..."""
+    profiler = getattr(_local, 'profiler', None)
+    if profiler is None:
+        yield
+        return
+    profiler.enter()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.exit(name, time.perf_counter() - start)
+
+def timed(name):
+    """Decorador que instrumenta cada chamada da função como o estágio name"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = getattr(_local, 'profiler', None)
+            if profiler is None:
+                return func(*args, **kwargs)
+            profiler.enter()
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.exit(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
@@ -0,0 +1,217 @@
+"""
+Curvas de bomba e ponto de operação (interseção com a curva do sistema)
+"""
+import numpy as np
+from config.settings import GRAVITY
+from utils.calculations import losses_from_invariants
+from utils.root_finding import bracketed_root
+from utils.system_model import stack_system_models
+from utils.profiling import timed
+
+class PumpCurve:
+    """
+    Curva altura manométrica x vazão de uma bomba
+
+    Pode ser definida por pontos tabelados (interpolação linear, sem
+    extrapolação além do último ponto) ou por um polinômio
+    H(Q) = c0 + c1·Q + c2·Q² + ... (Q em m³/s, H em m).
+    """
+
+    def __init__(self, flow_rates=None, heads=None, coefficients=None, name=None):
+        self.name = name
+
+        if coefficients is not None:
+            self.coefficients = np.trim_zeros(np.asarray(coefficients, dtype=float), 'b')
+            self.flow_rates = None
+            self.heads = None
+            self.max_flow = self._polynomial_max_flow(self.coefficients)
+        else:
+            order = np.argsort(flow_rates)
+            self.flow_rates = np.asarray(flow_rates, dtype=float)[order]
+            self.heads = np.asarray(heads, dtype=float)[order]
+            if self.flow_rates.size < 2:
+                raise ValueError("A curva tabelada precisa de pelo menos dois pontos")
+            self.coefficients = None
+            self.max_flow = float(self.flow_rates[-1])
+
+    @classmethod
+    def from_points(cls, flow_rates, heads, name=None):
+        """Curva a partir de pontos (Q em m³/s, H em m)"""
+        return cls(flow_rates=flow_rates, heads=heads, name=name)
+
+    @classmethod
+    def from_polynomial(cls, coefficients, name=None):
+        """Curva a partir dos coeficientes c0, c1, c2, ... (ordem crescente)"""
+        return cls(coefficients=coefficients, name=name)
+
+    @staticmethod
+    def _polynomial_max_flow(coefficients):
+        """Menor vazão positiva em que a altura se anula"""
+        roots = np.roots(coefficients[::-1]) if coefficients.size > 1 else np.array([])
+        real = roots[np.isreal(roots)].real
+        positive = real[real > 0]
+        if positive.size == 0:
+            raise ValueError("O polinômio da bomba não cruza H = 0 para Q > 0")
+        return float(positive.min())
+
+    @property
+    def is_tabulated(self):
+        return self.coefficients is None
+
+    def head(self, flow_rate):
+        """Altura manométrica (m) para uma ou mais vazões (m³/s)"""
+        if self.is_tabulated:
+            return np.interp(flow_rate, self.flow_rates, self.heads)
+        return np.polynomial.polynomial.polyval(flow_rate, self.coefficients)
+
+class _PumpSet:
+    """
+    Várias curvas de bomba em arrays preenchidos, para avaliar H_i(Q_i) de
+    todo o lote sem laço em Python
+    """
+
+    def __init__(self, pumps):
+        n = len(pumps)
+        self.tabulated = np.array([pump.is_tabulated for pump in pumps])
+        self.max_flow = np.array([pump.max_flow for pump in pumps])
+
+        n_coef = max([pump.coefficients.size for pump in pumps if not pump.is_tabulated], default=1)
+        self.coefficients = np.zeros((n, n_coef))
+
+        n_points = max([pump.flow_rates.size for pump in pumps if pump.is_tabulated], default=2)
+        self.Q_points = np.zeros((n, n_points))
+        self.H_points = np.zeros((n, n_points))
+
+        for i, pump in enumerate(pumps):
+            if pump.is_tabulated:
+                m = pump.flow_rates.size
+                # Pontos extras repetem o último, preservando a interpolação
+                self.Q_points[i, :m], self.Q_points[i, m:] = pump.flow_rates, pump.flow_rates[-1]
+                self.H_points[i, :m], self.H_points[i, m:] = pump.heads, pump.heads[-1]
+            else:
+                self.coefficients[i, :pump.coefficients.size] = pump.coefficients
+
+    def head(self, flow_rate, idx):
+        """H das bombas idx nas vazões flow_rate (um valor por bomba)"""
+        H = np.zeros(flow_rate.shape)
+
+        # Polinômios (Horner por linha)
+        poly = ~self.tabulated[idx]
+        if poly.any():
+            coefficients = self.coefficients[idx[poly]]
+            Q = flow_rate[poly]
+            H_poly = coefficients[:, -1].copy()
+            for k in range(coefficients.shape[1] - 2, -1, -1):
+                H_poly = H_poly * Q + coefficients[:, k]
+            H[poly] = H_poly
+
+        # Tabelas (interpolação linear por linha)
+        table = ~poly
+        if table.any():
+            Q_points = self.Q_points[idx[table]]
+            H_points = self.H_points[idx[table]]
+            Q = flow_rate[table]
+            rows = np.arange(Q.size)
+            j = np.clip((Q_points <= Q[:, np.newaxis]).sum(axis=1) - 1, 0, Q_points.shape[1] - 2)
+            Q0, Q1 = Q_points[rows, j], Q_points[rows, j + 1]
+            H0, H1 = H_points[rows, j], H_points[rows, j + 1]
+            dQ = Q1 - Q0
+            weight = np.divide(Q - Q0, dQ, out=np.zeros_like(Q), where=dQ > 0)
+            H[table] = H0 + np.clip(weight, 0, 1) * (H1 - H0)
+
+        return H
+
+@timed('bomba/curva_sistema')
+def system_head_curve(model, flow_rates, rho, mu, static_head=0.0, g=GRAVITY):
+    """
+    Curva do sistema: altura necessária (m) para cada vazão
+    Soma das perdas de todos os trechos (como em calculate_pipe_losses,
+    incluindo o desnível) mais uma altura estática adicional.
+    """
+    losses = model.losses(flow_rates, rho, mu, g)
+    return losses['h_total'].sum(axis=1) + static_head
+
+def solve_operating_points(pumps, models, rho, mu, static_heads=0.0, product=False,
+                           g=GRAVITY, xtol=1e-10, maxiter=100):
+    """
+    Pontos de operação de vários pares bomba/sistema em uma única chamada
+    pumps: Lista de PumpCurve
+    models: Lista de SystemModel
+    rho, mu: Propriedades do fluido (escalares ou um valor por par)
+    static_heads: Altura estática adicional (m), escalar ou por par
+    product: Se True, resolve todas as combinações bomba x sistema; caso
+             contrário as listas são pareadas (uma lista de tamanho 1 é
+             repetida)
+
+    A equação H_bomba(Q) = H_sistema(Q) é resolvida no intervalo
+    [0, Q_max da bomba] por regula falsi (Illinois) vetorizada.
+
+    Retorna: dicionário de arrays com flow_rate, head, pump_index,
+    model_index, converged e status ('ok', 'sem vazão', 'fora da curva',
+    'não convergiu')
+    """
+    if product:
+        pump_index, model_index = np.meshgrid(np.arange(len(pumps)), np.arange(len(models)), indexing='ij')
+        pump_index, model_index = pump_index.ravel(), model_index.ravel()
+    else:
+        n = max(len(pumps), len(models))
+        pump_index = np.arange(n) if len(pumps) > 1 else np.zeros(n, dtype=int)
+        model_index = np.arange(n) if len(models) > 1 else np.zeros(n, dtype=int)
+
+    n_pairs = pump_index.size
+    pump_set = _PumpSet(pumps)
+    stacked = stack_system_models(models)
+    rho = np.broadcast_to(np.asarray(rho, dtype=float), n_pairs)
+    mu = np.broadcast_to(np.asarray(mu, dtype=float), n_pairs)
+    static_heads = np.broadcast_to(np.asarray(static_heads, dtype=float), n_pairs)
+
+    def system_head(Q, idx):
+        m = model_index[idx]
+        losses = losses_from_invariants(
+            Q[:, np.newaxis], stacked['diameter'][m], stacked['area'][m], stacked['eD'][m],
+            stacked['L_D'][m], stacked['K_total'][m], stacked['elevation'][m],
+            rho[idx, np.newaxis], mu[idx, np.newaxis], g
+        )
+        return losses['h_total'].sum(axis=1) + static_heads[idx]
+
+    def residual(Q, idx):
+        return pump_set.head(Q, pump_index[idx]) - system_head(Q, idx)
+
+    Q_max = pump_set.max_flow[pump_index]
+    all_idx = np.arange(n_pairs)
+    f_lo = residual(np.zeros(n_pairs), all_idx)
+    f_hi = residual(Q_max, all_idx)
+
+    Q, converged, iterations = bracketed_root(
+        residual, 0.0, Q_max, f_lo, f_hi, xtol=xtol, maxiter=maxiter
+    )
+
+    status = np.full(n_pairs, 'ok', dtype=object)
+    status[f_lo < 0] = 'sem vazão'
+    status[(f_lo >= 0) & (f_hi > 0)] = 'fora da curva'
+    status[(status == 'ok') & ~converged] = 'não convergiu'
+
+    return {
+        'flow_rate': Q,
+        'head': np.where(np.isnan(Q), np.nan, pump_set.head(np.nan_to_num(Q), pump_index)),
+        'pump_index': pump_index,
+        'model_index': model_index,
+        'converged': converged,
+        'status': status,
+        'iterations': iterations
+    }
+
+@timed('bomba/ponto_operacao')
+def operating_point(pump, model, rho, mu, static_head=0.0, g=GRAVITY):
+    """
+    Ponto de operação de uma bomba em um sistema
+
+    Retorna: dicionário com flow_rate (m³/s), head (m) e status
+    """
+    result = solve_operating_points([pump], [model], rho, mu, static_head, g=g)
+    return {
+        'flow_rate': float(result['flow_rate'][0]),
+        'head': float(result['head'][0]),
+        'status': result['status'][0],
+        'converged': bool(result['converged'][0])
+    }
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from config.settings import SHARED_CACHE_MAXSIZE, SHARED_CACHE_MAX_BYTES
+from utils.shared_cache import get_shared_cache, session_id
+
+def _json_default(value):
+    """Converte tipos NumPy e tuplas para formas serializáveis em JSON"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Tipo não serializável na chave do cache: {type(value).__name__}")
+
+def config_hash(*parts):
+    """
+    Hash estável (SHA-256) de uma configuração
+
+    As partes são serializadas em JSON com chaves ordenadas, de modo que o
+    mesmo conteúdo produz o mesmo hash entre reruns e entre processos.
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=_json_default)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class ResultCache:
+    """
+    Cache LRU de resultados de simulação endereçado pelo hash da configuração
+
+    maxsize: Número máximo de resultados guardados; ao exceder, o resultado
+             usado há mais tempo é descartado
+    shared: SharedCache do processo consultado antes de calcular (ver
+            utils.shared_cache); o resultado encontrado ou calculado lá é
+            guardado também aqui, por referência
+    session: Identificador da sessão, registrado nas consultas ao shared
+    """
+
+    def __init__(self, maxsize=64, shared=None, session=None):
+        self.maxsize = maxsize
+        self.shared = shared
+        self.session = session
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute):
+        """
+        Retorna (resultado, acerto) para a chave, chamando compute() apenas
+        se o resultado não estiver neste cache nem no compartilhado (acerto
+        é True nos dois casos)
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key], True
+            self.misses += 1
+
+        if self.shared is not None:
+            result, hit = self.shared.get_or_compute(key, compute, self.session)
+        else:
+            result, hit = compute(), False
+
+        with self._lock:
+            if hit:
+                self.shared_hits += 1
+            self._entries[key] = result
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return result, hit
+
+    def get(self, key, default=None):
+        """
+        Resultado já guardado para a chave, sem calculá-lo (útil para
+        cálculos caros disparados por botão); não altera os contadores
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        if self.shared is None:
+            return default
+        result = self.shared.get(key, session=self.session)
+        if result is None:
+            return default
+        with self._lock:
+            self._entries[key] = result
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def clear(self):
+        """Esvazia o cache e zera os contadores"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.shared_hits = self.evictions = 0
+
+    def stats(self):
+        """Contadores de acertos, falhas (e, destas, acertos no cache compartilhado) e descartes"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'shared_hits': self.shared_hits,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+def get_result_cache(store, maxsize=64, shared=True):
+    """
+    Retorna o cache de resultados guardado em store (p.ex. st.session_state),
+    criando-o na primeira chamada
+    shared: Consulta o cache de resultados do processo, compartilhado entre
+            as sessões, antes de calcular
+    """
+    cache = store.get('result_cache')
+    if cache is None:
+        shared_cache = get_shared_cache('resultados', SHARED_CACHE_MAXSIZE, SHARED_CACHE_MAX_BYTES) if shared else None
+        cache = ResultCache(maxsize, shared_cache, session_id(store))
+        store['result_cache'] = cache
+    return cache
+
+def fluid_key(sidebar_data):
+    """
+    Parte da chave de cache referente ao fluido e às condições da sidebar
+    """
+    return {
+        name: sidebar_data.get(name)
+        for name in ('fluid_type', 'temp', 'pressure_inlet', 'gas_molar_mass', 'rho', 'mu')
+    }
@@ -0,0 +1,136 @@
+"""
+Localização de raízes vetorizada para muitos problemas independentes
+
+As funções avaliam todos os problemas ainda ativos em uma única chamada
+fun(x, idx), em que idx são os índices (no lote original) dos elementos de
+x. Isso permite resolver milhares de equações escalares com um número de
+chamadas da ordem do número de iterações, e não do tamanho do lote.
+"""
+import numpy as np
+
+def bracketed_root(fun, lo, hi, f_lo=None, f_hi=None, xtol=1e-10, ftol=1e-10, maxiter=100):
+    """
+    Método de Illinois (regula falsi modificada) vetorizado
+    fun: Função fun(x, idx) -> array, avaliada apenas nos índices ativos
+    lo, hi: Limites do intervalo de cada problema (com mudança de sinal)
+    f_lo, f_hi: Valores de fun nos limites, se já conhecidos
+
+    Problemas sem mudança de sinal no intervalo retornam NaN.
+
+    Retorna: (raízes, convergiu, iterações)
+    """
+    a = np.array(lo, dtype=float, ndmin=1)
+    b = np.array(hi, dtype=float, ndmin=1)
+    a, b = np.broadcast_arrays(a, b)
+    a, b = a.copy(), b.copy()
+    all_idx = np.arange(a.size)
+
+    fa = fun(a, all_idx) if f_lo is None else np.array(f_lo, dtype=float, ndmin=1).copy()
+    fb = fun(b, all_idx) if f_hi is None else np.array(f_hi, dtype=float, ndmin=1).copy()
+    fa, fb = np.broadcast_to(fa, a.shape).copy(), np.broadcast_to(fb, a.shape).copy()
+
+    root = np.full(a.shape, np.nan)
+    converged = np.zeros(a.shape, dtype=bool)
+
+    # Extremos que já são raízes
+    at_a = fa == 0
+    at_b = (fb == 0) & ~at_a
+    root[at_a], root[at_b] = a[at_a], b[at_b]
+    converged[at_a | at_b] = True
+
+    active = ~converged & (np.sign(fa) != np.sign(fb)) & np.isfinite(fa) & np.isfinite(fb)
+    iterations = 0
+
+    while active.any() and iterations < maxiter:
+        iterations += 1
+        idx = all_idx[active]
+        ai, bi, fai, fbi = a[idx], b[idx], fa[idx], fb[idx]
+
+        # Secante protegida: recai na bisseção se sair do intervalo
+        c = bi - fbi * (bi - ai) / (fbi - fai)
+        outside = ~((c > np.minimum(ai, bi)) & (c < np.maximum(ai, bi)))
+        c[outside] = 0.5 * (ai + bi)[outside]
+
+        fc = fun(c, idx)
+
+        # Troca de extremo quando o sinal muda; senão o extremo retido é
+        # ponderado por 1/2 (Illinois), o que evita a convergência unilateral
+        sign_change = np.sign(fc) != np.sign(fbi)
+        a[idx] = np.where(sign_change, bi, ai)
+        fa[idx] = np.where(sign_change, fbi, 0.5 * fai)
+        b[idx], fb[idx] = c, fc
+
+        done = (np.abs(fc) <= ftol) | (np.abs(c - a[idx]) <= xtol * (1 + np.abs(c))) | (fc == 0)
+        root[idx[done]] = c[done]
+        converged[idx[done]] = True
+        active[idx[done]] = False
+
+    # Problemas que esgotaram as iterações ficam com a melhor estimativa
+    pending = active
+    root[pending] = b[pending]
+
+    return root, converged, iterations
+
+def safeguarded_newton(fun, lo, hi, x0, f_lo, f_hi, xtol=1e-12, ftol=1e-10, maxiter=50):
+    """
+    Método de Newton vetorizado protegido por intervalo (estilo rtsafe)
+    fun: Função fun(x, idx) -> (resíduo, derivada), avaliada nos índices ativos
+    lo, hi: Limites do intervalo de cada problema (com mudança de sinal)
+    x0: Estimativas iniciais (p.ex. a solução anterior); são trazidas para
+        dentro do intervalo quando necessário
+    f_lo, f_hi: Resíduos nos limites
+
+    O passo de Newton é aceito apenas se cair dentro do intervalo atual;
+    caso contrário é feita uma bisseção. A cada avaliação o intervalo é
+    reduzido pelo sinal do resíduo, de modo que a convergência é garantida
+    mesmo com derivadas aproximadas.
+
+    Retorna: (raízes, convergiu, iterações)
+    """
+    lo = np.array(lo, dtype=float, ndmin=1)
+    hi = np.array(hi, dtype=float, ndmin=1)
+    x0 = np.array(x0, dtype=float, ndmin=1)
+    lo, hi, x0 = [arr.copy() for arr in np.broadcast_arrays(lo, hi, x0)]
+    f_lo = np.broadcast_to(np.asarray(f_lo, dtype=float), lo.shape).copy()
+    f_hi = np.broadcast_to(np.asarray(f_hi, dtype=float), lo.shape).copy()
+    all_idx = np.arange(lo.size)
+
+    # Estimativa inicial fora do intervalo (ou inválida) vira o ponto médio
+    x = x0
+    invalid = ~((x > np.minimum(lo, hi)) & (x < np.maximum(lo, hi)))
+    x[invalid] = 0.5 * (lo + hi)[invalid]
+
+    root = np.full(lo.shape, np.nan)
+    converged = np.zeros(lo.shape, dtype=bool)
+    active = (np.sign(f_lo) != np.sign(f_hi)) & np.isfinite(f_lo) & np.isfinite(f_hi)
+    iterations = 0
+
+    while active.any() and iterations < maxiter:
+        iterations += 1
+        idx = all_idx[active]
+        xi = x[idx]
+        f, df = fun(xi, idx)
+
+        # Redução do intervalo pelo sinal do resíduo
+        same_as_lo = np.sign(f) == np.sign(f_lo[idx])
+        lo[idx] = np.where(same_as_lo, xi, lo[idx])
+        f_lo[idx] = np.where(same_as_lo, f, f_lo[idx])
+        hi[idx] = np.where(same_as_lo, hi[idx], xi)
+        f_hi[idx] = np.where(same_as_lo, f_hi[idx], f)
+
+        # Passo de Newton, com bisseção quando sai do intervalo
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_new = xi - f / df
+        a, b = np.minimum(lo[idx], hi[idx]), np.maximum(lo[idx], hi[idx])
+        outside = ~((x_new > a) & (x_new < b))
+        x_new[outside] = 0.5 * (a + b)[outside]
+
+        done = (np.abs(f) <= ftol) | (np.abs(x_new - xi) <= xtol * (1 + np.abs(xi))) | ((b - a) <= xtol * (1 + np.abs(xi)))
+        root[idx[done]] = np.where(np.abs(f[done]) <= ftol, xi[done], x_new[done])
+        converged[idx[done]] = True
+        active[idx[done]] = False
+        x[idx] = x_new
+
+    root[active] = x[active]
+
+    return root, converged, iterations
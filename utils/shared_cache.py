@@ -0,0 +1,246 @@
+"""
+Caches compartilhados por todas as sessões do processo
+
+Dados imutáveis e caros de montar são calculados uma única vez por
+processo e entregues a todas as sessões, no estilo de st.cache_resource,
+mas sem depender do Streamlit (os módulos de utils continuam usáveis nos
+benchmarks e em scripts):
+- tabelas de referência declaradas com shared_resource: propriedades dos
+  fluidos, coeficientes K dos acessórios e a grade do diagrama de Moody;
+- resultados de simulação, endereçados pelo hash da configuração
+  (config_hash com model.key e fluid_key), que não depende da sessão: o
+  ResultCache de cada sessão consulta o cache 'resultados' antes de
+  calcular.
+
+A mesma instância é vista por todas as sessões e pelas threads dos
+cálculos em segundo plano, por isso os valores são congelados antes de
+entrar no cache (ver freeze): arrays somente leitura, dicionários como
+FrozenDict e listas como tuplas. Quem precisar alterar um resultado deve
+copiá-lo. Cada cache tem limite de entradas e de memória; as estatísticas
+contam quantas sessões distintas usaram cada entrada e, a partir disso, a
+memória economizada em relação a cada sessão guardar a sua própria cópia.
+"""
+import functools
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+import numpy as np
+from config.settings import SHARED_CACHE_MAXSIZE, SHARED_CACHE_MAX_BYTES
+
+_caches = OrderedDict()
+_caches_lock = threading.Lock()
+_local = threading.local()
+
+def session_id(store):
+    """
+    Identificador da sessão de store (p.ex. st.session_state), criado na
+    primeira chamada
+    """
+    value = store.get('shared_cache_session')
+    if value is None:
+        value = uuid.uuid4().hex
+        store['shared_cache_session'] = value
+    return value
+
+def bind_session(store):
+    """
+    Associa as consultas feitas por esta thread (p.ex. às tabelas de
+    shared_resource) à sessão de store; chamada no início do script
+    """
+    _local.session = session_id(store)
+    return _local.session
+
+def current_session():
+    """Sessão associada à thread atual (None fora de uma sessão, p.ex. nos benchmarks)"""
+    return getattr(_local, 'session', None)
+
+class FrozenDict(dict):
+    """
+    Dicionário somente leitura: as operações que o alterariam levantam
+    TypeError; copy() retorna um dict comum, alterável
+    """
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Valor do cache compartilhado é somente leitura; altere uma cópia")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def copy(self):
+        return dict(self)
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+def freeze(value):
+    """
+    Versão imutável de um valor: arrays são marcados como somente leitura
+    (no próprio array, também para quem o calculou), dicionários viram
+    FrozenDict, listas e tuplas viram tuplas e conjuntos, frozenset, com
+    os itens congelados recursivamente
+    """
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return value
+
+def nbytes_of(value):
+    """Memória aproximada (bytes) de um valor: arrays, dicionários, listas, tuplas e escalares"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(nbytes_of(key) + nbytes_of(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(nbytes_of(item) for item in value)
+    return sys.getsizeof(value)
+
+class SharedCache:
+    """
+    Cache LRU do processo, limitado em entradas e em memória
+
+    name: Nome exibido nas estatísticas
+    maxsize: Número máximo de entradas
+    max_bytes: Memória máxima (bytes, estimada por nbytes_of); valores
+               maiores que o limite são retornados sem serem guardados
+    """
+
+    def __init__(self, name, maxsize=SHARED_CACHE_MAXSIZE, max_bytes=SHARED_CACHE_MAX_BYTES):
+        self.name = name
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        # chave -> [valor, bytes, sessões que usaram a entrada]
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, compute, session=None):
+        """
+        Retorna (valor, acerto) para a chave, chamando compute() apenas se
+        o valor ainda não estiver no cache; o valor retornado é sempre a
+        versão congelada (ver freeze), mesmo para quem o calculou
+        session: Sessão que faz a consulta (para as estatísticas); por
+                 padrão, a associada à thread por bind_session
+        """
+        if session is None:
+            session = getattr(_local, 'session', None)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                if session is not None:
+                    entry[2].add(session)
+                return entry[0], True
+            self.misses += 1
+
+        value = freeze(compute())
+        size = nbytes_of(value)
+
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = [value, size, set() if session is None else {session}]
+                self.nbytes += size
+                while len(self._entries) > self.maxsize or self.nbytes > self.max_bytes:
+                    _, (_, evicted, _) = self._entries.popitem(last=False)
+                    self.nbytes -= evicted
+                    self.evictions += 1
+
+        return value, False
+
+    def get(self, key, default=None, session=None):
+        """Valor já guardado para a chave, sem calculá-lo; não altera os contadores"""
+        if session is None:
+            session = getattr(_local, 'session', None)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._entries.move_to_end(key)
+            if session is not None:
+                entry[2].add(session)
+            return entry[0]
+
+    def clear(self):
+        """Esvazia o cache e zera os contadores"""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Contadores, memória ocupada e memória economizada: cada entrada
+        usada por k sessões economiza k - 1 cópias
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+        sessions = set().union(*(users for _, _, users in entries))
+        saved = sum(size * (len(users) - 1) for _, size, users in entries if len(users) > 1)
+        lookups = self.hits + self.misses
+        return {
+            'name': self.name,
+            'size': len(entries),
+            'maxsize': self.maxsize,
+            'nbytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'sessions': len(sessions),
+            'bytes_saved': saved,
+            'bytes_saved_per_session': saved / len(sessions) if sessions else 0.0
+        }
+
+def get_shared_cache(name, maxsize=SHARED_CACHE_MAXSIZE, max_bytes=SHARED_CACHE_MAX_BYTES):
+    """Cache compartilhado com o nome dado, criado na primeira chamada"""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = SharedCache(name, maxsize, max_bytes)
+            _caches[name] = cache
+        return cache
+
+def shared_resource(name, maxsize=SHARED_CACHE_MAXSIZE, max_bytes=SHARED_CACHE_MAX_BYTES):
+    """
+    Decorador: guarda o retorno da função no cache compartilhado name
+    (exclusivo da função), endereçado pelos argumentos (que devem ser
+    hasheáveis)
+
+    O retorno é congelado (ver freeze) e compartilhado entre as sessões. A
+    função original continua acessível em .__wrapped__ e o cache em .cache.
+    """
+    def decorator(func):
+        cache = get_shared_cache(name, maxsize, max_bytes)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+            return cache.get_or_compute(key, lambda: func(*args, **kwargs))[0]
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+def shared_cache_stats():
+    """Estatísticas (ver SharedCache.stats) de todos os caches compartilhados"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return [cache.stats() for cache in caches]
+
+def clear_shared_caches():
+    """Esvazia todos os caches compartilhados"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.clear()
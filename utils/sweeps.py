@@ -0,0 +1,239 @@
+"""
+Varreduras paramétricas da aba de Simulações, separadas da renderização
+
+Todas as funções recebem um SystemModel e retornam dicionários de arrays,
+prontos para serem guardados no cache de resultados.
+"""
+import numpy as np
+from config.settings import GRAVITY
+from utils.calculations import LOSSES_BYTES_PER_ELEMENT, friction_factor_array, losses_from_invariants
+from utils.fluid_properties import get_fluid_properties
+from utils.profiling import timed
+
+# Parâmetros das varreduras 2D (unidades SI)
+GRID_PARAMETERS = {
+    'flow_rate': "Vazão (m³/s)",
+    'temperature': "Temperatura (°C)",
+    'pressure_inlet': "Pressão de entrada (Pa)",
+    'diameter': "Diâmetro (m)",
+    'roughness': "Rugosidade (m)",
+    'length': "Comprimento (m)"
+}
+# Parâmetros aplicados aos trechos escolhidos (os demais valem para o sistema)
+SEGMENT_PARAMETERS = ('diameter', 'roughness', 'length')
+
+@timed('varredura/vazao')
+def flow_rate_sweep(model, rho, mu, Q_min, Q_max, n_points, g=GRAVITY, memory_limit=64 * 2**20,
+                    progress=None):
+    """
+    Perda de carga (distribuída + elevação) e velocidade no primeiro trecho
+    para vazões entre Q_min e Q_max (m³/s)
+    memory_limit: Memória (bytes) dos arrays intermediários de cada bloco
+    progress: Função chamada com (vazões concluídas, total) após cada bloco
+    """
+    flow_rates = np.linspace(Q_min, Q_max, n_points)
+    head_losses, velocities = np.empty(n_points), np.empty(n_points)
+
+    # Blocos de vazões com todos os trechos de uma vez (n_vazões x n_trechos)
+    block = max(1, memory_limit // (len(model) * LOSSES_BYTES_PER_ELEMENT))
+    for start in range(0, n_points, block):
+        part = slice(start, min(start + block, n_points))
+        losses = model.losses(flow_rates[part], rho, mu, g)
+        head_losses[part] = (losses['h_distributed'] + losses['h_elevation']).sum(axis=1)
+        velocities[part] = losses['V'][:, 0]
+        if progress is not None:
+            progress(part.stop, n_points)
+
+    return {
+        'flow_rates': flow_rates,
+        'head_losses': head_losses,
+        'velocities': velocities
+    }
+
+@timed('varredura/pressao')
+def inlet_pressure_sweep(model, rho, mu, flow_rate, P_min, P_max, n_points=50, g=GRAVITY):
+    """
+    Pressão de saída para pressões de entrada entre P_min e P_max (Pa)
+    """
+    pressures_inlet = np.linspace(P_min, P_max, n_points)
+
+    # A vazão é a mesma para todas as pressões: as perdas são calculadas uma única vez
+    losses = model.losses(flow_rate, rho, mu, g)
+    h_total = (losses['h_distributed'] + losses['h_elevation']).sum()
+
+    return {
+        'pressures_inlet': pressures_inlet,
+        'pressures_outlet': pressures_inlet - h_total * rho * g
+    }
+
+@timed('varredura/materiais_trechos')
+def material_what_if(model, rho, mu, flow_rate, pressure_inlet, materials, g=GRAVITY, progress=None):
+    """
+    Efeito de trocar o material de cada trecho, e de todo o sistema, por
+    cada material da tabela
+    materials: Dicionário {material: rugosidade (m)}, p.ex. TUBE_MATERIALS
+               sem as entradas None
+    progress: Função chamada com (materiais concluídos, total) após cada
+              material
+
+    Com a vazão fixa, trocar o material de um trecho altera apenas o fator
+    de atrito e a perda distribuída desse trecho; os demais termos não
+    mudam. Os fatores de atrito de todos os trechos são avaliados em uma
+    chamada por material, e a perda total de cada substituição é a perda
+    atual somada à variação do trecho trocado.
+
+    Retorna: dicionário com materials, ids, base_head_loss e
+    base_pressure_outlet (sistema atual), delta_head (materiais x trechos,
+    variação da perda total ao trocar só aquele trecho), head_loss e
+    pressure_outlet (materiais x trechos) e swap_head_loss e
+    swap_pressure_outlet (todos os trechos no material)
+    """
+    names = list(materials.keys())
+    roughness = np.array([materials[name] for name in names], dtype=float)
+
+    losses = model.losses(flow_rate, rho, mu, g)
+    base_head_loss = float(losses['h_total'].sum())
+    V, Re = losses['V'][0], losses['Re'][0]
+
+    # Perda distribuída de cada trecho em cada material (materiais x trechos)
+    f = np.empty((len(names), len(model)))
+    for i in range(len(names)):
+        f[i] = friction_factor_array(Re, roughness[i] / model.diameter)
+        if progress is not None:
+            progress(i + 1, len(names))
+    h_distributed = f * model.L_D * (V**2 / (2 * g))
+    delta_head = h_distributed - losses['h_distributed'][0]
+
+    head_loss = base_head_loss + delta_head
+    swap_head_loss = base_head_loss + delta_head.sum(axis=1)
+    return {
+        'materials': names,
+        'ids': model.ids,
+        'base_head_loss': base_head_loss,
+        'base_pressure_outlet': pressure_inlet - base_head_loss * rho * g,
+        'delta_head': delta_head,
+        'head_loss': head_loss,
+        'pressure_outlet': pressure_inlet - head_loss * rho * g,
+        'swap_head_loss': swap_head_loss,
+        'swap_pressure_outlet': pressure_inlet - swap_head_loss * rho * g
+    }
+
+def _segment_totals(model, index, Q, rho, mu, overrides, g):
+    """
+    Soma de h_total e maior velocidade nos trechos index, para cada ponto
+    Q, rho, mu: Arrays 1D (um valor por ponto)
+    overrides: {parâmetro: array 1D por ponto} que substitui o valor dos trechos
+    """
+    column = lambda values: values[:, np.newaxis]
+    D = column(overrides['diameter']) if 'diameter' in overrides else model.diameter[index]
+    L = column(overrides['length']) if 'length' in overrides else model.length[index]
+    roughness = column(overrides['roughness']) if 'roughness' in overrides else model.roughness[index]
+
+    losses = losses_from_invariants(
+        column(Q), D, np.pi * (D/2)**2, roughness / D, L / D,
+        model.K_total[index], model.elevation[index], column(rho), column(mu), g
+    )
+    return losses['h_total'].sum(axis=1), losses['V'].max(axis=1)
+
+@timed('varredura/grade')
+def grid_sweep(model, fluid, flow_rate, x_name, x_values, y_name, y_values, segments=None,
+               memory_limit=64 * 2**20, g=GRAVITY, progress=None, partial=None):
+    """
+    Perda de carga, pressão de saída e maior velocidade em uma grade de dois
+    parâmetros
+    fluid: Dicionário com fluid_type, temp (°C), pressure_inlet (Pa),
+           gas_molar_mass, rho e mu (formato de create_sidebar)
+    flow_rate: Vazão (m³/s) usada quando nenhum eixo é a vazão
+    x_name, y_name: Chaves de GRID_PARAMETERS (diferentes)
+    x_values, y_values: Valores de cada eixo (SI)
+    segments: Índices dos trechos que recebem diâmetro, rugosidade ou
+              comprimento da grade (padrão: todos)
+    memory_limit: Memória (bytes) dos arrays intermediários de cada bloco
+    progress: Função chamada com (pontos concluídos, total) após cada bloco
+    partial: Função chamada com o dicionário de resultados após cada bloco
+             (linhas ainda não calculadas valem NaN), p.ex. para exibir a
+             grade enquanto é calculada
+
+    A grade é avaliada em blocos de linhas, de modo que a memória usada não
+    cresce com o tamanho da grade. Quando um eixo é um parâmetro de trecho,
+    os trechos não afetados dependem só do outro eixo: eles são avaliados
+    uma vez por valor desse eixo, e só os trechos afetados são avaliados em
+    todos os pontos da grade.
+
+    Retorna: dicionário com x, y e as grades (n_y, n_x) head_loss (m),
+    pressure_outlet (Pa) e velocity_max (m/s)
+    """
+    if x_name == y_name:
+        raise ValueError("Os dois eixos da varredura devem ser parâmetros diferentes")
+    for name in (x_name, y_name):
+        if name not in GRID_PARAMETERS:
+            raise ValueError(f"Parâmetro de varredura desconhecido: {name}")
+
+    x_values = np.asarray(x_values, dtype=float)
+    y_values = np.asarray(y_values, dtype=float)
+    shape = (y_values.size, x_values.size)
+    axes = {x_name: x_values[np.newaxis, :], y_name: y_values[:, np.newaxis]}
+
+    # Estado do escoamento (arrays broadcastable à grade ou escalares)
+    Q = axes.get('flow_rate', flow_rate)
+    pressure_inlet = axes.get('pressure_inlet', fluid['pressure_inlet'])
+    if 'temperature' in axes or 'pressure_inlet' in axes:
+        rho, mu, _ = get_fluid_properties(
+            fluid['fluid_type'], axes.get('temperature', fluid['temp']), pressure_inlet,
+            fluid.get('gas_molar_mass', 0.02896), fluid.get('rho'), fluid.get('mu')
+        )
+    else:
+        rho, mu = fluid['rho'], fluid['mu']
+
+    n_segments = len(model)
+    overrides = {name: values for name, values in axes.items() if name in SEGMENT_PARAMETERS}
+    affected = np.zeros(n_segments, dtype=bool)
+    if overrides:
+        affected[np.arange(n_segments) if segments is None else np.asarray(segments, dtype=int)] = True
+    affected_index = np.flatnonzero(affected) if overrides else np.arange(n_segments)
+    other_index = np.flatnonzero(~affected) if overrides else np.array([], dtype=int)
+
+    # Trechos não afetados: uma avaliação por ponto do estado (um eixo ou nenhum)
+    base_head, base_velocity = 0.0, 0.0
+    if other_index.size:
+        state_shape = np.broadcast_shapes(np.shape(Q), np.shape(rho), np.shape(mu))
+        state = [np.broadcast_to(value, state_shape).ravel() for value in (Q, rho, mu)]
+        n_state = state[0].size
+        block = max(1, memory_limit // (other_index.size * LOSSES_BYTES_PER_ELEMENT))
+        head, velocity = np.empty(n_state), np.empty(n_state)
+        for start in range(0, n_state, block):
+            part = slice(start, start + block)
+            head[part], velocity[part] = _segment_totals(
+                model, other_index, *(values[part] for values in state), {}, g
+            )
+        base_head = head.reshape(state_shape)
+        base_velocity = velocity.reshape(state_shape)
+
+    # Trechos afetados (ou todos, sem parâmetro de trecho): grade completa em blocos de linhas
+    allocate = np.empty if partial is None else lambda shape, dtype: np.full(shape, np.nan, dtype)
+    result = {name: allocate(shape, dtype=np.float32)
+              for name in ('head_loss', 'pressure_outlet', 'velocity_max')}
+    result.update({'x': x_values, 'y': y_values, 'x_name': x_name, 'y_name': y_name})
+    rows_per_block = max(1, memory_limit // (max(affected_index.size, 1) * LOSSES_BYTES_PER_ELEMENT * shape[1]))
+    on_rows = lambda value, rows: np.broadcast_to(value, shape)[rows]
+
+    for start in range(0, shape[0], rows_per_block):
+        rows = slice(start, min(start + rows_per_block, shape[0]))
+        head = on_rows(base_head, rows)
+        velocity = on_rows(base_velocity, rows)
+        if affected_index.size:
+            points = [on_rows(value, rows).ravel() for value in (Q, rho, mu)]
+            block_overrides = {name: on_rows(values, rows).ravel() for name, values in overrides.items()}
+            block_head, block_velocity = _segment_totals(model, affected_index, *points, block_overrides, g)
+            head = head + block_head.reshape(head.shape)
+            velocity = np.maximum(velocity, block_velocity.reshape(velocity.shape))
+
+        result['head_loss'][rows] = head
+        result['pressure_outlet'][rows] = on_rows(pressure_inlet, rows) - on_rows(rho, rows) * g * head
+        result['velocity_max'][rows] = velocity
+        if progress is not None:
+            progress(rows.stop * shape[1], shape[0] * shape[1])
+        if partial is not None:
+            partial(result)
+
+    return result
@@ -0,0 +1,229 @@
+import hashlib
+
+import numpy as np
+from config.settings import GRAVITY, TUBE_MATERIALS
+from utils.calculations import pipe_K_total, losses_from_invariants
+from utils.pipe_segment import PipeColumns, PipeSegment
+
+def pipes_signature(pipes):
+    """
+    Assinatura imutável da configuração dos trechos
+    pipes: Lista de trechos (formato de st.session_state.pipes)
+
+    Duas listas com a mesma assinatura produzem o mesmo SystemModel. Os
+    pares (chave, valor) ficam na ordem do dicionário, sem ordenação: a
+    assinatura serve para detectar alterações entre reruns, e ordenar as
+    chaves de cada trecho dominava o custo em sistemas longos. Para
+    PipeSegment, a assinatura do trecho é a tupla dos seus valores.
+    """
+    return tuple(pipe.astuple() if isinstance(pipe, PipeSegment) else tuple(pipe.items()) for pipe in pipes)
+
+def pipe_roughness(pipe):
+    """
+    Rugosidade absoluta do trecho (m)
+
+    Usa o valor já definido no trecho ou, na falta dele, o valor tabelado
+    do material em TUBE_MATERIALS.
+    """
+    roughness = pipe.get('roughness')
+    if roughness is None:
+        roughness = TUBE_MATERIALS.get(pipe.get('material'))
+    return roughness if roughness is not None else 0.0
+
+class SystemModel:
+    """
+    Modelo compilado de um sistema de trechos em série
+
+    Guarda os invariantes de cada trecho (área, ε/D, L/D, K total, desnível)
+    em arrays NumPy contíguos, de modo que solvers e varreduras não precisem
+    reler os dicionários de st.session_state.pipes a cada avaliação.
+    """
+
+    def __init__(self, ids, diameter, length, roughness, K_total, elevation, signature=None):
+        self.ids = np.ascontiguousarray(ids)
+        self.diameter = np.ascontiguousarray(diameter, dtype=float)
+        self.length = np.ascontiguousarray(length, dtype=float)
+        self.roughness = np.ascontiguousarray(roughness, dtype=float)
+        self.K_total = np.ascontiguousarray(K_total, dtype=float)
+        self.elevation = np.ascontiguousarray(elevation, dtype=float)
+
+        self.area = np.pi * (self.diameter/2)**2
+        self.eD = self.roughness / self.diameter
+        self.L_D = self.length / self.diameter
+
+        self.total_length = float(self.length.sum())
+        self.total_elevation = float(self.elevation.sum())
+        self.signature = signature
+        self.compiled = len(self.diameter)
+        self.source = None
+        self.base_signature = None
+        self._key = None
+        self._segment_index = None
+
+    @classmethod
+    def from_pipes(cls, pipes, signature=None, previous=None):
+        """
+        Constrói o modelo a partir da lista de trechos da sessão
+        previous: Modelo anterior (opcional); os invariantes dos trechos com
+                  a mesma assinatura são copiados dele e só os trechos novos
+                  ou alterados são recompilados
+        """
+        signature = signature if signature is not None else pipes_signature(pipes)
+        if previous is None or previous.signature is None or not len(previous):
+            if pipes and all(isinstance(pipe, PipeSegment) for pipe in pipes):
+                return cls.from_columns(PipeColumns.from_pipes(pipes), signature)
+            return cls(
+                ids=[pipe['id'] for pipe in pipes],
+                diameter=[pipe['diameter'] for pipe in pipes],
+                length=[pipe['length'] for pipe in pipes],
+                roughness=[pipe_roughness(pipe) for pipe in pipes],
+                K_total=[pipe_K_total(pipe) for pipe in pipes],
+                elevation=[pipe.get('elevation_change', 0) for pipe in pipes],
+                signature=signature
+            )
+
+        source = previous.locate(signature)
+        changed = np.flatnonzero(source < 0)
+        reused = np.maximum(source, 0)
+        columns = {name: getattr(previous, name)[reused] for name in
+                   ('ids', 'diameter', 'length', 'roughness', 'K_total', 'elevation')}
+        for i in changed:
+            pipe = pipes[i]
+            columns['ids'][i] = pipe['id']
+            columns['diameter'][i] = pipe['diameter']
+            columns['length'][i] = pipe['length']
+            columns['roughness'][i] = pipe_roughness(pipe)
+            columns['K_total'][i] = pipe_K_total(pipe)
+            columns['elevation'][i] = pipe.get('elevation_change', 0)
+
+        model = cls(signature=signature, **columns)
+        model.compiled = changed.size
+        # Posição de cada trecho no modelo anterior (-1: recompilado)
+        model.source = source
+        model.base_signature = previous.signature
+        return model
+
+    @classmethod
+    def from_columns(cls, columns, signature=None):
+        """Constrói o modelo a partir de um PipeColumns (K e rugosidade vetorizados)"""
+        return cls(
+            ids=columns.id,
+            diameter=columns.diameter,
+            length=columns.length,
+            roughness=columns.roughness_values(),
+            K_total=columns.K_total(),
+            elevation=columns.elevation_change,
+            signature=signature
+        )
+
+    @property
+    def key(self):
+        """
+        Hash estável da configuração dos trechos, usado nas chaves de cache
+
+        Calculado sobre os bytes dos arrays de invariantes (e não sobre a
+        assinatura serializada em JSON), o que custa pouco mesmo com dezenas
+        de milhares de trechos; configurações com os mesmos invariantes dão
+        os mesmos resultados e compartilham a chave.
+        """
+        if self._key is None:
+            digest = hashlib.sha256()
+            for values in (self.ids.astype(np.int64), self.diameter, self.length,
+                           self.roughness, self.K_total, self.elevation):
+                digest.update(values.tobytes())
+            self._key = digest.hexdigest()
+        return self._key
+
+    def __len__(self):
+        return len(self.diameter)
+
+    @property
+    def segment_index(self):
+        """Dicionário assinatura do trecho -> posição no modelo"""
+        if self._segment_index is None:
+            self._segment_index = {segment: i for i, segment in enumerate(self.signature)}
+        return self._segment_index
+
+    def locate(self, signature):
+        """
+        Posição neste modelo de cada trecho de outra configuração
+        signature: Assinatura (pipes_signature) da outra configuração
+
+        Retorna: array de índices, -1 para trechos novos ou alterados
+        """
+        own = self.signature
+        if len(signature) == len(own):
+            # Mesmo número de trechos (edição de campos): comparação posição a posição
+            source = np.arange(len(own))
+            source[[i for i, (new, old) in enumerate(zip(signature, own)) if new != old]] = -1
+            return source
+
+        index = self.segment_index
+        return np.fromiter((index.get(segment, -1) for segment in signature),
+                           dtype=np.intp, count=len(signature))
+
+    def losses(self, flow_rates, rho, mu, g=GRAVITY):
+        """
+        Perdas de todos os trechos para uma ou mais vazões
+        flow_rates: Vazão ou array de vazões (m³/s)
+
+        Retorna: dicionário de arrays com shape (n_vazões, n_trechos)
+        """
+        Q = np.atleast_1d(np.asarray(flow_rates, dtype=float))[:, np.newaxis]
+        return losses_from_invariants(
+            Q, self.diameter, self.area, self.eD, self.L_D,
+            self.K_total, self.elevation, rho, mu, g
+        )
+
+    def flow_rate_from_velocity(self, velocity):
+        """Vazão correspondente a uma velocidade no primeiro trecho"""
+        return velocity * self.area[0]
+
+    def velocity_from_flow_rate(self, flow_rate):
+        """Velocidade no primeiro trecho para uma dada vazão"""
+        return flow_rate / self.area[0]
+
+def stack_system_models(models):
+    """
+    Empilha vários modelos em arrays 2D (n_modelos x máximo de trechos)
+    
+    Sistemas com menos trechos são completados com trechos neutros (L/D,
+    K e desnível nulos), que não contribuem para a perda de carga. Usado
+    para avaliar muitos sistemas diferentes em uma única chamada do núcleo
+    vetorizado.
+    """
+    n_models = len(models)
+    n_segments = max(len(model) for model in models)
+    
+    stacked = {
+        'diameter': np.ones((n_models, n_segments)),
+        'area': np.full((n_models, n_segments), np.pi / 4),
+        'eD': np.zeros((n_models, n_segments)),
+        'L_D': np.zeros((n_models, n_segments)),
+        'K_total': np.zeros((n_models, n_segments)),
+        'elevation': np.zeros((n_models, n_segments))
+    }
+    
+    for i, model in enumerate(models):
+        n = len(model)
+        for name, values in stacked.items():
+            values[i, :n] = getattr(model, name)
+    
+    return stacked
+
+def get_system_model(pipes, store):
+    """
+    Retorna o SystemModel da configuração atual, reconstruindo-o apenas
+    quando os trechos mudam (e, nesse caso, recompilando só os trechos
+    alterados)
+    pipes: Lista de trechos
+    store: Mapeamento onde o modelo fica guardado (p.ex. st.session_state)
+    """
+    signature = pipes_signature(pipes)
+    model = store.get('system_model')
+
+    if model is None or model.signature != signature:
+        model = SystemModel.from_pipes(pipes, signature, previous=model)
+        store['system_model'] = model
+
+    return model
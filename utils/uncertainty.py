@@ -0,0 +1,240 @@
+"""
+Propagação de incertezas por Monte Carlo no sistema em série
+
+As amostras são geradas e avaliadas em blocos (amostras x trechos) e
+descartadas em seguida; do resultado ficam apenas histogramas de resolução
+fixa e momentos acumulados, de modo que a memória não cresce com o número
+de amostras.
+"""
+import numpy as np
+from config.settings import GRAVITY
+from utils.calculations import LOSSES_BYTES_PER_ELEMENT, losses_from_invariants
+from utils.fluid_properties import property_table
+from utils.profiling import timed
+
+# Incertezas padrão: coeficientes de variação (desvio/valor nominal) e
+# desvio da temperatura em °C
+DEFAULT_UNCERTAINTY = {
+    'roughness_cv': 0.30,
+    'diameter_cv': 0.01,
+    'length_cv': 0.02,
+    'temperature_std': 2.0,
+    'flow_cv': 0.05
+}
+
+class StreamingHistogram:
+    """
+    Histograma de largura de classe fixa que se expande conforme os dados
+
+    Quando um valor cai fora do intervalo atual, o intervalo dobra para o
+    lado necessário e as classes são somadas duas a duas, sem perder
+    contagens. Os percentis são interpolados dentro da classe, com erro
+    máximo de uma largura de classe.
+    """
+
+    def __init__(self, n_bins=4096):
+        self.n_bins = n_bins
+        self.counts = np.zeros(n_bins, dtype=np.int64)
+        self.lo = None
+        self.width = None
+        self.total = 0
+        self.sum = 0.0
+        self.sum_sq = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def hi(self):
+        return self.lo + self.width * self.n_bins
+
+    def _expand(self, left):
+        """Dobra o intervalo para a esquerda (left=True) ou para a direita"""
+        merged = self.counts.reshape(-1, 2).sum(axis=1)
+        self.counts = np.zeros(self.n_bins, dtype=np.int64)
+        half = self.n_bins // 2
+        if left:
+            self.counts[half:] = merged
+            self.lo -= self.width * self.n_bins
+        else:
+            self.counts[:half] = merged
+        self.width *= 2
+
+    def update(self, values):
+        """Acrescenta um bloco de valores"""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+
+        v_min, v_max = values.min(), values.max()
+        if self.lo is None:
+            # Primeiro bloco define o intervalo, com folga para os seguintes
+            span = max(v_max - v_min, abs(v_max) * 1e-9, 1e-12)
+            self.lo = v_min - 0.25 * span
+            self.width = 1.5 * span / self.n_bins
+        while v_min < self.lo:
+            self._expand(left=True)
+        while v_max >= self.hi:
+            self._expand(left=False)
+
+        idx = ((values - self.lo) / self.width).astype(np.int64)
+        self.counts += np.bincount(np.clip(idx, 0, self.n_bins - 1), minlength=self.n_bins)
+        self.total += values.size
+        self.sum += values.sum()
+        self.sum_sq += np.square(values).sum()
+        self.min = min(self.min, v_min)
+        self.max = max(self.max, v_max)
+
+    def quantile(self, q):
+        """Percentil(is) q (0 a 1) interpolado nas classes"""
+        if self.total == 0:
+            return np.full(np.shape(q), np.nan)
+        cumulative = np.concatenate([[0], np.cumsum(self.counts)])
+        edges = self.lo + self.width * np.arange(self.n_bins + 1)
+        value = np.interp(np.asarray(q) * self.total, cumulative, edges)
+        return np.clip(value, self.min, self.max)
+
+    def mean(self):
+        return self.sum / self.total if self.total else np.nan
+
+    def std(self):
+        if self.total < 2:
+            return np.nan
+        variance = (self.sum_sq - self.sum**2 / self.total) / (self.total - 1)
+        return float(np.sqrt(max(variance, 0.0)))
+
+    def histogram(self, n_bins=60):
+        """
+        Histograma reduzido para exibição, limitado ao intervalo [min, max]
+        observado
+
+        Retorna: (bordas, contagens)
+        """
+        edges = self.lo + self.width * np.arange(self.n_bins + 1)
+        used = np.flatnonzero(self.counts)
+        if used.size == 0:
+            return np.array([]), np.array([])
+        first, last = used[0], used[-1] + 1
+        group = max(1, int(np.ceil((last - first) / n_bins)))
+        last = first + group * int(np.ceil((last - first) / group))
+        counts = np.zeros(last - first, dtype=np.int64)
+        available = min(last, self.n_bins) - first
+        counts[:available] = self.counts[first:first + available]
+        coarse = counts.reshape(-1, group).sum(axis=1)
+        coarse_edges = self.lo + self.width * np.arange(first, last + 1, group)
+        return coarse_edges, coarse
+
+    def summary(self, percentiles=(0.05, 0.5, 0.95)):
+        """Percentis, média, desvio, mínimo, máximo e número de amostras"""
+        values = self.quantile(np.asarray(percentiles))
+        result = {f"P{round(q*100)}": float(v) for q, v in zip(percentiles, values)}
+        result.update({
+            'mean': float(self.mean()),
+            'std': self.std(),
+            'min': float(self.min),
+            'max': float(self.max),
+            'n': int(self.total)
+        })
+        return result
+
+def _property_table(fluid, t_min, t_max, n_points):
+    """
+    Temperaturas (°C), ρ e μ do fluido em uma grade de temperaturas, da
+    tabela compartilhada entre as sessões (ver property_table)
+    """
+    table = property_table(
+        fluid.get('fluid_type', "Água"), t_min, t_max, n_points,
+        fluid.get('pressure_inlet', 101325.0), fluid.get('gas_molar_mass', 0.02896),
+        fluid.get('rho'), fluid.get('mu')
+    )
+    return table['temperature'], table['rho'], table['mu']
+
+def monte_carlo_chunks(model, flow_rate, pressure_inlet, fluid, uncertainty=None,
+                       n_samples=100000, chunk_size=None, seed=None,
+                       memory_limit=64 * 2**20, g=GRAVITY):
+    """
+    Gera o Monte Carlo bloco a bloco
+    model: SystemModel com os valores nominais dos trechos
+    flow_rate, pressure_inlet: Vazão (m³/s) e pressão de entrada (Pa) nominais
+    fluid: Dicionário com fluid_type, temp (°C), pressure_inlet,
+           gas_molar_mass e, para fluido personalizado, rho e mu
+    uncertainty: Incertezas (ver DEFAULT_UNCERTAINTY); chaves ausentes usam
+                 o padrão
+    chunk_size: Amostras por bloco; por padrão, o maior bloco que cabe em
+                memory_limit (bytes)
+
+    Rugosidade: lognormal com mediana no valor nominal. Diâmetro,
+    comprimento e vazão: normais relativas ao nominal (limitadas a valores
+    positivos). Temperatura: normal, uma por amostra, com ρ e μ
+    interpolados de uma tabela. Diâmetro, comprimento e rugosidade variam
+    de forma independente em cada trecho.
+
+    Produz, após cada bloco: (amostras concluídas, {'head_loss': hist,
+    'pressure_outlet': hist}), com StreamingHistogram acumulados
+    """
+    spec = {**DEFAULT_UNCERTAINTY, **(uncertainty or {})}
+    rng = np.random.default_rng(seed)
+    n_segments = len(model)
+
+    if chunk_size is None:
+        chunk_size = max(1, memory_limit // (n_segments * LOSSES_BYTES_PER_ELEMENT))
+    chunk_size = int(min(chunk_size, n_samples))
+
+    # Tabela de propriedades cobrindo ±6 desvios de temperatura
+    T_nominal = fluid.get('temp', 20.0)
+    T_spread = 6 * spec['temperature_std']
+    temperatures, rho_table, mu_table = _property_table(fluid, T_nominal - T_spread, T_nominal + T_spread, 65)
+
+    roughness_sigma = np.sqrt(np.log1p(spec['roughness_cv']**2))
+    K_total = model.K_total[np.newaxis, :]
+    elevation = model.elevation[np.newaxis, :]
+
+    stats = {'head_loss': StreamingHistogram(), 'pressure_outlet': StreamingHistogram()}
+    done = 0
+
+    while done < n_samples:
+        n = min(chunk_size, n_samples - done)
+        shape = (n, n_segments)
+
+        D = model.diameter * np.maximum(1 + spec['diameter_cv'] * rng.standard_normal(shape), 0.05)
+        L = model.length * np.maximum(1 + spec['length_cv'] * rng.standard_normal(shape), 0.05)
+        roughness = model.roughness * np.exp(roughness_sigma * rng.standard_normal(shape))
+        Q = flow_rate * np.maximum(1 + spec['flow_cv'] * rng.standard_normal(n), 0.0)
+        T = T_nominal + spec['temperature_std'] * rng.standard_normal(n)
+        rho = np.interp(T, temperatures, rho_table)
+        mu = np.interp(T, temperatures, mu_table)
+
+        losses = losses_from_invariants(
+            Q[:, np.newaxis], D, np.pi * (D/2)**2, roughness / D, L / D,
+            K_total, elevation, rho[:, np.newaxis], mu[:, np.newaxis], g
+        )
+        head_loss = losses['h_total'].sum(axis=1)
+        del losses, D, L, roughness
+
+        stats['head_loss'].update(head_loss)
+        stats['pressure_outlet'].update(pressure_inlet - rho * g * head_loss)
+        done += n
+        yield done, stats
+
+@timed('incerteza/monte_carlo')
+def run_monte_carlo(model, flow_rate, pressure_inlet, fluid, uncertainty=None,
+                    n_samples=100000, chunk_size=None, seed=None, g=GRAVITY, progress=None):
+    """
+    Executa o Monte Carlo completo (ver monte_carlo_chunks)
+    progress: Função chamada com (amostras concluídas, estatísticas) após
+              cada bloco, p.ex. para atualizar a interface
+
+    Retorna: dicionário com, para head_loss (m) e pressure_outlet (Pa), o
+    resumo (P5, P50, P95, média, desvio, mínimo, máximo) e o histograma
+    (bordas, contagens)
+    """
+    stats = None
+    for done, stats in monte_carlo_chunks(model, flow_rate, pressure_inlet, fluid, uncertainty,
+                                          n_samples, chunk_size, seed, g=g):
+        if progress is not None:
+            progress(done, stats)
+
+    return {
+        name: {'summary': hist.summary(), 'histogram': hist.histogram()}
+        for name, hist in stats.items()
+    }
@@ -0,0 +1,281 @@
+"""
+Golpe de aríete no sistema em série pelo método das características
+
+Cada trecho é dividido em N trechos elementares de comprimento Δx = a·Δt,
+com o mesmo Δt em todo o sistema. A carga piezométrica H e a vazão Q de
+todos os nós são avançadas juntas a cada passo, com operações sobre os
+arrays de nós:
+
+    C+:  H_P = H_A + B·Q_A - R·Q_A·|Q_A| - B·Q_P
+    C-:  H_P = H_B - B·Q_B + R·Q_B·|Q_B| + B·Q_P
+
+com B = a/(g·A) e R = f·Δx/(2·g·D·A²). As perdas localizadas (K) de cada
+trecho ficam concentradas na junção com o trecho seguinte; as do último
+trecho, junto à válvula de jusante. O regime permanente inicial satisfaz
+exatamente as equações discretas, de modo que sem manobra não há
+transiente espúrio.
+"""
+import numpy as np
+from config.settings import (
+    GRAVITY, ATMOSPHERIC_PRESSURE, WATER_VAPOR_PRESSURE, PIPE_ELASTIC_MODULUS
+)
+from utils.loss_coefficients import K_valve_gate_open
+from utils.profiling import timed
+
+def wave_speed(bulk_modulus, rho, elastic_modulus, wall_ratio, restraint=1.0):
+    """
+    Celeridade da onda de pressão (m/s) em tubo de parede fina
+    bulk_modulus: Módulo de compressibilidade do líquido (Pa)
+    elastic_modulus: Módulo de elasticidade da parede (Pa)
+    wall_ratio: Espessura da parede / diâmetro
+    restraint: Fator de ancoragem c₁ (1 para tubo com juntas de dilatação)
+
+    a = √[(K/ρ) / (1 + c₁·(K/E)·(D/e))]
+    """
+    elastic_modulus = np.asarray(elastic_modulus, dtype=float)
+    return np.sqrt((bulk_modulus / rho) / (1 + restraint * (bulk_modulus / elastic_modulus) / wall_ratio))
+
+def segment_wave_speeds(pipes, bulk_modulus, rho, wall_ratio, custom_modulus=2.07e11, restraint=1.0):
+    """
+    Celeridade de cada trecho a partir do material (PIPE_ELASTIC_MODULUS)
+    custom_modulus: Módulo de elasticidade usado no material Personalizado
+    """
+    modulus = [PIPE_ELASTIC_MODULUS.get(pipe.get('material')) or custom_modulus for pipe in pipes]
+    return wave_speed(bulk_modulus, rho, modulus, wall_ratio, restraint)
+
+def valve_closure_schedule(closing_time, exponent=1.0, start_time=0.0, n_points=51):
+    """
+    Lei de fechamento τ(t) = (1 - (t - t₀)/T_f)^Em da válvula de jusante
+    closing_time: Tempo de fechamento T_f (s); 0 para fechamento instantâneo
+    exponent: Em (1: linear; > 1: fecha devagar no início e rápido no fim)
+    start_time: Início da manobra t₀ (s)
+
+    Retorna: (tempos, aberturas relativas) para interpolação linear
+    """
+    if closing_time <= 0:
+        return np.array([start_time, start_time]), np.array([1.0, 0.0])
+    s = np.linspace(0.0, 1.0, n_points)
+    return start_time + s * closing_time, (1.0 - s) ** exponent
+
+def _orifice_flow(head_difference, B, k):
+    """
+    Vazão Q que satisfaz B·Q + k·Q·|Q| = Δ (característica + perda
+    concentrada), na forma numericamente estável para k pequeno
+    """
+    magnitude = np.abs(head_difference)
+    return np.sign(head_difference) * 2 * magnitude / (B + np.sqrt(B * B + 4 * k * magnitude))
+
+def _discretize(length, speeds, n_reaches):
+    """
+    Δt comum e número de trechos elementares de cada trecho
+
+    Δt divide o tempo de percurso total em n_reaches partes; cada trecho
+    fica com ao menos um trecho elementar e sua celeridade é ajustada para
+    que Δx = a·Δt feche o comprimento exatamente.
+    """
+    travel = length / speeds
+    dt = travel.sum() / n_reaches
+    reaches = np.maximum(1, np.round(travel / dt)).astype(int)
+    return dt, reaches, length / (reaches * dt)
+
+@timed('transiente/moc')
+def simulate_water_hammer(model, flow_rate, rho, mu, pressure_inlet, speeds, duration,
+                          n_reaches=1000, valve_schedule=None, existing_valve=False,
+                          pump_trip=None, check_valve=True,
+                          vapor_pressure=WATER_VAPOR_PRESSURE, max_steps=500000, g=GRAVITY,
+                          progress=None):
+    """
+    Simula o transiente a partir do regime permanente
+    model: SystemModel do sistema
+    flow_rate: Vazão inicial (m³/s, > 0)
+    pressure_inlet: Pressão absoluta (Pa) na entrada do primeiro trecho
+    speeds: Celeridade de cada trecho (m/s), p.ex. de segment_wave_speeds
+    duration: Tempo simulado (s)
+    n_reaches: Número aproximado de trechos elementares no sistema inteiro
+    valve_schedule: (tempos, aberturas) da válvula de jusante, p.ex. de
+                    valve_closure_schedule; None mantém a válvula aberta
+    existing_valve: True se o último trecho já tem válvula gaveta (ela é a
+                    que fecha); senão uma gaveta é acrescentada no fim
+    pump_trip: None para reservatório de nível constante a montante, ou
+               {'shutoff_ratio': H_shutoff/H_operação, 'run_down_time': T (s)}
+               para uma bomba que é desligada em t = 0; a rotação cai como
+               1/(1 + t/T) (torque proporcional ao quadrado da rotação)
+    check_valve: Com bomba, impede o refluxo pela bomba
+    vapor_pressure: Pressão de vapor (Pa, absoluta) para o alerta de
+                    cavitação (a separação da coluna não é modelada)
+    max_steps: Limite de passos de tempo
+    progress: Função chamada com (passo, total de passos) a cada ~1%
+
+    A válvula de jusante é uma gaveta (K aberta de K_valve_gate_open)
+    descarregando num reservatório de nível constante.
+
+    Retorna: dicionário com dt, n_nodes, n_steps, wave_speeds (ajustadas),
+    wave_speed_adjustment (maior ajuste relativo), wave_period (2·ΣL/a),
+    joukowsky (ρ·a·V₀ no último trecho, Pa), x, elevation e pressões por
+    nó (pressure_initial, pressure_max, pressure_min), max_pressure,
+    min_pressure, cavitation (máscara por nó) e as séries no tempo t e
+    probes (pressão em montante, meio e válvula)
+    """
+    if flow_rate <= 0:
+        raise ValueError("O golpe de aríete é simulado a partir de uma vazão inicial positiva")
+
+    requested = np.broadcast_to(np.asarray(speeds, dtype=float), model.length.shape)
+    dt, reaches, speeds = _discretize(model.length, requested, n_reaches)
+    n_steps = int(np.ceil(duration / dt))
+    if n_steps > max_steps:
+        raise ValueError(
+            f"A simulação precisa de {n_steps:,} passos de tempo (limite: {max_steps:,}); "
+            "reduza o número de trechos elementares ou o tempo simulado"
+        )
+
+    # Nós: N+1 por trecho; cada trecho começa em starts[i] e termina em ends[i]
+    n_nodes_segment = reaches + 1
+    ends = np.cumsum(n_nodes_segment) - 1
+    starts = ends - reaches
+    n_nodes = int(ends[-1] + 1)
+    segment = np.repeat(np.arange(len(model)), n_nodes_segment)
+    local = np.arange(n_nodes) - starts[segment]  # índice do nó dentro do trecho
+
+    B_segment = speeds / (g * model.area)
+    dx = model.length / reaches
+    losses = model.losses(flow_rate, rho, mu, g)
+    f = losses['f'][0]
+    R_segment = f * dx / (2 * g * model.diameter * model.area**2)
+    B = B_segment[segment]
+    R = R_segment[segment]
+
+    # Perdas concentradas: junções entre trechos e, no último, junto à válvula
+    k_local = model.K_total / (2 * g * model.area**2)
+    K_valve = K_valve_gate_open()
+    k_valve = K_valve / (2 * g * model.area[-1]**2)
+    k_fixed = k_local[-1]
+    if existing_valve:
+        k_fixed -= k_valve
+
+    # Regime permanente: H cai linearmente em cada trecho e salta nas junções
+    h_distributed = losses['h_distributed'][0]
+    H_start = pressure_inlet / (rho * g) - np.concatenate(
+        ([0.0], np.cumsum(h_distributed[:-1] + k_local[:-1] * flow_rate**2))
+    )
+    H = H_start[segment] - h_distributed[segment] * local / reaches[segment]
+    Q = np.full(n_nodes, float(flow_rate))
+    H_downstream = H[-1] - (k_fixed + k_valve) * flow_rate**2
+
+    # Cotas e posições dos nós
+    x_start = np.concatenate(([0.0], np.cumsum(model.length)[:-1]))
+    z_start = np.concatenate(([0.0], np.cumsum(model.elevation)[:-1]))
+    fraction = local / reaches[segment]
+    x = x_start[segment] + fraction * model.length[segment]
+    z = z_start[segment] + fraction * model.elevation[segment]
+
+    # Bomba: H_bomba = α²·H_shutoff - c·Q·|Q|, aspirando de reservatório à pressão atmosférica
+    if pump_trip is not None:
+        H_suction = ATMOSPHERIC_PRESSURE / (rho * g)
+        pump_head = H[0] - H_suction
+        if pump_head <= 0:
+            raise ValueError("A pressão de entrada não é maior que a atmosférica: não há altura de bomba")
+        shutoff = pump_trip.get('shutoff_ratio', 1.25) * pump_head
+        pump_c = (shutoff - pump_head) / flow_rate**2
+        run_down = pump_trip.get('run_down_time', 2.0)
+    H_reservoir = H[0]
+
+    if valve_schedule is None:
+        valve_times, valve_openings = np.array([0.0]), np.array([1.0])
+    else:
+        valve_times, valve_openings = (np.asarray(values, dtype=float) for values in valve_schedule)
+
+    half_inverse_B = 0.5 / B[1:-1]
+    junction_left, junction_right = ends[:-1], starts[1:]
+    B_junction = B_segment[:-1] + B_segment[1:]
+    k_junction = k_local[:-1]
+
+    H_max, H_min = H.copy(), H.copy()
+    pressure_initial = rho * g * (H - z)
+    probes = np.array([0, int(np.argmin(np.abs(x - x[-1] / 2))), n_nodes - 1])
+    probe_heads = np.empty((n_steps + 1, probes.size))
+    probe_heads[0] = H[probes]
+    report_every = max(1, n_steps // 100)
+
+    H_new, Q_new = np.empty_like(H), np.empty_like(Q)
+    cp, cm, work = np.empty_like(H), np.empty_like(H), np.empty_like(H)
+    for step in range(1, n_steps + 1):
+        t = step * dt
+        # cp = H + B·Q - R·Q·|Q| e cm = H - B·Q + R·Q·|Q|, sem arrays temporários
+        np.abs(Q, out=work)
+        work *= Q
+        work *= R
+        np.multiply(B, Q, out=cm)
+        np.subtract(cm, work, out=cp)
+        cp += H
+        np.subtract(H, cm, out=cm)
+        cm += work
+
+        # Todos os nós como internos; junções e extremidades são refeitas abaixo
+        np.add(cp[:-2], cm[2:], out=H_new[1:-1])
+        H_new[1:-1] *= 0.5
+        np.subtract(cp[:-2], cm[2:], out=Q_new[1:-1])
+        Q_new[1:-1] *= half_inverse_B
+
+        # Junções entre trechos (perda localizada do trecho de montante)
+        if junction_left.size:
+            C_P, C_M = cp[junction_left - 1], cm[junction_right + 1]
+            Q_j = _orifice_flow(C_P - C_M, B_junction, k_junction)
+            Q_new[junction_left] = Q_j
+            Q_new[junction_right] = Q_j
+            H_new[junction_left] = C_P - B_segment[:-1] * Q_j
+            H_new[junction_right] = C_M + B_segment[1:] * Q_j
+
+        # Montante: reservatório ou bomba desligada
+        C_M = cm[1]
+        if pump_trip is None:
+            H_new[0] = H_reservoir
+            Q_new[0] = (H_reservoir - C_M) / B_segment[0]
+        else:
+            speed = 1.0 / (1.0 + t / run_down)
+            Q_p = _orifice_flow(H_suction + speed**2 * shutoff - C_M, B_segment[0], pump_c)
+            if check_valve and Q_p < 0:
+                Q_p = 0.0
+            Q_new[0] = Q_p
+            H_new[0] = C_M + B_segment[0] * Q_p
+
+        # Jusante: válvula com abertura τ(t) descarregando no reservatório
+        C_P = cp[-2]
+        opening = float(np.interp(t, valve_times, valve_openings))
+        if opening <= 0:
+            Q_new[-1] = 0.0
+        else:
+            Q_new[-1] = _orifice_flow(C_P - H_downstream, B_segment[-1], k_fixed + k_valve / opening**2)
+        H_new[-1] = C_P - B_segment[-1] * Q_new[-1]
+
+        H, H_new = H_new, H
+        Q, Q_new = Q_new, Q
+        np.maximum(H_max, H, out=H_max)
+        np.minimum(H_min, H, out=H_min)
+        probe_heads[step] = H[probes]
+
+        if progress is not None and (step % report_every == 0 or step == n_steps):
+            progress(step, n_steps)
+
+    pressure_max = rho * g * (H_max - z)
+    pressure_min = rho * g * (H_min - z)
+    return {
+        'dt': dt,
+        'n_nodes': n_nodes,
+        'n_steps': n_steps,
+        'wave_speeds': speeds,
+        'wave_speed_adjustment': float(np.max(np.abs(speeds / requested - 1))),
+        'wave_period': float(2 * np.sum(model.length / speeds)),
+        'joukowsky': float(rho * speeds[-1] * flow_rate / model.area[-1]),
+        'x': x,
+        'elevation': z,
+        'pressure_initial': pressure_initial,
+        'pressure_max': pressure_max,
+        'pressure_min': pressure_min,
+        'max_pressure': float(pressure_max.max()),
+        'min_pressure': float(pressure_min.min()),
+        'cavitation': pressure_min < vapor_pressure,
+        't': dt * np.arange(n_steps + 1),
+        'probe_names': ["Montante", "Meio", "Válvula"],
+        'probe_x': x[probes],
+        'probes': rho * g * (probe_heads - z[probes])
+    }